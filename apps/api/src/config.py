@@ -12,8 +12,26 @@ class Settings(BaseSettings):
     DATABASE_URL: PostgresDsn = Field(..., description="PostgreSQL connection string")
     # Model paths
     MODEL_PATH: str = Field(..., description="Path to the fraud model file")
-    SCREENER_PATH: str = Field(..., description="Path to the sanctions screener pickle")
-    EXPLAINER_PATH: str = Field(..., description="Path to the SHAP explainer pickle")
+    SCREENER_PATH: str = Field(..., description="Path to the sanctions screener artifact or pickle")
+
+    # Sanctions screening worker processes (0 = screen in API threads)
+    SCREENING_WORKERS: int = Field(0, description="Sanctions screening worker processes (0 = in-process)")
+    SCREENING_QUEUE_DEPTH: int = Field(64, description="Screens allowed to wait for a screening worker")
+    # Latency budget per /score sanctions screen (0 = none); truncated screens go to review
+    SCREENING_DEADLINE_MS: float = Field(0, description="Sanctions screening latency budget in ms (0 = none)")
+
+    # Fraud model micro-batching (MODEL_BATCH_MAX_SIZE <= 1 = score each request alone)
+    MODEL_BATCH_MAX_SIZE: int = Field(32, description="Most /score rows per batched model predict")
+    MODEL_BATCH_MAX_WAIT_MS: float = Field(1.0, description="Longest a row waits for a model batch to fill")
+    MODEL_BATCH_QUEUE_DEPTH: int = Field(256, description="/score rows allowed to wait for a model batch")
+
+    # Fraud model inference threads (explanations and /batch scoring run off the event loop)
+    MODEL_INFERENCE_WORKERS: int = Field(1, description="Model inference threads")
+    MODEL_QUEUE_DEPTH: int = Field(64, description="Model calls allowed to wait for an inference thread")
+    MODEL_NUM_THREADS: int = Field(1, description="LightGBM threads per predict call (0 = all cores)")
+
+    # Token required by the sanctions list admin endpoints (empty = endpoints disabled)
+    ADMIN_TOKEN: str = Field("", description="X-Admin-Token for /sanctions/delta and /sanctions/reload")
 
     # Feature registry path
     FEATURE_REGISTRY_PATH: str = Field(..., description="Path to the feature registry JSON")
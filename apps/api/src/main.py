@@ -13,13 +13,31 @@ async def lifespan(app: FastAPI):
     # Load models on startup and connect to DBs
     print("Starting up: Loading models...")
     fraud_model_service.load_model()
+    fraud_model_service.start_executor(
+        workers=settings.MODEL_INFERENCE_WORKERS,
+        max_queue_depth=settings.MODEL_QUEUE_DEPTH
+    )
+    if settings.MODEL_BATCH_MAX_SIZE > 1:
+        fraud_model_service.start_batcher(
+            max_batch_size=settings.MODEL_BATCH_MAX_SIZE,
+            max_wait_ms=settings.MODEL_BATCH_MAX_WAIT_MS,
+            max_queue_depth=settings.MODEL_BATCH_QUEUE_DEPTH
+        )
     sanctions_service.load_screener()
+    if settings.SCREENING_WORKERS > 0:
+        sanctions_service.start_executor(
+            workers=settings.SCREENING_WORKERS,
+            max_queue_depth=settings.SCREENING_QUEUE_DEPTH
+        )
     await feature_service.connect()
     await audit_service.init_db() # Initialize Audit DB Table
     yield
     # Shutdown and close connections
     print("Shutting down: Closing connections...")
     await feature_service.close()
+    sanctions_service.stop_executor()
+    fraud_model_service.stop_batcher()
+    fraud_model_service.stop_executor()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -46,5 +64,20 @@ def health_check():
         "project": settings.PROJECT_NAME,
         "version": "0.1.0",
         "model_loaded": fraud_model_service.model is not None,
-        "screener_loaded": sanctions_service.screener is not None
+        "screener_loaded": sanctions_service.screener is not None,
+        "sanctions_list_version": (
+            sanctions_service.screener.version if sanctions_service.screener else None
+        ),
+        "sanctions_cache": (
+            sanctions_service.screener.cache_stats() if sanctions_service.screener else None
+        ),
+        "sanctions_executor": (
+            sanctions_service.executor.stats() if sanctions_service.executor else None
+        ),
+        "model_batcher": (
+            fraud_model_service.batcher.stats() if fraud_model_service.batcher else None
+        ),
+        "model_executor": (
+            fraud_model_service.executor.stats() if fraud_model_service.executor else None
+        )
     }
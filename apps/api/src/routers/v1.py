@@ -1,21 +1,29 @@
-import time
 import asyncio
-from fastapi import APIRouter, BackgroundTasks
+import secrets
+import time
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
+from packages.compliance.executor import ScreeningQueueFullError
+
+from ..config import settings
+from ..schemas.feature_factory import load_feature_registry
 from ..schemas.requests import (
-    TransactionRequest,
-    ScoreResponse,
-    FeatureContribution,
-    VelocityFeatures,
+    AnalyticsResponse,
     BatchRequest,
     BatchResponse,
     BatchResultItem,
-    AnalyticsResponse,
+    FeatureContribution,
+    SanctionsDeltaRequest,
+    SanctionsUpdateResponse,
+    ScoreResponse,
+    TransactionRequest,
+    VelocityFeatures,
 )
+from ..services.audit import audit_service
+from ..services.features import feature_service
 from ..services.fraud_model import fraud_model_service
+from ..services.inference import InferenceQueueFullError
 from ..services.sanctions import sanctions_service
-from ..services.features import feature_service
-from ..services.audit import audit_service
-from ..schemas.feature_factory import load_feature_registry
 from ..utils.countries import iso_to_country_name
 
 router = APIRouter()
@@ -24,32 +32,65 @@ router = APIRouter()
 REGISTRY = load_feature_registry()
 
 
+def _screening_busy() -> HTTPException:
+    """503 for when the sanctions screening queue is full (clients should retry)."""
+    return HTTPException(
+        status_code=503,
+        detail="Sanctions screening is at capacity, retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
+def _model_busy() -> HTTPException:
+    """503 for when the model inference queue is full (clients should retry)."""
+    return HTTPException(
+        status_code=503,
+        detail="Model inference is at capacity, retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
 @router.post("/score", response_model=ScoreResponse)
 async def score_transaction(request: TransactionRequest, background_tasks: BackgroundTasks):
     start_time = time.time()
 
-    # 1. Run Sanctions Screening & Feature Fetching
-    sanctions_task = asyncio.to_thread(
-        sanctions_service.screen_name,
+    # 1. Run Sanctions Screening alongside Feature Fetching and the Fraud Model
+    sanctions_task = sanctions_service.screen_name_async(
         request.sender_name,
-        iso_to_country_name(request.sender_country)
+        iso_to_country_name(request.sender_country),
+        deadline_ms=settings.SCREENING_DEADLINE_MS or None
     )
-    features_task = feature_service.get_velocity_features(request.card_id)
-
-    sanctions_result, velocity_features = await asyncio.gather(sanctions_task, features_task)
-
-    # 2. Prepare Model Input
-    # Convert the request object to a dict (excluding system fields)
-    request_data = request.model_dump(by_alias=True)
 
-    # Inject calculated velocity features into the data dict
-    request_data["card1_txn_1.0h"] = velocity_features["velocity_1h"]
-    request_data["card1_txn_24.0h"] = velocity_features["velocity_24h"]
+    async def score_model():
+        velocity_features = await feature_service.get_velocity_features(request.card_id)
+
+        # 2. Prepare Model Input
+        # Convert the request object to a dict (excluding system fields)
+        request_data = request.model_dump(by_alias=True)
+
+        # Inject calculated velocity features into the data dict
+        request_data["card1_txn_1.0h"] = velocity_features["velocity_1h"]
+        request_data["card1_txn_24.0h"] = velocity_features["velocity_24h"]
+
+        # 3. Run Fraud Model (batched with concurrent requests) and its TreeSHAP
+        # explanation, off the event loop while screening continues. The score
+        # comes from predict rather than the pred_contrib row: their sums differ
+        # in the last bits, and predict keeps /score bit-identical to /batch.
+        # The extra predict is ~1% of the pred_contrib pass.
+        risk_score, top_features_raw = await asyncio.gather(
+            fraud_model_service.predict_async(request_data),
+            fraud_model_service.explain_async(request_data, top_n=5)
+        )
+        return velocity_features, risk_score, top_features_raw
 
-    # 3. Run Fraud Model with SHAP Explanation
-    risk_score, top_features_raw = fraud_model_service.predict_with_explanation(
-        request_data, top_n=5
-    )
+    try:
+        sanctions_result, (velocity_features, risk_score, top_features_raw) = await asyncio.gather(
+            sanctions_task, score_model()
+        )
+    except ScreeningQueueFullError:
+        raise _screening_busy()
+    except InferenceQueueFullError:
+        raise _model_busy()
 
     # Convert to Pydantic models
     top_features = [
@@ -62,23 +103,7 @@ async def score_transaction(request: TransactionRequest, background_tasks: Backg
     ]
 
     # 4. Decision Logic
-    is_sanctions_hit = (
-        len(sanctions_result.top_matches) > 0
-        and sanctions_result.top_matches[0].is_match
-    )
-
-    risk_level = "low"
-    decision = "approve"
-
-    if is_sanctions_hit:
-        risk_level = "critical"
-        decision = "reject"
-    elif risk_score > 0.8:
-        risk_level = "high"
-        decision = "reject"
-    elif risk_score > 0.5:
-        risk_level = "medium"
-        decision = "review"
+    is_sanctions_hit, risk_level, decision = _decide(sanctions_result, risk_score)
 
     # 5. Calculate Latency
     latency = (time.time() - start_time) * 1000
@@ -109,21 +134,8 @@ async def score_transaction(request: TransactionRequest, background_tasks: Backg
     )
 
 
-async def _process_batch_item(item) -> BatchResultItem:
-    """Process a single transaction in a batch (simplified version without SHAP)."""
-    start_time = time.time()
-
-    # Run sanctions screening and feature fetching concurrently
-    sanctions_task = asyncio.to_thread(
-        sanctions_service.screen_name,
-        item.sender_name,
-        iso_to_country_name(item.sender_country)
-    )
-    features_task = feature_service.get_velocity_features(item.card_id)
-
-    sanctions_result, velocity_features = await asyncio.gather(sanctions_task, features_task)
-
-    # Prepare model input
+def _batch_features(item, velocity_features: dict) -> dict:
+    """Model input for a batch item (the batch schema carries a reduced feature set)."""
     request_data = {
         "TransactionAmt": item.transaction_amt,
         "card1_txn_1.0h": velocity_features["velocity_1h"],
@@ -131,11 +143,16 @@ async def _process_batch_item(item) -> BatchResultItem:
     }
     if item.product_cd:
         request_data["ProductCD"] = item.product_cd
+    return request_data
+
 
-    # Run fraud model (without SHAP for batch speed)
-    risk_score = fraud_model_service.predict(request_data)
+def _decide(sanctions_result, risk_score: float) -> tuple[bool, str, str]:
+    """
+    Decision logic shared by /score and /batch.
 
-    # Decision logic
+    Returns:
+        Tuple of (sanctions hit, risk level, decision)
+    """
     is_sanctions_hit = (
         len(sanctions_result.top_matches) > 0
         and sanctions_result.top_matches[0].is_match
@@ -154,7 +171,16 @@ async def _process_batch_item(item) -> BatchResultItem:
         risk_level = "medium"
         decision = "review"
 
-    latency = (time.time() - start_time) * 1000
+    # A screen cut short by its latency budget may have missed a match
+    if not sanctions_result.complete and decision == "approve":
+        decision = "review"
+
+    return is_sanctions_hit, risk_level, decision
+
+
+def _batch_result(item, sanctions_result, risk_score: float, latency: float) -> BatchResultItem:
+    """Apply the decision logic to a batch item's screening result and risk score."""
+    is_sanctions_hit, risk_level, decision = _decide(sanctions_result, risk_score)
 
     return BatchResultItem(
         transaction_id=item.transaction_id,
@@ -171,24 +197,95 @@ async def _process_batch_item(item) -> BatchResultItem:
 @router.post("/batch", response_model=BatchResponse)
 async def batch_score_transactions(request: BatchRequest):
     """
-    Screen multiple transactions in a single request.
-    Processes up to 100 transactions concurrently.
+    Screen multiple transactions in a single request (max 100).
+
+    Runs as three vectorized phases instead of per-item work: velocity
+    counters for all cards in one Redis pipeline (overlapping with
+    screening all sender names in one screen_names call), then one model
+    prediction over the whole batch. Item latency is the batch latency.
     """
     start_time = time.time()
-
-    # Process all transactions concurrently
-    tasks = [_process_batch_item(item) for item in request.transactions]
-    results = await asyncio.gather(*tasks)
+    items = request.transactions
+
+    # Phases 1 and 2: bulk velocity fetch and bulk screening (repeated names screened once)
+    sanctions_task = sanctions_service.screen_names_async([
+        (item.sender_name, iso_to_country_name(item.sender_country))
+        for item in items
+    ])
+    velocity_task = feature_service.get_velocity_features_many([item.card_id for item in items])
+    try:
+        sanctions_results, velocity_features = await asyncio.gather(sanctions_task, velocity_task)
+    except ScreeningQueueFullError:
+        raise _screening_busy()
+
+    # Phase 3: bulk scoring (one model call for the whole batch, without SHAP)
+    try:
+        risk_scores = await fraud_model_service.predict_many_async([
+            _batch_features(item, velocity)
+            for item, velocity in zip(items, velocity_features)
+        ])
+    except InferenceQueueFullError:
+        raise _model_busy()
 
     total_latency = (time.time() - start_time) * 1000
+    results = [
+        _batch_result(item, sanctions_result, risk_score, total_latency)
+        for item, sanctions_result, risk_score in zip(items, sanctions_results, risk_scores)
+    ]
 
     return BatchResponse(
-        results=list(results),
+        results=results,
         total_processed=len(results),
         total_latency_ms=total_latency
     )
 
 
+def _require_admin(x_admin_token: str | None = Header(None)):
+    """Allow sanctions list updates only with the configured ADMIN_TOKEN."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Sanctions list updates are disabled (no ADMIN_TOKEN)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.post(
+    "/sanctions/delta",
+    response_model=SanctionsUpdateResponse,
+    dependencies=[Depends(_require_admin)]
+)
+async def apply_sanctions_delta(request: SanctionsDeltaRequest):
+    """
+    Apply an incremental sanctions list update without restarting the API.
+
+    The new list is built off the event loop; screens already running finish
+    on the previous list, later screens see the update.
+    """
+    try:
+        summary = await asyncio.to_thread(sanctions_service.apply_delta, request.model_dump())
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    return SanctionsUpdateResponse(**summary)
+
+
+@router.post(
+    "/sanctions/reload",
+    response_model=SanctionsUpdateResponse,
+    dependencies=[Depends(_require_admin)]
+)
+async def reload_sanctions_list():
+    """
+    Reopen SCREENER_PATH (e.g. after make build-index) without restarting the API.
+
+    Deltas applied since the last load are dropped; the rebuilt list is
+    expected to contain them.
+    """
+    try:
+        summary = await asyncio.to_thread(sanctions_service.reload_screener)
+    except FileNotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    return SanctionsUpdateResponse(**summary)
+
+
 @router.get("/analytics", response_model=AnalyticsResponse)
 async def get_analytics():
     """
@@ -97,6 +97,28 @@ class BatchResponse(BaseModel):
     total_latency_ms: float
 
 
+class SanctionsDeltaRequest(BaseModel):
+    """Incremental sanctions list update (see SanctionsDelta)."""
+    version: str = Field(..., description="List version after the update")
+    upserts: List[dict] = Field(
+        default_factory=list,
+        description="Added or changed records (uid and name required; a listed uid is replaced)"
+    )
+    removed_uids: List[str] = Field(default_factory=list, description="uids of records to remove")
+    removed_entities: List[str] = Field(
+        default_factory=list, description="Entity ids (ent_num) whose records are all removed"
+    )
+
+
+class SanctionsUpdateResponse(BaseModel):
+    """Sanctions list state after a delta or reload."""
+    version: str
+    active_rows: int
+    added: Optional[int] = None
+    replaced: Optional[int] = None
+    removed: Optional[int] = None
+
+
 # Analytics schemas
 class AnalyticsSummary(BaseModel):
     """Summary metrics for analytics."""
@@ -54,5 +54,35 @@ class FeatureService:
             "velocity_24h": count_24h
         }
 
+    async def get_velocity_features_many(self, card_ids: list[str]) -> list[dict]:
+        """
+        Get and increment velocity counters for many cards in one round-trip.
+
+        Counters are incremented in order, so a card appearing several times
+        sees the same counts as consecutive get_velocity_features calls.
+        """
+        if not self.redis:
+            await self.connect()
+
+        pipe = self.redis.pipeline()
+        for card_id in card_ids:
+            key_1h = f"vel:{card_id}:1h"
+            key_24h = f"vel:{card_id}:24h"
+            pipe.incr(key_1h)
+            pipe.expire(key_1h, 3600) # 1 hour TTL
+            pipe.incr(key_24h)
+            pipe.expire(key_24h, 86400) # 24 hours TTL
+
+        results = await pipe.execute()
+
+        # Four results per card: [incr_1h, expire_1h, incr_24h, expire_24h]
+        return [
+            {
+                "velocity_1h": results[i],
+                "velocity_24h": results[i + 2]
+            }
+            for i in range(0, len(results), 4)
+        ]
+
 # Global instance
 feature_service = FeatureService()
@@ -1,23 +1,128 @@
-import lightgbm as lgb
-import pandas as pd
-import pickle
+import asyncio
 import os
-from typing import List, Dict, Any, Tuple
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+import lightgbm as lgb
+import numpy as np
+
 from ..config import settings
 from ..schemas.feature_factory import load_feature_registry
+from .inference import InferenceBatcher, InferenceExecutor
+
+
+class FeatureEncoder:
+    """
+    Encodes feature dicts straight into the float64 matrix LightGBM predicts on.
+
+    Column positions and category -> code maps are fixed once from the feature
+    registry and the booster's training categories (``pandas_categorical``).
+    The encoding matches what LightGBM does to a DataFrame with 'category'
+    columns: each category becomes its code in the training categories, and
+    unseen or missing values become NaN. Scores are therefore bit-identical
+    to predicting on the prepared DataFrame.
+    """
+
+    def __init__(
+        self,
+        feature_columns: Sequence[str],
+        categorical_features: Sequence[str],
+        pandas_categorical: Sequence[Sequence[Any]] | None
+    ):
+        self.feature_columns = list(feature_columns)
+        categorical = set(categorical_features)
+        # LightGBM keeps training categories in column order of the categorical columns
+        categorical_columns = [c for c in self.feature_columns if c in categorical]
+        training_categories = list(pandas_categorical or [])
+        if len(training_categories) != len(categorical_columns):
+            raise ValueError(
+                f"Model has categories for {len(training_categories)} features but the "
+                f"registry lists {len(categorical_columns)} categorical features"
+            )
+        codes = dict(zip(categorical_columns, training_categories))
+
+        self._numeric: Dict[str, int] = {}
+        self._categorical: Dict[str, Tuple[int, Dict[Any, float]]] = {}
+        # Training categories by column position, for decoding codes back to values
+        self._categories: Dict[int, List[Any]] = {}
+        for position, name in enumerate(self.feature_columns):
+            if name in codes:
+                self._categorical[name] = (
+                    position, {category: float(code) for code, category in enumerate(codes[name])}
+                )
+                self._categories[position] = list(codes[name])
+            else:
+                self._numeric[name] = position
+        self._buffers = threading.local()
+
+    @classmethod
+    def from_booster(cls, booster: lgb.Booster, registry: Dict[str, Any]) -> "FeatureEncoder":
+        """Build the encoder for ``booster`` from the feature registry."""
+        return cls(
+            registry.get("feature_columns", []),
+            registry.get("categorical_features", []),
+            booster.pandas_categorical
+        )
+
+    @property
+    def num_features(self) -> int:
+        return len(self.feature_columns)
+
+    def encode_into(self, features: dict, out: np.ndarray) -> np.ndarray:
+        """Write one feature dict into ``out`` (a float64 row); missing features are NaN."""
+        out.fill(np.nan)
+        for name, value in features.items():
+            if value is None:
+                continue
+            position = self._numeric.get(name)
+            if position is not None:
+                out[position] = float(value)
+                continue
+            categorical = self._categorical.get(name)
+            if categorical is not None:
+                position, codes = categorical
+                code = codes.get(value)
+                if code is not None:
+                    out[position] = code
+        return out
+
+    def encode(self, features: dict) -> np.ndarray:
+        """
+        Encode one feature dict as a (1, num_features) matrix.
+
+        The matrix is a per-thread buffer reused by the next call, so it is
+        only valid until then.
+        """
+        buffer = getattr(self._buffers, 'row', None)
+        if buffer is None:
+            buffer = self._buffers.row = np.empty((1, self.num_features), dtype=np.float64)
+        self.encode_into(features, buffer[0])
+        return buffer
+
+    def decode(self, position: int, value: float) -> Any:
+        """Feature value for an encoded cell: the category for categorical columns, None for NaN."""
+        if np.isnan(value):
+            return None
+        categories = self._categories.get(position)
+        if categories is not None:
+            return categories[int(value)]
+        return float(value)
 
 
 class FraudModelService:
     def __init__(self):
         self.model = None
-        self.explainer = None
         self.model_path = settings.MODEL_PATH
-        self.explainer_path = settings.EXPLAINER_PATH
+        # LightGBM threads per predict call (0 = LightGBM default, all cores)
+        self.num_threads = settings.MODEL_NUM_THREADS
         self.feature_columns = []
         self.categorical_features = []
+        self.encoder: FeatureEncoder | None = None
+        self.batcher: InferenceBatcher | None = None
+        self.executor: InferenceExecutor | None = None
 
     def load_model(self):
-        """Load LightGBM model and SHAP explainer from disk."""
+        """Load the LightGBM model from disk and build its feature encoder."""
         if not os.path.exists(self.model_path):
             raise FileNotFoundError(f"Model file not found at: {self.model_path}")
 
@@ -29,33 +134,60 @@ class FraudModelService:
         registry = load_feature_registry()
         self.feature_columns = registry.get("feature_columns", [])
         self.categorical_features = registry.get("categorical_features", [])
+        self.encoder = FeatureEncoder.from_booster(self.model, registry)
 
-        # Load SHAP explainer
-        if os.path.exists(self.explainer_path):
-            with open(self.explainer_path, 'rb') as f:
-                self.explainer = pickle.load(f)
-            print(f"Loaded SHAP Explainer from {self.explainer_path}")
-        else:
-            print(f"Warning: SHAP explainer not found at {self.explainer_path}")
+    def start_batcher(self, max_batch_size: int, max_wait_ms: float, max_queue_depth: int = 256):
+        """
+        Coalesce concurrent predict_async calls into batched predictions.
 
-    def _prepare_features(self, features: dict) -> pd.DataFrame:
-        """Prepare feature DataFrame from input dictionary."""
-        # Create DataFrame from the single dictionary
-        df = pd.DataFrame([features])
+        Rows arriving within max_wait_ms of each other (up to max_batch_size)
+        are scored in one Booster.predict call; see InferenceBatcher. Rows
+        beyond max_queue_depth waiting for a batch raise InferenceQueueFullError.
+        """
+        if not self.model:
+            self.load_model()
+        self.batcher = InferenceBatcher(
+            self.encoder, self._predict,
+            max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+            max_queue_depth=max_queue_depth
+        )
+        print(f"Started model inference batcher (max {max_batch_size} rows, {max_wait_ms} ms)")
 
-        # 1. Ensure all expected columns exist and are in the correct order
-        df = df.reindex(columns=self.feature_columns)
+    def stop_batcher(self):
+        """Stop the inference batcher (predict_async falls back to predict)."""
+        if self.batcher:
+            self.batcher.shutdown()
+            self.batcher = None
 
-        # 2. Cast numeric features to float
-        numeric_cols = [c for c in self.feature_columns if c not in self.categorical_features]
-        df[numeric_cols] = df[numeric_cols].astype(float)
+    def start_executor(self, workers: int, max_queue_depth: int):
+        """
+        Run async model calls on a dedicated bounded thread pool.
 
-        # 3. Cast categorical features to 'category' dtype
-        for col in self.categorical_features:
-            if col in df.columns:
-                df[col] = df[col].astype('category')
+        Without it they run in asyncio's default thread pool. Submissions
+        beyond workers + max_queue_depth raise InferenceQueueFullError.
+        """
+        if not self.model:
+            self.load_model()
+        self.executor = InferenceExecutor(workers=workers, max_queue_depth=max_queue_depth)
+        print(f"Started {workers} model inference workers ({self.num_threads or 'default'} LightGBM threads each)")
+
+    def stop_executor(self):
+        """Shut down the inference executor."""
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+    async def _run_async(self, fn, *args, **kwargs):
+        """Run a blocking model call off the event loop."""
+        if self.executor:
+            return await asyncio.wrap_future(self.executor.submit(fn, *args, **kwargs))
+        return await asyncio.to_thread(fn, *args, **kwargs)
 
-        return df
+    def _predict(self, matrix: np.ndarray, **kwargs) -> np.ndarray:
+        """Booster.predict with the configured LightGBM thread count."""
+        if self.num_threads:
+            kwargs['num_threads'] = self.num_threads
+        return self.model.predict(matrix, **kwargs)
 
     def predict(self, features: dict) -> float:
         """
@@ -70,15 +202,51 @@ class FraudModelService:
         if not self.model:
             self.load_model()
 
-        df = self._prepare_features(features)
-        prob = self.model.predict(df)[0]
+        prob = self._predict(self.encoder.encode(features))[0]
         return float(prob)
 
+    def predict_many(self, features_list: List[dict]) -> List[float]:
+        """
+        Run inference on many feature dictionaries in one Booster.predict call.
+
+        Args:
+            features_list: Feature dictionaries (feature_name -> value)
+
+        Returns:
+            Probability of fraud per dictionary, in order
+        """
+        if not self.model:
+            self.load_model()
+        if not features_list:
+            return []
+
+        matrix = np.empty((len(features_list), self.encoder.num_features), dtype=np.float64)
+        for row, features in zip(matrix, features_list):
+            self.encoder.encode_into(features, row)
+        return [float(prob) for prob in self._predict(matrix)]
+
+    async def predict_async(self, features: dict) -> float:
+        """
+        Run inference on a feature dictionary without blocking the event loop,
+        batched with concurrent requests when the inference batcher is running.
+        """
+        if self.batcher:
+            return await asyncio.wrap_future(self.batcher.submit(features))
+        return await self._run_async(self.predict, features)
+
+    async def predict_many_async(self, features_list: List[dict]) -> List[float]:
+        """predict_many on the inference executor."""
+        return await self._run_async(self.predict_many, features_list)
+
     def predict_with_explanation(
         self, features: dict, top_n: int = 5
     ) -> Tuple[float, List[Dict[str, Any]]]:
         """
-        Run inference and return SHAP-based feature importance.
+        Run inference and return the top TreeSHAP feature contributions.
+
+        The probability comes from ``predict`` and the contributions from a
+        separate ``pred_contrib`` pass (see ``explain``), so the score is
+        bit-identical to ``predict`` and ``predict_many``.
 
         Args:
             features: Dictionary of feature_name -> value
@@ -91,60 +259,57 @@ class FraudModelService:
         if not self.model:
             self.load_model()
 
-        df = self._prepare_features(features)
-
-        # Get prediction
-        prob = float(self.model.predict(df)[0])
-
-        # Get SHAP explanation if explainer is available
-        top_features = []
-        if self.explainer is not None:
-            try:
-                # Compute SHAP values for this instance
-                shap_values = self.explainer.shap_values(df)
-
-                # Handle SHAP output format (varies by version and model type):
-                # - Binary classifier (SHAP 0.45+): list of 2 arrays [class_0, class_1]
-                # - Binary classifier (older): 2D array [n_samples, n_features]
-                # - Single output: 1D or 2D array
-                if isinstance(shap_values, list):
-                    # Binary classifier returns list; use class 1 (fraud) values
-                    values = shap_values[1][0]  # [class_1][first_sample]
-                elif hasattr(shap_values, 'shape') and len(shap_values.shape) == 2:
-                    values = shap_values[0]  # First sample from 2D array
-                else:
-                    values = shap_values  # Already 1D
-
-                # Get feature names
-                feature_names = self.feature_columns
-
-                # Create list of (name, shap_value, feature_value) tuples
-                feature_contributions = []
-                for i, name in enumerate(feature_names):
-                    shap_val = float(values[i])
-                    feat_val = df.iloc[0][name]
-                    # Convert to Python native type
-                    if pd.isna(feat_val):
-                        feat_val = None
-                    elif hasattr(feat_val, 'item'):
-                        feat_val = feat_val.item()
-                    feature_contributions.append((name, shap_val, feat_val))
-
-                # Sort by absolute SHAP value (most impactful first)
-                feature_contributions.sort(key=lambda x: abs(x[1]), reverse=True)
-
-                # Take top N
-                for name, shap_val, feat_val in feature_contributions[:top_n]:
-                    top_features.append({
-                        "name": name,
-                        "value": feat_val,
-                        "contribution": round(shap_val, 4),
-                    })
-
-            except Exception as e:
-                print(f"Warning: SHAP explanation failed: {e}")
-
-        return prob, top_features
+        row = self.encoder.encode(features)
+        prob = float(self._predict(row)[0])
+        return prob, self._top_contributions(row, top_n)
+
+    def explain(self, features: dict, top_n: int = 5) -> List[Dict[str, Any]]:
+        """
+        Return the top SHAP feature contributions for a feature dictionary.
+
+        Contributions are exact TreeSHAP values computed by LightGBM itself
+        (``pred_contrib=True``), in log-odds; positive values increase risk.
+
+        Args:
+            features: Dictionary of feature_name -> value
+            top_n: Number of top contributing features to return
+
+        Returns:
+            List of dicts with keys: name, value, contribution
+        """
+        if not self.model:
+            self.load_model()
+
+        return self._top_contributions(self.encoder.encode(features), top_n)
+
+    async def explain_async(self, features: dict, top_n: int = 5) -> List[Dict[str, Any]]:
+        """explain on the inference executor."""
+        return await self._run_async(self.explain, features, top_n)
+
+    def _top_contributions(self, row: np.ndarray, top_n: int) -> List[Dict[str, Any]]:
+        """Top-N features of an encoded (1, n) row by absolute contribution."""
+        # One column per feature, then the expected value (bias)
+        contributions = self._predict(row, pred_contrib=True)[0, :-1]
+        top_n = min(top_n, len(contributions))
+        if top_n <= 0:
+            return []
+
+        # Largest |contribution| first, ties in feature order
+        magnitude = np.abs(contributions)
+        kth = np.partition(magnitude, len(magnitude) - top_n)[len(magnitude) - top_n]
+        above = np.flatnonzero(magnitude > kth)
+        ties = np.flatnonzero(magnitude == kth)[:top_n - len(above)]
+        top = np.concatenate([above, ties])
+        top = top[np.lexsort((top, -magnitude[top]))]
+
+        return [
+            {
+                "name": self.feature_columns[i],
+                "value": self.encoder.decode(i, row[0, i]),
+                "contribution": round(float(contributions[i]), 4),
+            }
+            for i in top
+        ]
 
 
 # Global instance
@@ -0,0 +1,329 @@
+"""
+Fraud model inference scheduling: micro-batching and a bounded executor.
+
+Every /score request scores a single row, and at one row LightGBM's per-call
+overhead dominates the prediction itself. The batcher coalesces rows that
+arrive close together into one ``Booster.predict`` call: a background thread
+takes the first waiting row, keeps collecting until ``max_batch_size`` rows or
+``max_wait_ms`` after that row was submitted, encodes the batch into a reused
+matrix and resolves each caller's future with its own score. Rows that queued
+while the previous batch ran are taken at once, so a busy batcher forms
+larger batches without adding wait. At most ``max_queue_depth`` rows wait
+for a batch; further rows raise ``InferenceQueueFullError`` like the executor.
+
+Model work that is not batched (explanations, whole-batch scoring) runs on
+``InferenceExecutor``, a bounded thread pool, instead of the event loop.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Queued work item: (features, future, submitted_at)
+_Request = Tuple[dict, "Future[float]", float]
+
+
+def _percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """Summarize samples as p50/p95/p99/max."""
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    values = np.asarray(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'max': float(values.max())}
+
+
+class InferenceQueueFullError(RuntimeError):
+    """Raised when a submission would exceed an inference queue's depth."""
+
+
+class InferenceBatcher:
+    """
+    Coalesces single-row predictions into batched ``predict`` calls.
+
+    Attributes:
+        max_batch_size: Most rows scored in one predict call
+        max_wait_ms: Longest a row waits for others to join its batch
+        max_queue_depth: Rows allowed to wait for a batch
+    """
+
+    def __init__(
+        self,
+        encoder: Any,
+        predict: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 1.0,
+        max_queue_depth: int = 256,
+        metrics_window: int = 1024
+    ):
+        """
+        Start the batching thread.
+
+        Args:
+            encoder: FeatureEncoder writing feature dicts into matrix rows
+            predict: Scores a float64 matrix (e.g. ``Booster.predict``)
+            max_batch_size: Most rows scored in one predict call
+            max_wait_ms: Longest a row waits for others to join its batch
+            max_queue_depth: Rows allowed to wait for a batch
+            metrics_window: Number of recent batches kept for percentiles
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+        if max_wait_ms < 0:
+            raise ValueError(f"max_wait_ms must be >= 0, got {max_wait_ms}")
+        if max_queue_depth < 1:
+            raise ValueError(f"max_queue_depth must be >= 1, got {max_queue_depth}")
+        self.encoder = encoder
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_depth = max_queue_depth
+
+        self._queue: "queue.SimpleQueue[Optional[_Request]]" = queue.SimpleQueue()
+        self._buffer = np.empty((max_batch_size, encoder.num_features), dtype=np.float64)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._batch_sizes: Deque[int] = deque(maxlen=metrics_window)
+        self._queue_waits: Deque[float] = deque(maxlen=metrics_window)
+        self._histogram: Counter = Counter()
+        self.queued = 0
+        self.batches = 0
+        self.rows = 0
+        self.failed = 0
+        self.rejected = 0
+
+        self._thread = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, features: dict) -> "Future[float]":
+        """
+        Queue one row for scoring.
+
+        Returns:
+            Future resolving to the row's fraud probability
+
+        Raises:
+            InferenceQueueFullError: If max_queue_depth rows are already waiting
+            RuntimeError: If the batcher has been shut down
+        """
+        future: "Future[float]" = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Inference batcher is shut down")
+            if self.queued >= self.max_queue_depth:
+                self.rejected += 1
+                raise InferenceQueueFullError(
+                    f"Inference batch queue is full ({self.max_queue_depth} rows waiting)"
+                )
+            self.queued += 1
+            self._queue.put((features, future, time.perf_counter()))
+        return future
+
+    def _run(self) -> None:
+        max_wait = self.max_wait_ms / 1000
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            window_end = request[2] + max_wait
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                timeout = window_end - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._score(batch)
+            if stopping:
+                return
+
+    def _score(self, batch: List[_Request]) -> None:
+        """Encode and score one batch, resolving each request's future."""
+        started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= len(batch)
+        live: List[Tuple["Future[float]", float]] = []
+        for features, future, submitted_at in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self.encoder.encode_into(features, self._buffer[len(live)])
+            except Exception as error:
+                future.set_exception(error)
+                continue
+            live.append((future, submitted_at))
+        if not live:
+            return
+
+        try:
+            scores = self.predict(self._buffer[:len(live)])
+        except Exception as error:
+            for future, _ in live:
+                future.set_exception(error)
+            with self._lock:
+                self.failed += len(live)
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.rows += len(live)
+            self._batch_sizes.append(len(live))
+            self._histogram[len(live)] += 1
+            self._queue_waits.extend((started_at - submitted_at) * 1000 for _, submitted_at in live)
+        for (future, _), score in zip(live, scores):
+            future.set_result(float(score))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch-size distribution and queue wait (ms) for monitoring."""
+        with self._lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'max_queue_depth': self.max_queue_depth,
+                'queued': self.queued,
+                'rejected': self.rejected,
+                'batches': self.batches,
+                'rows': self.rows,
+                'failed': self.failed,
+                'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+                'batch_size': _percentiles(list(self._batch_sizes)),
+                'batch_size_histogram': {size: count for size, count in sorted(self._histogram.items())},
+                'queue_wait_ms': _percentiles(list(self._queue_waits))
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting rows; rows already queued are still scored."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+
+class InferenceExecutor:
+    """
+    Bounded thread pool for model work (explanations, batch scoring).
+
+    Keeps LightGBM and feature encoding off the event loop so Redis, audit and
+    screening I/O of other requests proceed while a model call runs (LightGBM
+    releases the GIL while predicting). At most ``workers + max_queue_depth``
+    calls are in flight; further submissions raise ``InferenceQueueFullError`` so
+    callers can shed load. Queue wait and service time are recorded for
+    monitoring.
+
+    Attributes:
+        workers: Number of inference threads
+        max_queue_depth: Calls allowed to wait for a free thread
+    """
+
+    def __init__(self, workers: int = 1, max_queue_depth: int = 64, metrics_window: int = 1024):
+        """
+        Start the pool.
+
+        Args:
+            workers: Inference threads
+            max_queue_depth: Calls allowed to wait for a free thread
+            metrics_window: Number of recent calls kept for timing percentiles
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if max_queue_depth < 0:
+            raise ValueError(f"max_queue_depth must be >= 0, got {max_queue_depth}")
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+        self._slots = threading.BoundedSemaphore(workers + max_queue_depth)
+        self._lock = threading.Lock()
+
+        self._queue_waits: Deque[float] = deque(maxlen=metrics_window)
+        self._service_times: Deque[float] = deque(maxlen=metrics_window)
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Run ``fn(*args, **kwargs)`` on an inference thread.
+
+        Returns:
+            Future resolving to the call's result
+
+        Raises:
+            InferenceQueueFullError: If the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise InferenceQueueFullError(
+                f"Inference queue is full ({self.workers} workers, {self.max_queue_depth} queued)"
+            )
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+
+        submitted_at = time.perf_counter()
+
+        def _run() -> Any:
+            started_at = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finished_at = time.perf_counter()
+                with self._lock:
+                    self._queue_waits.append((started_at - submitted_at) * 1000)
+                    self._service_times.append((finished_at - started_at) * 1000)
+
+        try:
+            future = self._pool.submit(_run)
+        except BaseException:
+            self._finish(failed=True)
+            raise
+        future.add_done_callback(
+            lambda done: self._finish(failed=done.cancelled() or done.exception() is not None)
+        )
+        return future
+
+    def _finish(self, failed: bool) -> None:
+        """Release a queue slot and record the outcome."""
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, counters and timing percentiles (ms) for monitoring."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_queue_depth': self.max_queue_depth,
+                'in_flight': self.in_flight,
+                'queued': max(self.in_flight - self.workers, 0),
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'queue_wait_ms': _percentiles(list(self._queue_waits)),
+                'service_ms': _percentiles(list(self._service_times))
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pool (queued calls are cancelled)."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -1,31 +1,171 @@
+import asyncio
 import pickle
 import os
+import threading
 from ..config import settings
-from packages.compliance.sanctions_api import SanctionsScreener, SanctionsQuery, SanctionsResponse
+from packages.compliance.sanctions_api import (
+    SanctionsScreener, SanctionsQuery, SanctionsResponse, SanctionsDelta
+)
+from packages.compliance.artifact import is_artifact
+from packages.compliance.executor import ScreeningExecutor
 
 class SanctionsService:
     def __init__(self):
         self.screener: SanctionsScreener | None = None
         self.screener_path = settings.SCREENER_PATH
+        self.executor: ScreeningExecutor | None = None
+        # False once deltas make the in-memory list differ from SCREENER_PATH
+        self._matches_source = False
+        # Serializes list updates (reloads and deltas from the admin endpoints)
+        self._update_lock = threading.Lock()
 
-    def load_screener(self):
-        """Load the pre-trained sanctions screener pickle."""
+    def _open_screener(self) -> SanctionsScreener:
         if not os.path.exists(self.screener_path):
             raise FileNotFoundError(f"Screener file not found at: {self.screener_path}")
-            
+
+        if is_artifact(self.screener_path):
+            return SanctionsScreener.open_artifact(self.screener_path)
+
         with open(self.screener_path, 'rb') as f:
-            self.screener = pickle.load(f)
-        print(f"Loaded Sanctions Screener from {self.screener_path}")
+            return pickle.load(f)
+
+    def load_screener(self):
+        """
+        Load the sanctions screener.
+
+        SCREENER_PATH may point to a memory-mapped artifact directory (preferred:
+        near-instant, shared across workers, no unpickling) or a legacy pickle.
+        """
+        self.screener = self._open_screener()
+        self._matches_source = True
+        print(f"Loaded Sanctions Screener {self.screener.version} from {self.screener_path}")
+
+    def reload_screener(self):
+        """
+        Reload SCREENER_PATH without restarting the API.
+
+        The new screener is fully loaded before it replaces the current one, so
+        in-flight screens finish on the old screener. Rebuilding an artifact at
+        SCREENER_PATH (make build-index) before calling this is safe: artifacts
+        are replaced atomically, so this process and the screening workers keep
+        reading the generation they mapped until they reopen. Routine list
+        changes should use apply_delta instead.
+
+        Returns:
+            Summary with the list 'version' and number of 'active_rows'
+        """
+        with self._update_lock:
+            screener = self._open_screener()
+            self.screener = screener
+            self._matches_source = True
+            self._publish()
+        print(f"Reloaded Sanctions Screener {screener.version} from {self.screener_path}")
+        return {'version': screener.version, 'active_rows': screener.snapshot.active_rows}
+
+    def start_executor(self, workers: int, max_queue_depth: int):
+        """
+        Screen in a pool of worker processes instead of API threads.
+
+        Workers memory-map the screener artifact. A pickled screener is exported
+        to a temporary artifact first.
+        """
+        if not self.screener:
+            self.load_screener()
+        self.executor = ScreeningExecutor(workers=workers, max_queue_depth=max_queue_depth)
+        self._publish()
+        self.executor.warm_up()
+        print(f"Started {self.executor.workers} sanctions screening workers")
+
+    def stop_executor(self):
+        """Shut down the screening worker pool (screens fall back to threads)."""
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+    def _publish(self):
+        """
+        Point the screening workers at the current list.
+
+        An unmodified artifact at SCREENER_PATH is shared as is; workers reopen
+        the same path, which save_artifact only ever replaces atomically.
+        Anything else (a pickle, or a list changed by deltas) is exported to a
+        new artifact path first.
+        """
+        if not self.executor:
+            return
+        if self._matches_source and is_artifact(self.screener_path):
+            self.executor.set_artifact(self.screener_path)
+        else:
+            self.executor.publish(self.screener)
+
+    def apply_delta(self, delta: SanctionsDelta | dict) -> dict:
+        """
+        Apply an incremental sanctions list update in place (no reload).
+
+        Args:
+            delta: SanctionsDelta or its dict form (version, upserts,
+                removed_uids, removed_entities)
 
-    def screen_name(self, name: str, country: str = None) -> SanctionsResponse:
+        Returns:
+            Summary with the new list version and record counts
+        """
+        if isinstance(delta, dict):
+            delta = SanctionsDelta.from_dict(delta)
+        with self._update_lock:
+            if not self.screener:
+                self.load_screener()
+            summary = self.screener.apply_delta(delta)
+            self._matches_source = False
+            self._publish()
+        print(f"Applied sanctions delta: {summary}")
+        return summary
+
+    def screen_name(self, name: str, country: str = None, deadline_ms: float | None = None) -> SanctionsResponse:
         """
         Screen a name against the loaded sanctions list.
+
+        With ``deadline_ms``, screening stops when the budget runs out and
+        the response has ``complete=False``.
         """
         if not self.screener:
             self.load_screener()
 
         query = SanctionsQuery(name=name, country=country)
-        return self.screener.screen(query)
+        return self.screener.screen(query, deadline_ms=deadline_ms)
+
+    def screen_names(self, items: list[tuple[str, str | None]]) -> list[SanctionsResponse]:
+        """
+        Screen many (name, country) pairs in one vectorized pass.
+
+        Repeated names are screened once; see SanctionsScreener.screen_many.
+        """
+        if not self.screener:
+            self.load_screener()
+
+        queries = [SanctionsQuery(name=name, country=country) for name, country in items]
+        return self.screener.screen_many(queries)
+
+    async def screen_name_async(
+        self, name: str, country: str = None, deadline_ms: float | None = None
+    ) -> SanctionsResponse:
+        """
+        Screen a name without blocking the event loop.
+
+        Runs in the screening worker pool when it is enabled (raises
+        ScreeningQueueFullError when its queue is full), otherwise in a thread.
+        """
+        if self.executor:
+            query = SanctionsQuery(name=name, country=country)
+            responses = await asyncio.wrap_future(self.executor.submit([query], deadline_ms=deadline_ms))
+            return responses[0]
+        return await asyncio.to_thread(self.screen_name, name, country, deadline_ms)
+
+    async def screen_names_async(self, items: list[tuple[str, str | None]]) -> list[SanctionsResponse]:
+        """Screen many (name, country) pairs without blocking the event loop."""
+        if self.executor:
+            queries = [SanctionsQuery(name=name, country=country) for name, country in items]
+            return await asyncio.wrap_future(self.executor.submit(queries))
+        return await asyncio.to_thread(self.screen_names, items)
 
 # Global instance
 sanctions_service = SanctionsService()
@@ -9,12 +9,15 @@ from packages.compliance.sanctions_api import (
     SanctionsQuery,
     SanctionsMatch,
     SanctionsResponse,
-    SanctionsScreener
+    SanctionsScreener,
+    SanctionsDelta
 )
 
 from packages.compliance.sanctions import (
     normalize_text,
-    tokenize
+    normalize_series,
+    tokenize,
+    tokenize_series
 )
 
 __all__ = [
@@ -23,7 +26,10 @@ __all__ = [
     'SanctionsMatch',
     'SanctionsResponse',
     'SanctionsScreener',
+    'SanctionsDelta',
     # Utility functions
     'normalize_text',
-    'tokenize'
+    'normalize_series',
+    'tokenize',
+    'tokenize_series'
 ]
\ No newline at end of file
@@ -0,0 +1,423 @@
+"""
+Pickle-free, memory-mapped on-disk format for the sanctions screener.
+
+An artifact is a directory holding one ``.npy`` file per array plus a
+``manifest.json`` describing them. Array files carry the generation of the
+save that wrote them::
+
+    sanctions_screener/
+        manifest.json
+        name_norm.data.<gen>.npy      name_norm.offsets.<gen>.npy
+        uid.data.<gen>.npy            uid.offsets.<gen>.npy     (also name, entity_id)
+        name_group.<gen>.npy          entity_group.<gen>.npy    (alias collapsing)
+        country.codes.<gen>.npy       country.categories.data.<gen>.npy ...
+        postings.first_token.offsets.<gen>.npy  postings.first_token.rows.<gen>.npy ...
+        ann.vectors.<gen>.npy  ann.centroids.<gen>.npy  ann.offsets.<gen>.npy  ann.rows.<gen>.npy
+
+Strings are stored as a UTF-8 byte blob plus int64 offsets, low-cardinality
+columns (country, program, source) as int32 codes into a small category
+table, blocking indexes as CSR posting lists and the Stage 2 ANN index (when
+built) as its embedding matrix plus CSR inverted lists. Rows removed by list deltas
+are kept and masked out by an optional ``active`` array. Arrays are opened with
+``np.load(mmap_mode='r')``, so opening is near-instant, pages are only read
+when touched and every worker process on the host shares the same physical
+pages through the OS page cache. Only ``name_norm`` (the strings RapidFuzz
+scores) and the posting-list keys are decoded at open; other metadata is
+decoded per returned match.
+
+Saving over an existing artifact never modifies a file another process may
+have mapped: the new generation is written beside the old one and the
+manifest is swapped in with an atomic rename, so readers see either the old
+or the new artifact, never a mix. Files of the previous generation are kept
+(a reader may have read the old manifest just before the swap); older ones
+are removed, which leaves existing mappings intact because they hold the
+inode, not the name.
+
+Nothing in the format is executable, so artifacts can be opened without
+trusting their producer the way a pickle must be.
+"""
+
+import hashlib
+import json
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Union
+
+import numpy as np
+
+from packages.compliance.blocking import HashedNgramIndex, PostingLists
+
+ARTIFACT_FORMAT = 'sentinel-sanctions-screener'
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+# Posting lists persisted with the artifact (blocking maps + filter push-down)
+BLOCKING_POSTINGS = ('first_token', 'bucket', 'initials', 'phonetic')
+FILTER_POSTINGS = ('country', 'program')
+
+# Screener options restored on open (overridable by keyword arguments)
+SCREENER_OPTIONS = (
+    'scoring_workers', 'blocking_strategy', 'ngram_candidates', 'cache_size',
+    'cache_ttl_seconds', 'score_pruning', 'phonetic_blocking', 'stage2_strategy',
+    'ann_candidates', 'ann_probes', 'latency_budget_ms'
+)
+
+
+class ArtifactError(ValueError):
+    """Raised when an artifact is missing, corrupt or of an unsupported version."""
+
+
+class StringColumn:
+    """
+    Read-only string column backed by a UTF-8 blob and offsets.
+
+    Strings are decoded on access, so a memory-mapped column costs nothing
+    until rows are read. Missing values are tracked with an optional mask.
+
+    Attributes:
+        data: UTF-8 bytes of all strings (uint8)
+        offsets: Start offset of each string (len + 1 entries, int64)
+        missing: Optional boolean mask of missing (None) values
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, missing: Optional[np.ndarray] = None):
+        self.data = data
+        self.offsets = offsets
+        self.missing = missing
+
+    @classmethod
+    def encode(cls, values: Sequence[Optional[str]]) -> "StringColumn":
+        """Encode a sequence of strings (None allowed) as a column."""
+        encoded = [b'' if v is None else str(v).encode('utf-8') for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        missing = np.array([v is None for v in values], dtype=bool)
+        return cls(data, offsets, missing if missing.any() else None)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> Optional[str]:
+        idx = int(idx)
+        if self.missing is not None and self.missing[idx]:
+            return None
+        return self.data[self.offsets[idx]:self.offsets[idx + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return iter(self.to_list())
+
+    def to_list(self) -> List[Optional[str]]:
+        """Decode every string (one pass over the blob)."""
+        blob = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        values: List[Optional[str]] = [
+            blob[start:end].decode('utf-8') for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        if self.missing is not None:
+            for idx in np.flatnonzero(self.missing):
+                values[idx] = None
+        return values
+
+    def to_array(self) -> np.ndarray:
+        """Decode every string into an object array."""
+        out = np.empty(len(self), dtype=object)
+        out[:] = self.to_list()
+        return out
+
+
+class CategoricalColumn:
+    """
+    Read-only low-cardinality column: int32 codes into a category table.
+
+    Attributes:
+        codes: Category code per row (-1 = missing)
+        categories: Category values
+    """
+
+    def __init__(self, codes: np.ndarray, categories: Sequence[str]):
+        self.codes = codes
+        self.categories = np.empty(len(categories) + 1, dtype=object)
+        self.categories[:-1] = list(categories)
+        self.categories[-1] = None
+
+    @staticmethod
+    def factorize(values: Sequence[Optional[str]]) -> tuple[np.ndarray, List[str]]:
+        """Return (codes, categories) for a sequence of values (None -> -1)."""
+        lookup: Dict[str, int] = {}
+        codes = np.fromiter(
+            (-1 if v is None else lookup.setdefault(v, len(lookup)) for v in values),
+            dtype=np.int32,
+            count=len(values)
+        )
+        return codes, list(lookup)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, idx: int) -> Optional[str]:
+        return self.categories[self.codes[idx]]
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return iter(self.categories[self.codes].tolist())
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _ArtifactWriter:
+    """Write arrays into an artifact directory and record them for the manifest."""
+
+    def __init__(self, path: Path, generation: str):
+        self.path = path
+        self.generation = generation
+        self.arrays: Dict[str, Dict[str, Any]] = {}
+
+    def array(self, name: str, values: np.ndarray) -> None:
+        values = np.ascontiguousarray(values)
+        file_name = f'{name}.{self.generation}.npy'
+        np.save(self.path / file_name, values, allow_pickle=False)
+        self.arrays[name] = {
+            'file': file_name,
+            'dtype': values.dtype.str,
+            'shape': list(values.shape),
+            'sha256': _sha256(self.path / file_name)
+        }
+
+    def strings(self, name: str, values: Sequence[Optional[str]]) -> None:
+        column = StringColumn.encode(values)
+        self.array(f'{name}.data', column.data)
+        self.array(f'{name}.offsets', column.offsets)
+        if column.missing is not None:
+            self.array(f'{name}.missing', column.missing)
+
+    def categorical(self, name: str, values: Sequence[Optional[str]]) -> None:
+        codes, categories = CategoricalColumn.factorize(values)
+        self.array(f'{name}.codes', codes)
+        self.strings(f'{name}.categories', categories)
+
+    def postings(self, name: str, postings: PostingLists) -> None:
+        self.strings(f'postings.{name}.keys', postings.keys)
+        self.array(f'postings.{name}.offsets', postings.offsets)
+        self.array(f'postings.{name}.rows', postings.rows)
+
+    def ann(self, index: HashedNgramIndex) -> Dict[str, Any]:
+        for name in ('vectors', 'centroids', 'offsets', 'rows'):
+            self.array(f'ann.{name}', getattr(index, name))
+        return {'n': index.n, 'probes': index.probes}
+
+
+class _ArtifactReader:
+    """Open arrays listed in a manifest, memory-mapped by default."""
+
+    def __init__(self, path: Path, manifest: Dict[str, Any], mmap: bool, verify: bool):
+        self.path = path
+        self.arrays = manifest['arrays']
+        self.mmap_mode = 'r' if mmap else None
+        self.verify = verify
+
+    def array(self, name: str) -> np.ndarray:
+        spec = self.arrays.get(name)
+        if spec is None:
+            raise ArtifactError(f"Artifact {self.path} is missing array '{name}'")
+        file_path = self.path / spec['file']
+        if self.verify and _sha256(file_path) != spec['sha256']:
+            raise ArtifactError(f"Checksum mismatch for {file_path}")
+        values = np.load(file_path, mmap_mode=self.mmap_mode, allow_pickle=False)
+        if values.dtype.str != spec['dtype'] or list(values.shape) != spec['shape']:
+            raise ArtifactError(f"Array {file_path} does not match the manifest")
+        return values
+
+    def strings(self, name: str) -> StringColumn:
+        missing = self.array(f'{name}.missing') if f'{name}.missing' in self.arrays else None
+        return StringColumn(self.array(f'{name}.data'), self.array(f'{name}.offsets'), missing)
+
+    def categorical(self, name: str) -> CategoricalColumn:
+        return CategoricalColumn(
+            self.array(f'{name}.codes'), self.strings(f'{name}.categories').to_list()
+        )
+
+    def postings(self, name: str) -> PostingLists:
+        return PostingLists(
+            self.strings(f'postings.{name}.keys').to_list(),
+            self.array(f'postings.{name}.offsets'),
+            self.array(f'postings.{name}.rows')
+        )
+
+    def ann(self, options: Dict[str, Any]) -> HashedNgramIndex:
+        return HashedNgramIndex(
+            self.array('ann.vectors'),
+            self.array('ann.centroids'),
+            self.array('ann.offsets'),
+            self.array('ann.rows'),
+            **options
+        )
+
+
+def is_artifact(path: Union[str, Path]) -> bool:
+    """Return True if ``path`` is an artifact directory (has a manifest)."""
+    return (Path(path) / MANIFEST_FILE).is_file()
+
+
+def read_manifest(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read and validate an artifact manifest.
+
+    Raises:
+        ArtifactError: If the manifest is missing or has an unsupported format
+    """
+    manifest_path = Path(path) / MANIFEST_FILE
+    if not manifest_path.is_file():
+        raise ArtifactError(f"No {MANIFEST_FILE} in {path}")
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ArtifactError(f"{path} is not a sanctions screener artifact")
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ArtifactError(
+            f"Unsupported artifact format version {manifest.get('format_version')} "
+            f"(expected {ARTIFACT_FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def save_artifact(
+    screener: Any,
+    path: Union[str, Path],
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Write a screener to an artifact directory.
+
+    Args:
+        screener: SanctionsScreener to persist
+        path: Output directory (created if needed). An existing artifact there is
+            replaced atomically; processes that have it open keep reading the
+            previous generation until they reopen
+        metadata: Optional JSON-serializable build information stored in the manifest
+
+    Returns:
+        The manifest that was written
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    previous = _referenced_files(path)
+    writer = _ArtifactWriter(path, uuid.uuid4().hex[:12])
+    snapshot = screener.snapshot
+    store = snapshot.store
+
+    writer.strings('name_norm', list(store.name_norm))
+    writer.strings('name', list(store.name))
+    writer.strings('uid', list(store.uid))
+    writer.strings('entity_id', [None if e is None else str(e) for e in store.entity_id])
+    for column in ('country', 'program', 'source'):
+        writer.categorical(column, list(getattr(store, column)))
+    writer.array('name_group', store.name_group)
+    writer.array('entity_group', store.entity_group)
+    for name in BLOCKING_POSTINGS:
+        writer.postings(name, snapshot.postings[name])
+    for name in FILTER_POSTINGS:
+        writer.postings(f'filter.{name}', snapshot.filter_postings[name])
+    if snapshot.active is not None:
+        writer.array('active', snapshot.active)
+    ann = writer.ann(snapshot.ann_index) if snapshot.ann_index is not None else None
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'version': snapshot.version,
+        'generation': writer.generation,
+        'created_at': datetime.utcnow().isoformat(),
+        'rows': len(store),
+        'screener': {option: getattr(screener, option) for option in SCREENER_OPTIONS},
+        'arrays': writer.arrays
+    }
+    if ann is not None:
+        manifest['ann'] = ann
+    if metadata:
+        manifest['metadata'] = metadata
+    # Manifest last: until the rename, the directory still describes the
+    # previous generation, whose files were not touched
+    tmp_path = path / f'{MANIFEST_FILE}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    tmp_path.replace(path / MANIFEST_FILE)
+
+    keep = previous | {entry['file'] for entry in writer.arrays.values()}
+    for stale in path.glob('*.npy'):
+        if stale.name not in keep:
+            stale.unlink(missing_ok=True)
+    return manifest
+
+
+def _referenced_files(path: Path) -> Set[str]:
+    """Return the array files named by the manifest currently in ``path``."""
+    manifest_path = path / MANIFEST_FILE
+    if not manifest_path.is_file():
+        return set()
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            arrays = json.load(f).get('arrays', {})
+        return {entry['file'] for entry in arrays.values()}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return set()
+
+
+def load_artifact_state(
+    path: Union[str, Path],
+    mmap: bool = True,
+    verify: bool = False
+) -> Dict[str, Any]:
+    """
+    Open an artifact and return the pieces needed to build a screener.
+
+    Args:
+        path: Artifact directory
+        mmap: Memory-map arrays instead of reading them into private memory
+        verify: Check every array's SHA-256 against the manifest (reads all pages)
+
+    Returns:
+        Dict with 'manifest', 'columns' (store columns), 'postings',
+        'filter_postings', 'active' (live-row mask or None) and 'ann_index'
+        (Stage 2 ANN index or None)
+
+    Raises:
+        ArtifactError: If the artifact is missing, corrupt or unsupported
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    reader = _ArtifactReader(path, manifest, mmap=mmap, verify=verify)
+
+    columns = {
+        'name_norm': reader.strings('name_norm').to_array(),
+        'name': reader.strings('name'),
+        'uid': reader.strings('uid'),
+        'country': reader.categorical('country'),
+        'program': reader.categorical('program'),
+        'source': reader.categorical('source'),
+        'entity_id': (
+            reader.strings('entity_id') if 'entity_id.offsets' in reader.arrays
+            else np.full(manifest['rows'], None, dtype=object)
+        )
+    }
+    # Scoring-unit and entity ids (computed on open for older artifacts)
+    for name in ('name_group', 'entity_group'):
+        if name in reader.arrays:
+            columns[name] = reader.array(name)
+    if len(columns['name_norm']) != manifest['rows']:
+        raise ArtifactError(f"Artifact {path} row count does not match the manifest")
+
+    return {
+        'manifest': manifest,
+        'columns': columns,
+        'postings': {name: reader.postings(name) for name in BLOCKING_POSTINGS},
+        'filter_postings': {name: reader.postings(f'filter.{name}') for name in FILTER_POSTINGS},
+        'active': np.asarray(reader.array('active')) if 'active' in reader.arrays else None,
+        'ann_index': reader.ann(manifest['ann']) if 'ann' in manifest else None
+    }
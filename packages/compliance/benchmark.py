@@ -0,0 +1,424 @@
+"""
+Sanctions screening benchmark with recall/latency regression gates.
+
+Usage:
+    python -m packages.compliance.benchmark                 # compare with the baseline
+    python -m packages.compliance.benchmark --write-baseline
+
+Replays the labelled evaluation queries
+(``data_catalog/processed/sanctions_eval_labels.csv``) plus synthetic
+perturbations of list names (typos, reordered tokens, dropped middle names)
+through ``SanctionsScreener.screen``. It reports latency percentiles,
+candidates scored per query, the Stage 2 expansion rate and recall@k.
+``--deadline-ms`` screens under a latency budget and also reports the share
+of screens it cut short.
+
+The run fails (exit code 1) when a metric regresses past its tolerance
+against the baseline file, or misses one of the module's targets
+(p95 < 50ms, recall@3 >= 98%, precision@1 >= 95%). Latency depends on the
+host, so record the baseline on the machine that runs the gate
+(``--write-baseline``), or pass ``--no-latency-gates`` on shared runners.
+
+Matches are judged per entity: any name (primary or alias) of the expected
+sanctioned entity counts as a hit.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import json
+import pickle
+import random
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from packages.compliance.artifact import is_artifact
+from packages.compliance.sanctions import tokenize
+from packages.compliance.sanctions_api import SanctionsQuery, SanctionsScreener
+
+DEFAULT_LABELS = 'data_catalog/processed/sanctions_eval_labels.csv'
+DEFAULT_NAMES = 'data_catalog/processed/sanctions_names.parquet'
+DEFAULT_BASELINE = 'packages/models/sanctions_benchmark_baseline.json'
+
+# Targets the screening module is designed for
+TARGETS = {
+    'recall_at_k': ('min', 0.98),
+    'precision_at_1': ('min', 0.95),
+    'latency_p95_ms': ('max', 50.0),
+}
+
+# Regression gates: metric -> (direction, 'abs' or 'rel', tolerance)
+GATES = {
+    'recall_at_k': ('min', 'abs', 0.005),
+    'precision_at_1': ('min', 'abs', 0.01),
+    'fpr_at_threshold_90': ('max', 'abs', 0.0),
+    'candidates_scored_mean': ('max', 'rel', 0.10),
+    'stage2_rate': ('max', 'abs', 0.02),
+    'latency_p50_ms': ('max', 'rel', 0.25),
+    'latency_p95_ms': ('max', 'rel', 0.25),
+    'latency_p99_ms': ('max', 'rel', 0.50),
+}
+LATENCY_METRICS = ('latency_p50_ms', 'latency_p95_ms', 'latency_p99_ms')
+
+# Settings that must match between a run and its baseline
+COMPARABLE_SETTINGS = ('k', 'synthetic', 'seed', 'labels', 'deadline_ms')
+
+_NAME_TOKENS = re.compile(r"[^\s,]+")
+
+
+@dataclass
+class BenchmarkQuery:
+    """
+    A benchmark query.
+
+    Attributes:
+        query: Name to screen
+        entity: Expected entity key (see ``entity_key``), None for non-matches
+        variation: Variation type ('exact', 'typo', 'synthetic_reorder', ...)
+    """
+    query: str
+    entity: Optional[str]
+    variation: str
+
+
+def entity_key(uid: str) -> str:
+    """
+    Entity a list record belongs to (aliases share their primary's key).
+
+    Examples:
+        >>> entity_key("SDN_18730_alt_2")
+        'SDN_18730'
+    """
+    return uid.split('_alt_')[0]
+
+
+def _name_tokens(name: str) -> List[str]:
+    return _NAME_TOKENS.findall(name)
+
+
+def typo(name: str, rng: random.Random) -> Optional[str]:
+    """Apply one keyboard-style edit (swap, drop, double or replace a letter) inside a token."""
+    tokens = _name_tokens(name)
+    candidates = [i for i, t in enumerate(tokens) if len(t) >= 4 and t.isalpha()]
+    if not candidates:
+        return None
+    i = rng.choice(candidates)
+    token = tokens[i]
+    pos = rng.randrange(1, len(token) - 1)
+    edit = rng.choice(('swap', 'drop', 'double', 'replace'))
+    if edit == 'swap':
+        token = token[:pos] + token[pos + 1] + token[pos] + token[pos + 2:]
+    elif edit == 'drop':
+        token = token[:pos] + token[pos + 1:]
+    elif edit == 'double':
+        token = token[:pos] + token[pos] + token[pos:]
+    else:
+        letter = rng.choice('aeiou' if token[pos].lower() in 'aeiou' else 'bcdfghklmnprst')
+        token = token[:pos] + (letter.upper() if token[pos].isupper() else letter) + token[pos + 1:]
+    tokens[i] = token
+    return ' '.join(tokens)
+
+
+def reorder_tokens(name: str, rng: random.Random) -> Optional[str]:
+    """Move the first token to the end ("SALHAB, Azzam" -> "Azzam SALHAB")."""
+    tokens = _name_tokens(name)
+    if len(tokens) < 2:
+        return None
+    return ' '.join(tokens[1:] + tokens[:1])
+
+
+def drop_middle_name(name: str, rng: random.Random) -> Optional[str]:
+    """Drop one token that is neither the first nor the last."""
+    tokens = _name_tokens(name)
+    if len(tokens) < 3:
+        return None
+    del tokens[rng.randrange(1, len(tokens) - 1)]
+    return ' '.join(tokens)
+
+
+PERTURBATIONS: Dict[str, Callable[[str, random.Random], Optional[str]]] = {
+    'synthetic_typo': typo,
+    'synthetic_reorder': reorder_tokens,
+    'synthetic_drop_middle': drop_middle_name,
+}
+
+
+def load_eval_queries(path: str = DEFAULT_LABELS) -> List[BenchmarkQuery]:
+    """Load the labelled evaluation queries."""
+    labels = pd.read_csv(path)
+    return [
+        BenchmarkQuery(
+            query=row.query,
+            entity=None if pd.isna(row.ground_truth_uid) else entity_key(row.ground_truth_uid),
+            variation=row.variation_type
+        )
+        for row in labels.itertuples()
+    ]
+
+
+def synthetic_queries(
+    screener: SanctionsScreener,
+    n_names: int,
+    seed: int = 42
+) -> List[BenchmarkQuery]:
+    """
+    Perturb ``n_names`` list names sampled from ``screener``.
+
+    Each sampled name yields one query per applicable perturbation.
+    """
+    rng = random.Random(seed)
+    snapshot = screener.snapshot
+    store = snapshot.store
+    live = range(len(store)) if snapshot.active is None else np.flatnonzero(snapshot.active).tolist()
+    rows = [row for row in live if len(tokenize(store.name_norm[row])) >= 2]
+    queries = []
+    for row in rng.sample(rows, min(n_names, len(rows))):
+        name = store.name[row]
+        for variation, perturb in PERTURBATIONS.items():
+            query = perturb(name, rng)
+            if query:
+                queries.append(BenchmarkQuery(query, entity_key(store.uid[row]), variation))
+    return queries
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+def run_benchmark(
+    screener: SanctionsScreener,
+    queries: Sequence[BenchmarkQuery],
+    k: int = 3,
+    warmup: int = 20,
+    repeat: int = 3,
+    deadline_ms: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Screen every query and compute the benchmark metrics.
+
+    The result cache is cleared before each screen so every query is timed
+    end to end.
+
+    Args:
+        screener: Screener under test
+        queries: Benchmark queries
+        k: Number of matches returned per query (recall@k)
+        warmup: Queries screened before timing starts
+        repeat: Timed passes over the queries (each query's median latency is used)
+        deadline_ms: Latency budget per screen (None = no budget)
+
+    Returns:
+        Metrics dict (see ``GATES`` for the gated ones)
+    """
+    for query in queries[:warmup]:
+        screener.invalidate_cache()
+        screener.screen(SanctionsQuery(name=query.query, top_k=k), deadline_ms=deadline_ms)
+
+    # Per-query median over the timed passes damps scheduler noise
+    timings = np.zeros((repeat, len(queries)))
+    for attempt in range(repeat):
+        responses = []
+        for i, query in enumerate(queries):
+            screener.invalidate_cache()
+            start = time.perf_counter()
+            responses.append(screener.screen(SanctionsQuery(name=query.query, top_k=k), deadline_ms=deadline_ms))
+            timings[attempt, i] = (time.perf_counter() - start) * 1000
+    latencies = np.median(timings, axis=0) if len(queries) else []
+
+    scored = np.array([r.candidate_counts.get('stage1', 0) + r.candidate_counts.get('stage2', 0) for r in responses])
+    retrieved = np.array([r.candidate_counts.get('retrieved', 0) for r in responses])
+    expanded = np.array([r.candidate_counts.get('stage2', 0) > 0 for r in responses])
+    incomplete = np.array([not r.complete for r in responses])
+
+    hits, top1, by_variation = [], [], {}
+    false_matches, false_reviews = [], []
+    for query, response in zip(queries, responses):
+        matches = response.top_matches
+        if query.entity is None:
+            false_matches.append(bool(matches) and matches[0].is_match)
+            false_reviews.append(bool(matches) and matches[0].decision != 'no_match')
+            continue
+        entities = [entity_key(m.uid) for m in matches]
+        hit = query.entity in entities
+        hits.append(hit)
+        top1.append(bool(entities) and entities[0] == query.entity)
+        by_variation.setdefault(query.variation, []).append(hit)
+
+    return {
+        'num_queries': len(queries),
+        'num_with_ground_truth': len(hits),
+        'num_non_matches': len(false_matches),
+        'recall_at_k': float(np.mean(hits)) if hits else 0.0,
+        'precision_at_1': float(np.mean(top1)) if top1 else 0.0,
+        'fpr_at_threshold_90': float(np.mean(false_matches)) if false_matches else 0.0,
+        'fpr_at_threshold_80': float(np.mean(false_reviews)) if false_reviews else 0.0,
+        'latency_p50_ms': _percentile(latencies, 50),
+        'latency_p95_ms': _percentile(latencies, 95),
+        'latency_p99_ms': _percentile(latencies, 99),
+        'candidates_retrieved_mean': float(retrieved.mean()) if len(retrieved) else 0.0,
+        'candidates_scored_mean': float(scored.mean()) if len(scored) else 0.0,
+        'candidates_scored_p95': _percentile(scored, 95),
+        'stage2_rate': float(expanded.mean()) if len(expanded) else 0.0,
+        'incomplete_rate': float(incomplete.mean()) if len(incomplete) else 0.0,
+        'recall_by_variation': {v: float(np.mean(h)) for v, h in sorted(by_variation.items())},
+    }
+
+
+def check_regressions(
+    metrics: Dict[str, Any],
+    baseline: Optional[Dict[str, Any]] = None,
+    gates: Optional[Dict[str, Tuple[str, str, float]]] = None,
+    latency_gates: bool = True
+) -> List[str]:
+    """
+    Compare metrics with the targets and (optionally) a baseline.
+
+    Args:
+        metrics: Metrics from ``run_benchmark``
+        baseline: Baseline metrics (None checks the targets only)
+        gates: Regression gates (default ``GATES``)
+        latency_gates: Gate latency metrics (targets and baseline)
+
+    Returns:
+        Human-readable failures (empty when the run passes)
+    """
+    gates = GATES if gates is None else gates
+    failures = []
+    for metric, (direction, target) in TARGETS.items():
+        if not latency_gates and metric in LATENCY_METRICS:
+            continue
+        value = metrics[metric]
+        if (direction == 'min' and value < target) or (direction == 'max' and value > target):
+            failures.append(f"{metric} = {value:.4g} misses the target ({direction} {target:g})")
+
+    if baseline is None:
+        return failures
+    for metric, (direction, kind, tolerance) in gates.items():
+        if not latency_gates and metric in LATENCY_METRICS:
+            continue
+        if metric not in baseline:
+            continue
+        value, reference = metrics[metric], baseline[metric]
+        slack = tolerance * abs(reference) if kind == 'rel' else tolerance
+        if direction == 'min' and value < reference - slack - 1e-12:
+            failures.append(f"{metric} regressed: {value:.4g} < baseline {reference:.4g} - {slack:.4g}")
+        elif direction == 'max' and value > reference + slack + 1e-12:
+            failures.append(f"{metric} regressed: {value:.4g} > baseline {reference:.4g} + {slack:.4g}")
+    return failures
+
+
+def load_screener(path: Optional[str], names_path: str = DEFAULT_NAMES) -> SanctionsScreener:
+    """Open an artifact or pickle, or build a screener from the names parquet."""
+    if path is None:
+        from packages.compliance.build_index import build_screener
+        screener, _ = build_screener(names_path, version='benchmark')
+        return screener
+    if is_artifact(path):
+        return SanctionsScreener.open_artifact(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m packages.compliance.benchmark',
+        description='Benchmark sanctions screening and fail on recall/latency regressions.'
+    )
+    parser.add_argument('--screener', help='Screener artifact or pickle (default: build from --names)')
+    parser.add_argument('--names', default=DEFAULT_NAMES, help='Sanctions names parquet used when building')
+    parser.add_argument('--labels', default=DEFAULT_LABELS, help='Labelled evaluation queries')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline metrics JSON')
+    parser.add_argument('--write-baseline', action='store_true', help='Record this run as the baseline')
+    parser.add_argument('--k', type=int, default=3, help='Matches per query (recall@k)')
+    parser.add_argument('--synthetic', type=int, default=200, help='List names to perturb')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3, help='Timed passes over the queries')
+    parser.add_argument('--deadline-ms', type=float, help='Latency budget per screen (default: none)')
+    parser.add_argument('--no-latency-gates', action='store_true', help='Report latency without gating it')
+    parser.add_argument('--report', help='Write the metrics and failures to this JSON file')
+    return parser.parse_args(argv)
+
+
+def _print_metrics(metrics: Dict[str, Any], baseline: Optional[Dict[str, Any]], k: int) -> None:
+    print(f"Sanctions screening benchmark: {metrics['num_queries']} queries "
+          f"({metrics['num_with_ground_truth']} with ground truth, {metrics['num_non_matches']} non-matches)")
+    for metric, value in metrics.items():
+        if isinstance(value, dict) or metric.startswith('num_'):
+            continue
+        reference = f"  (baseline {baseline[metric]:.4g})" if baseline and metric in baseline else ''
+        label = metric.replace('_at_k', f'_at_{k}')
+        print(f"  {label:<26s} {value:>10.4g}{reference}")
+    print("  Recall by variation:")
+    for variation, recall in metrics['recall_by_variation'].items():
+        print(f"    {variation:<24s} {recall:>8.3f}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    settings = {
+        'k': args.k,
+        'synthetic': args.synthetic,
+        'seed': args.seed,
+        'labels': Path(args.labels).name,
+        'deadline_ms': args.deadline_ms
+    }
+
+    screener = load_screener(args.screener, args.names)
+    queries = load_eval_queries(args.labels) + synthetic_queries(screener, args.synthetic, seed=args.seed)
+    metrics = run_benchmark(
+        screener, queries, k=args.k, warmup=args.warmup, repeat=args.repeat,
+        deadline_ms=args.deadline_ms
+    )
+
+    if args.write_baseline:
+        baseline_doc = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'screener_version': screener.version,
+            'settings': settings,
+            'metrics': metrics
+        }
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline_doc, f, indent=2)
+        _print_metrics(metrics, None, args.k)
+        print(f"Wrote baseline {args.baseline}")
+        return 0
+
+    baseline = None
+    if Path(args.baseline).is_file():
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline_doc = json.load(f)
+        mismatched = [s for s in COMPARABLE_SETTINGS if baseline_doc['settings'].get(s) != settings[s]]
+        if mismatched:
+            print(f"Baseline {args.baseline} was recorded with different settings "
+                  f"({', '.join(mismatched)}); re-record it with --write-baseline", file=sys.stderr)
+            return 2
+        baseline = baseline_doc['metrics']
+    else:
+        print(f"No baseline at {args.baseline}; checking targets only", file=sys.stderr)
+
+    failures = check_regressions(metrics, baseline, latency_gates=not args.no_latency_gates)
+    _print_metrics(metrics, baseline, args.k)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'metrics': metrics, 'failures': failures}, f, indent=2)
+
+    if failures:
+        print("FAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("PASSED")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,691 @@
+"""
+Array-backed blocking indexes for sanctions candidate retrieval.
+
+The legacy blocking maps (first token, token-count bucket, initials) are plain
+dict-of-list structures. The indexes in this module store their posting lists
+in CSR form (one flat row-id array plus offsets per key), so lookups return
+NumPy slices and candidate scoring can be done with vectorized accumulation
+instead of per-row Python loops. The character n-gram pre-ranker keeps a SciPy
+sparse TF-IDF matrix so typo-tolerant retrieval is a single sparse mat-vec,
+and ``HashedNgramIndex`` is an approximate nearest-neighbour (IVF) index over
+dense hashed n-gram vectors for bounded-cost global lookups.
+"""
+
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import zlib
+import numpy as np
+from scipy import sparse
+
+from packages.compliance.sanctions import tokenize_series
+
+
+def char_ngrams(text: str, n: int = 3) -> List[str]:
+    """
+    Extract word-bounded character n-grams from a normalized name.
+    
+    Each word is padded with spaces so prefixes and suffixes get their own
+    n-grams, and n-grams never span two words (token order does not matter).
+    
+    Examples:
+        >>> char_ngrams("al qaida")
+        [' al', 'al ', ' qa', 'qai', 'aid', 'ida', 'da ']
+    """
+    grams: List[str] = []
+    for word in text.split():
+        padded = f" {word} "
+        grams.extend(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+    return grams
+
+
+def rank_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Return the positions of the ``k`` highest scores, best first.
+
+    Uses ``np.argpartition`` so only the selected slice is sorted instead of
+    the full score array. Ties are ordered by position.
+
+    Args:
+        scores: Score array
+        k: Number of positions to return
+
+    Returns:
+        Array of positions into ``scores``
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.array([], dtype=np.intp)
+    if k >= n:
+        return np.lexsort((np.arange(n), -scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    # argpartition picks arbitrarily among ties at the boundary; keep the lowest positions
+    kth = scores[top].min()
+    above = np.flatnonzero(scores > kth)
+    tied = np.flatnonzero(scores == kth)[:k - len(above)]
+    top = np.concatenate([above, tied])
+    return top[np.lexsort((top, -scores[top]))]
+
+
+def _live_names(names_norm: Sequence[str], active: Optional[np.ndarray]) -> Sequence[str]:
+    """Blank out the names of rows outside ``active`` (no mask = all rows live)."""
+    if active is None:
+        return names_norm
+    return np.where(active, np.asarray(names_norm, dtype=object), '')
+
+
+class PostingLists:
+    """
+    CSR-style inverted index mapping string keys to sorted row-id arrays.
+
+    Attributes:
+        keys: Key for each posting list
+        offsets: Start offset of each key's postings (len(keys) + 1 entries)
+        rows: Concatenated row ids for all keys
+    """
+
+    def __init__(self, keys: Sequence[str], offsets: np.ndarray, rows: np.ndarray):
+        self.keys = list(keys)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self._key_ids: Dict[str, int] = {key: i for i, key in enumerate(self.keys)}
+
+    @classmethod
+    def build(cls, row_keys: Iterable[Iterable[str]]) -> "PostingLists":
+        """
+        Build posting lists from the keys of each row.
+
+        Args:
+            row_keys: Iterable yielding the keys for row 0, 1, 2, ...
+                (duplicate keys within a row are collapsed)
+        """
+        key_ids: Dict[str, int] = {}
+        pair_keys: List[int] = []
+        pair_rows: List[int] = []
+        for row, keys in enumerate(row_keys):
+            for key in set(keys):
+                pair_keys.append(key_ids.setdefault(key, len(key_ids)))
+                pair_rows.append(row)
+        return cls.from_pairs(list(key_ids), np.array(pair_keys), np.array(pair_rows))
+
+    @classmethod
+    def from_pairs(
+        cls,
+        keys: Sequence[str],
+        key_ids: np.ndarray,
+        rows: np.ndarray
+    ) -> "PostingLists":
+        """Build posting lists from parallel (key id, row id) arrays."""
+        key_ids = np.asarray(key_ids, dtype=np.int64)
+        rows = np.asarray(rows, dtype=np.int64)
+        order = np.lexsort((rows, key_ids))
+        counts = np.bincount(key_ids, minlength=len(keys))
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(keys, offsets, rows[order])
+
+    @classmethod
+    def from_dict(cls, index: Dict[str, Sequence[int]]) -> "PostingLists":
+        """Convert a legacy dict-of-list blocking index."""
+        keys = list(index)
+        lengths = [len(index[key]) for key in keys]
+        key_ids = np.repeat(np.arange(len(keys)), lengths)
+        rows = np.fromiter(
+            (row for key in keys for row in index[key]),
+            dtype=np.int64,
+            count=int(sum(lengths))
+        )
+        return cls.from_pairs(keys, key_ids, rows)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_ids
+    
+    def __getitem__(self, key: str) -> np.ndarray:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            raise KeyError(key)
+        return self.postings(key_id)
+
+    def key_id(self, key: str) -> Optional[int]:
+        """Return the position of ``key``, or None if it is not indexed."""
+        return self._key_ids.get(key)
+
+    def postings(self, key_id: int) -> np.ndarray:
+        """Return the row ids for a key position."""
+        return self.rows[self.offsets[key_id]:self.offsets[key_id + 1]]
+
+    def get(self, key: str) -> np.ndarray:
+        """Return the row ids for ``key`` (empty if the key is not indexed)."""
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            return self.rows[:0]
+        return self.postings(key_id)
+
+    def document_frequency(self) -> np.ndarray:
+        """Return the number of rows per key."""
+        return np.diff(self.offsets)
+
+    def extend(self, row_keys: Iterable[Iterable[str]], first_row: int) -> "PostingLists":
+        """
+        Return new posting lists with additional rows appended.
+
+        Existing postings are carried over as (key id, row) pairs, so the cost
+        is linear in the total number of postings; ``self`` is left unchanged.
+
+        Args:
+            row_keys: Iterable yielding the keys for rows first_row, first_row + 1, ...
+            first_row: Row id of the first appended row
+        """
+        key_ids = dict(self._key_ids)
+        keys = list(self.keys)
+        pair_keys: List[int] = []
+        pair_rows: List[int] = []
+        for row, row_key_set in enumerate(row_keys, start=first_row):
+            for key in set(row_key_set):
+                key_id = key_ids.get(key)
+                if key_id is None:
+                    key_id = key_ids[key] = len(keys)
+                    keys.append(key)
+                pair_keys.append(key_id)
+                pair_rows.append(row)
+        if not pair_keys:
+            return self
+        old_key_ids = np.repeat(np.arange(len(self.keys)), np.diff(self.offsets))
+        return PostingLists.from_pairs(
+            keys,
+            np.concatenate([old_key_ids, np.array(pair_keys, dtype=np.int64)]),
+            np.concatenate([self.rows.astype(np.int64), np.array(pair_rows, dtype=np.int64)])
+        )
+
+
+class TokenIndex:
+    """
+    IDF-weighted inverted index over all name tokens.
+
+    Every token produced by ``tokenize`` is indexed, so a name whose first token
+    is misspelled is still reachable through its remaining tokens. Candidates are
+    ranked by weighted Jaccard overlap:
+
+        sum(idf of shared tokens) / sum(idf of tokens in query or candidate)
+
+    Rare tokens (surnames, company names) therefore dominate the ranking, while
+    common tokens ("al", "bank") contribute little.
+    """
+
+    def __init__(self, postings: PostingLists, idf: np.ndarray, row_weights: np.ndarray):
+        """
+        Args:
+            postings: Token posting lists
+            idf: IDF weight per token (aligned with ``postings.keys``)
+            row_weights: Sum of token IDF weights per row
+        """
+        self.postings = postings
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.row_weights = np.asarray(row_weights, dtype=np.float64)
+
+    @classmethod
+    def build(cls, names_norm: Sequence[str], active: Optional[np.ndarray] = None) -> "TokenIndex":
+        """
+        Build the index from normalized names.
+
+        Args:
+            names_norm: Normalized name per row
+            active: Optional boolean mask of live rows; other rows get no
+                postings and do not count towards document frequencies
+        """
+        postings = PostingLists.build(tokenize_series(_live_names(names_norm, active)))
+        n_rows = len(names_norm)
+        n_live = n_rows if active is None else int(np.count_nonzero(active))
+        df = postings.document_frequency()
+        idf = np.log((n_live + 1) / (df + 1)) + 1.0
+
+        # Row weight = sum of IDF over the row's distinct tokens
+        token_ids = np.repeat(np.arange(len(postings)), df)
+        row_weights = np.bincount(postings.rows, weights=idf[token_ids], minlength=n_rows)
+        return cls(postings, idf, row_weights)
+
+    def __len__(self) -> int:
+        return len(self.row_weights)
+
+    def score(self, query_tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every row sharing at least one token with the query.
+
+        Args:
+            query_tokens: Tokenized query name
+
+        Returns:
+            Tuple of (rows, scores) for rows with non-zero overlap (unordered)
+        """
+        token_ids = [
+            key_id for key_id in (self.postings.key_id(t) for t in set(query_tokens))
+            if key_id is not None
+        ]
+        if not token_ids:
+            return np.array([], dtype=np.int32), np.array([], dtype=np.float64)
+
+        # Query tokens missing from the index count towards the union with maximum IDF
+        unknown = len(set(query_tokens)) - len(token_ids)
+        query_weight = float(self.idf[token_ids].sum()) + unknown * (math.log(len(self) + 1) + 1.0)
+
+        overlap = np.zeros(len(self), dtype=np.float64)
+        for key_id in token_ids:
+            overlap[self.postings.postings(key_id)] += self.idf[key_id]
+
+        rows = np.flatnonzero(overlap)
+        shared = overlap[rows]
+        scores = shared / (query_weight + self.row_weights[rows] - shared)
+        return rows, scores
+
+    def get_candidates(
+        self,
+        query_tokens: Sequence[str],
+        limit: Optional[int] = None,
+        allowed: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], Dict[int, float]]:
+        """
+        Retrieve candidates ranked by IDF-weighted token overlap.
+
+        Args:
+            query_tokens: Tokenized query name
+            limit: Maximum number of candidates to return (None = all)
+            allowed: Optional boolean mask over rows; rows outside it are skipped
+
+        Returns:
+            Tuple of (candidate_indices, priority_scores), same shape as
+            ``sanctions_api.get_candidates``
+        """
+        rows, scores = self.score(query_tokens)
+        if allowed is not None:
+            keep = allowed[rows]
+            rows, scores = rows[keep], scores[keep]
+        top = rank_top_k(scores, len(rows) if limit is None else limit)
+        candidate_indices = rows[top].tolist()
+        return candidate_indices, dict(zip(candidate_indices, scores[top].tolist()))
+
+
+class NgramIndex:
+    """
+    Character n-gram TF-IDF pre-ranker over normalized names.
+    
+    Typos and transliteration variants ("qaida" / "qaeda") share most of their
+    trigrams even when no token matches exactly. Each name is embedded as an
+    L2-normalized TF-IDF vector over its trigrams; a query's cosine similarity
+    against the whole list is a single sparse mat-vec, after which
+    ``np.argpartition`` picks the top candidates for RapidFuzz rescoring.
+    
+    The matrix is stored column-major (CSC, n-grams as columns) so a query
+    only touches the columns of its own n-grams.
+    """
+    
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        idf: np.ndarray,
+        matrix: sparse.csc_matrix,
+        n: int = 3
+    ):
+        """
+        Args:
+            vocabulary: N-gram to column mapping
+            idf: IDF weight per column
+            matrix: Row-normalized TF-IDF matrix (rows x n-grams)
+            n: N-gram size
+        """
+        self.vocabulary = vocabulary
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.matrix = matrix
+        self.n = n
+    
+    @classmethod
+    def build(
+        cls,
+        names_norm: Sequence[str],
+        n: int = 3,
+        active: Optional[np.ndarray] = None
+    ) -> "NgramIndex":
+        """
+        Build the TF-IDF matrix from normalized names.
+        
+        Args:
+            names_norm: Normalized name per row
+            n: N-gram size
+            active: Optional boolean mask of live rows; other rows are left
+                empty and do not count towards document frequencies
+        """
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        columns: List[int] = []
+        tf: List[float] = []
+        for name in _live_names(names_norm, active):
+            for gram, count in Counter(char_ngrams(name, n)).items():
+                columns.append(vocabulary.setdefault(gram, len(vocabulary)))
+                tf.append(1.0 + math.log(count))
+            indptr.append(len(columns))
+        
+        n_rows = len(names_norm)
+        n_live = n_rows if active is None else int(np.count_nonzero(active))
+        columns_arr = np.array(columns, dtype=np.int32)
+        df = np.bincount(columns_arr, minlength=len(vocabulary))
+        idf = np.log((n_live + 1) / (df + 1)) + 1.0
+        
+        # Sublinear TF x IDF, L2-normalized per row
+        data = np.array(tf, dtype=np.float64) * idf[columns_arr]
+        row_ids = np.repeat(np.arange(n_rows), np.diff(indptr))
+        norms = np.sqrt(np.bincount(row_ids, weights=data ** 2, minlength=n_rows))
+        data /= np.where(norms > 0, norms, 1.0)[row_ids]
+        
+        matrix = sparse.csr_matrix(
+            (data, columns_arr, np.array(indptr, dtype=np.int64)),
+            shape=(n_rows, len(vocabulary))
+        ).tocsc()
+        return cls(vocabulary, idf, matrix, n)
+    
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+    
+    def vectorize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Embed a normalized string as sparse TF-IDF weights.
+        
+        Returns:
+            Tuple of (columns, weights) for n-grams present in the vocabulary
+        """
+        counts = Counter(char_ngrams(text, self.n))
+        columns = [self.vocabulary[g] for g in counts if g in self.vocabulary]
+        if not columns:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+        cols = np.array(columns, dtype=np.int64)
+        tf = np.array([1.0 + math.log(counts[g]) for g in counts if g in self.vocabulary])
+        weights = tf * self.idf[cols]
+        return cols, weights / np.linalg.norm(weights)
+    
+    def score(self, query_norm: str) -> np.ndarray:
+        """Return the cosine similarity of the query against every row."""
+        columns, weights = self.vectorize(query_norm)
+        if len(columns) == 0:
+            return np.zeros(len(self), dtype=np.float64)
+        return self.matrix[:, columns] @ weights
+    
+    def get_candidates(
+        self,
+        query_norm: str,
+        limit: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], Dict[int, float]]:
+        """
+        Retrieve the ``limit`` nearest names by n-gram cosine similarity.
+        
+        Args:
+            query_norm: Normalized query string
+            limit: Number of candidates to return
+            allowed: Optional boolean mask over rows; rows outside it are skipped
+            
+        Returns:
+            Tuple of (candidate_indices, priority_scores), same shape as
+            ``sanctions_api.get_candidates``
+        """
+        scores = self.score(query_norm)
+        rows = np.flatnonzero(scores if allowed is None else (scores > 0) & allowed)
+        top = rows[rank_top_k(scores[rows], limit)]
+        candidate_indices = top.tolist()
+        return candidate_indices, dict(zip(candidate_indices, scores[top].tolist()))
+
+
+@lru_cache(maxsize=65536)
+def _hashed_slot(gram: str, dim: int) -> Tuple[int, float]:
+    """Map an n-gram to a (column, sign) pair with a process-independent hash."""
+    h = zlib.crc32(gram.encode('utf-8'))
+    return h % dim, (1.0 if h >> 31 else -1.0)
+
+
+class HashedNgramIndex:
+    """
+    Approximate nearest-neighbour index over hashed character n-gram vectors.
+    
+    Every name is embedded as a dense, L2-normalized vector: its word-bounded
+    n-grams (see ``char_ngrams``) are hashed into ``dim`` signed columns with
+    sublinear TF weights, so no vocabulary is needed and unseen n-grams in
+    queries still land somewhere. Misspellings keep most of a name's n-grams
+    and therefore stay close in cosine similarity even when no token matches.
+    
+    Rows are clustered with spherical k-means into an inverted file (IVF):
+    each row is listed under its ``spill`` nearest centroids, and a search
+    scans only the lists of the ``probes`` centroids nearest the query. The
+    cost of a search is therefore bounded by the list sizes rather than the
+    size of the sanctions list.
+    
+    Attributes:
+        vectors: Row embeddings (rows x dim, float32)
+        centroids: List centroids (lists x dim, float32)
+        offsets: Start offset of each list in ``rows`` (lists + 1 entries)
+        rows: Concatenated row ids of all lists
+        n: N-gram size
+        probes: Lists scanned per search
+    """
+    
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        n: int = 3,
+        probes: int = 8
+    ):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.n = n
+        self.probes = probes
+    
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+    
+    @property
+    def spill(self) -> int:
+        """Lists each row is assigned to."""
+        return len(self.rows) // max(len(self), 1)
+    
+    @classmethod
+    def build(
+        cls,
+        names_norm: Sequence[str],
+        dim: int = 128,
+        n: int = 3,
+        n_lists: Optional[int] = None,
+        spill: int = 2,
+        probes: int = 8,
+        iterations: int = 10,
+        seed: int = 0
+    ) -> "HashedNgramIndex":
+        """
+        Embed normalized names and cluster them into inverted lists.
+        
+        Args:
+            names_norm: Normalized name per row
+            dim: Embedding dimension (hash columns)
+            n: N-gram size
+            n_lists: Number of k-means lists (default: 2 * sqrt(rows))
+            spill: Nearest lists each row is assigned to (>1 trades memory
+                for recall on names near a list boundary)
+            probes: Lists scanned per search
+            iterations: k-means iterations
+            seed: Seed for the k-means initialization
+        """
+        vectors = cls._embed(names_norm, dim, n)
+        n_rows = len(vectors)
+        if n_lists is None:
+            n_lists = max(int(2 * math.sqrt(n_rows)), 1)
+        n_lists = max(min(n_lists, n_rows), 1)
+        
+        # Spherical k-means: centroids are normalized means of their rows
+        rng = np.random.default_rng(seed)
+        centroids = np.zeros((n_lists, dim), dtype=np.float32)
+        if n_rows:
+            centroids = vectors[rng.choice(n_rows, n_lists, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = _nearest_lists(vectors, centroids, 1)[:, 0]
+                membership = sparse.csr_matrix(
+                    (np.ones(n_rows, dtype=np.float32), (assignment, np.arange(n_rows))),
+                    shape=(n_lists, n_rows)
+                )
+                sums = np.asarray(membership @ vectors, dtype=np.float32)
+                empty = np.flatnonzero(np.bincount(assignment, minlength=n_lists) == 0)
+                sums[empty] = vectors[rng.choice(n_rows, len(empty), replace=False)]
+                centroids = _normalize_rows(sums)
+        
+        list_ids = _nearest_lists(vectors, centroids, spill)
+        offsets, rows = _inverted_lists(
+            list_ids.ravel(), np.repeat(np.arange(n_rows), list_ids.shape[1]), n_lists
+        )
+        return cls(vectors, centroids, offsets, rows, n=n, probes=probes)
+    
+    @staticmethod
+    def _embed(names_norm: Sequence[str], dim: int, n: int) -> np.ndarray:
+        """Embed names as L2-normalized hashed n-gram vectors (rows x dim)."""
+        # Distinct n-grams are hashed once; (row, n-gram) pairs are counted in NumPy
+        gram_ids: Dict[str, int] = {}
+        pair_grams: List[int] = []
+        lengths: List[int] = []
+        for name in names_norm:
+            grams = char_ngrams(name, n)
+            pair_grams.extend([gram_ids.setdefault(g, len(gram_ids)) for g in grams])
+            lengths.append(len(grams))
+        slots = [_hashed_slot(gram, dim) for gram in gram_ids]
+        columns = np.array([column for column, _ in slots], dtype=np.int64)
+        signs = np.array([sign for _, sign in slots], dtype=np.float64)
+        
+        n_rows = len(lengths)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+        pairs, counts = np.unique(
+            rows * max(len(gram_ids), 1) + np.array(pair_grams, dtype=np.int64),
+            return_counts=True
+        )
+        pair_rows, pair_gram_ids = np.divmod(pairs, max(len(gram_ids), 1))
+        vectors = np.bincount(
+            pair_rows * dim + columns[pair_gram_ids],
+            weights=signs[pair_gram_ids] * (1.0 + np.log(counts)),
+            minlength=n_rows * dim
+        ).reshape(n_rows, dim)
+        return _normalize_rows(vectors.astype(np.float32))
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Embed one normalized string."""
+        return self._embed([text], self.dim, self.n)[0]
+    
+    def __len__(self) -> int:
+        return len(self.vectors)
+    
+    def extend(self, names_norm: Sequence[str]) -> "HashedNgramIndex":
+        """
+        Return a new index with rows appended (``self`` is left unchanged).
+        
+        New rows are assigned to the nearest existing centroids; the lists are
+        not re-clustered, so the cost is linear in the number of postings.
+        """
+        if not len(names_norm):
+            return self
+        added = self._embed(names_norm, self.dim, self.n)
+        list_ids = _nearest_lists(added, self.centroids, max(self.spill, 1))
+        old_list_ids = np.repeat(np.arange(len(self.centroids)), np.diff(self.offsets))
+        offsets, rows = _inverted_lists(
+            np.concatenate([old_list_ids, list_ids.ravel()]),
+            np.concatenate([
+                self.rows.astype(np.int64),
+                np.repeat(np.arange(len(self), len(self) + len(added)), list_ids.shape[1])
+            ]),
+            len(self.centroids)
+        )
+        return HashedNgramIndex(
+            np.concatenate([self.vectors, added]), self.centroids, offsets, rows,
+            n=self.n, probes=self.probes
+        )
+    
+    def search(
+        self,
+        query_norm: str,
+        limit: int,
+        allowed: Optional[np.ndarray] = None,
+        probes: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find approximately the ``limit`` rows most similar to the query.
+        
+        Args:
+            query_norm: Normalized query string
+            limit: Number of rows to return
+            allowed: Optional boolean mask over rows; rows outside it are skipped
+            probes: Lists to scan (default: ``self.probes``)
+            
+        Returns:
+            Tuple of (rows, cosine similarities), most similar first
+        """
+        query = self.embed(query_norm)
+        if limit <= 0 or not query.any():
+            return np.array([], dtype=np.int32), np.array([], dtype=np.float32)
+        
+        lists = rank_top_k(self.centroids @ query, probes or self.probes)
+        rows = np.concatenate([self.rows[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        if self.spill > 1:
+            rows = np.unique(rows)
+        if allowed is not None:
+            rows = rows[allowed[rows]]
+        scores = self.vectors[rows] @ query
+        top = rank_top_k(scores, limit)
+        return rows[top], scores[top]
+    
+    def get_candidates(
+        self,
+        query_norm: str,
+        limit: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], Dict[int, float]]:
+        """
+        Retrieve approximately the ``limit`` nearest names.
+        
+        Returns:
+            Tuple of (candidate_indices, priority_scores), same shape as
+            ``sanctions_api.get_candidates``
+        """
+        rows, scores = self.search(query_norm, limit, allowed=allowed)
+        candidate_indices = rows.tolist()
+        return candidate_indices, dict(zip(candidate_indices, scores.tolist()))
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (all-zero rows are left as they are)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0).astype(matrix.dtype)
+
+
+def _nearest_lists(
+    vectors: np.ndarray,
+    centroids: np.ndarray,
+    k: int,
+    chunk_size: int = 8192
+) -> np.ndarray:
+    """Return the ``k`` most similar centroids per vector (rows x k)."""
+    k = min(k, len(centroids))
+    out = np.empty((len(vectors), k), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        similarity = vectors[start:start + chunk_size] @ centroids.T
+        if k == 1:
+            out[start:start + chunk_size, 0] = np.argmax(similarity, axis=1)
+        else:
+            out[start:start + chunk_size] = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+    return out
+
+
+def _inverted_lists(list_ids: np.ndarray, rows: np.ndarray, n_lists: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Group row ids by list: returns CSR (offsets, rows), rows sorted within each list."""
+    order = np.lexsort((rows, list_ids))
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(list_ids, minlength=n_lists), out=offsets[1:])
+    return offsets, rows[order]
@@ -0,0 +1,346 @@
+"""
+Build the sanctions screener artifact from the sanctions names parquet.
+
+Usage:
+    python -m packages.compliance.build_index \\
+        --input data_catalog/processed/sanctions_names.parquet \\
+        --output packages/models/sanctions_screener
+
+The parquet is read in record batches. Names are normalized, tokenized and
+turned into blocking keys in parallel across cores. The screener is then
+built and written as a memory-mapped artifact
+(see ``packages.compliance.artifact``). The manifest records the version,
+per-array checksums, row counts and build timings. Finally the artifact is
+reopened, its checksums verified and a sample of names screened before the
+command reports success, so list refreshes can be scripted and timed.
+
+Both the raw names export (name, source, entity_id, entity_type, country)
+and a full sanctions index (uid, name, name_norm, ...) are accepted.
+"""
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from packages.compliance.artifact import ArtifactError
+from packages.compliance.sanctions import normalize_series, tokenize_series
+from packages.compliance.sanctions_api import (
+    BLOCKING_STRATEGIES,
+    STAGE2_STRATEGIES,
+    SanctionsQuery,
+    SanctionsScreener,
+    get_first_token,
+    get_initials_signature,
+    get_token_count_bucket
+)
+
+DEFAULT_INPUT = 'data_catalog/processed/sanctions_names.parquet'
+DEFAULT_OUTPUT = 'packages/models/sanctions_screener'
+DEFAULT_CHUNK_SIZE = 8192
+
+# Columns read from the parquet (whichever are present)
+INPUT_COLUMNS = (
+    'uid', 'ent_num', 'entity_id', 'name', 'name_norm', 'name_type',
+    'entity_type', 'program', 'country', 'remarks', 'source'
+)
+
+# Names export sources -> (index source, is alias)
+SOURCE_MAP = {
+    'SDN': ('SDN', False),
+    'SDN_ALT': ('SDN', True),
+    'CONS': ('Consolidated', False),
+    'CONS_ALT': ('Consolidated', True)
+}
+
+# Names screened against the reopened artifact as a smoke test
+VALIDATION_SAMPLE = 50
+
+
+def read_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield the parquet as DataFrames of at most ``chunk_size`` rows."""
+    parquet = pq.ParquetFile(path)
+    columns = [c for c in INPUT_COLUMNS if c in parquet.schema_arrow.names]
+    if 'name' not in columns:
+        raise ValueError(f"{path} has no 'name' column")
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+        yield batch.to_pandas()
+
+
+def prepare_names(names: Sequence[Optional[str]]) -> Tuple[List[str], List[Optional[str]], List[str], List[str]]:
+    """
+    Normalize one chunk of names and compute its blocking keys.
+
+    Runs in worker processes, so it takes and returns plain lists.
+
+    Returns:
+        (name_norm, first_token, token_bucket, initials) per name
+    """
+    name_norm = normalize_series(pd.Series(names, dtype=object))
+    tokens = tokenize_series(name_norm)
+    return (
+        name_norm.tolist(),
+        [get_first_token(t) for t in tokens],
+        [get_token_count_bucket(t) for t in tokens],
+        [get_initials_signature(t) for t in tokens]
+    )
+
+
+def to_index_frame(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map a names export chunk to the sanctions index schema.
+
+    Alias rows get uids ``{source}_{ent_num}_alt_{n}`` numbered in file order
+    within their entity; chunks already carrying a ``uid`` are left as-is.
+    """
+    if 'uid' in chunk:
+        return chunk.rename(columns={'entity_id': 'ent_num'})
+
+    if 'source' not in chunk:
+        raise ValueError("A names export needs a 'source' column (or pass a full index with 'uid')")
+    chunk = chunk.rename(columns={'entity_id': 'ent_num'})
+    mapped = chunk['source'].map(lambda s: SOURCE_MAP.get(s, (s, False)))
+    chunk['source'] = [source for source, _ in mapped]
+    chunk['name_type'] = ['aka' if alias else 'primary' for _, alias in mapped]
+    return chunk
+
+
+def assign_uids(index: pd.DataFrame) -> pd.Series:
+    """Build uids for a names export (primary ``SDN_36``, aliases ``SDN_36_alt_1``)."""
+    base = index['source'].astype(str) + '_' + index['ent_num'].astype(str)
+    alias = (index['name_type'] != 'primary').to_numpy()
+    alias_number = index[alias].groupby(['source', 'ent_num'], sort=False).cumcount() + 1
+    uid = base.copy()
+    uid[alias] = base[alias] + '_alt_' + alias_number.astype(str)
+    return uid
+
+
+def build_blocking_index(keys: Sequence[Optional[str]]) -> Dict[str, List[int]]:
+    """Map each non-empty blocking key to the rows that have it."""
+    index: Dict[str, List[int]] = defaultdict(list)
+    for row, key in enumerate(keys):
+        if key:
+            index[key].append(row)
+    return dict(index)
+
+
+def _map_chunks(chunks: List[List[Optional[str]]], workers: int) -> Iterator[tuple]:
+    """Run ``prepare_names`` over chunks, in worker processes when ``workers`` > 1."""
+    if workers <= 1 or len(chunks) <= 1:
+        return map(prepare_names, chunks)
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context('spawn')
+    )
+    with pool:
+        return iter(list(pool.map(prepare_names, chunks)))
+
+
+def build_screener(
+    input_path: str,
+    version: str,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    timings: Optional[Dict[str, float]] = None,
+    **screener_options: Any
+) -> Tuple[SanctionsScreener, Dict[str, Any]]:
+    """
+    Build a screener from a sanctions names parquet.
+
+    Args:
+        input_path: Parquet with at least a ``name`` column
+        version: Sanctions list version for the screener
+        workers: Processes used to normalize names
+        chunk_size: Rows per parquet batch (and per worker task)
+        timings: Optional dict that receives per-stage timings in seconds
+        **screener_options: SanctionsScreener options (blocking_strategy, ...)
+
+    Returns:
+        (screener, build statistics)
+    """
+    timings = {} if timings is None else timings
+
+    start = time.perf_counter()
+    chunks = [to_index_frame(chunk) for chunk in read_chunks(input_path, chunk_size)]
+    index = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=['name'])
+    timings['read'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    name_norm, first_token, bucket, initials = [], [], [], []
+    for prepared in _map_chunks([chunk['name'].tolist() for chunk in chunks], workers):
+        name_norm += prepared[0]
+        first_token += prepared[1]
+        bucket += prepared[2]
+        initials += prepared[3]
+    timings['normalize'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index['name_norm'] = name_norm
+    if 'uid' not in index:
+        index['uid'] = assign_uids(index)
+    duplicates = int(index['uid'].duplicated().sum())
+    if duplicates:
+        raise ValueError(f"{input_path} produces {duplicates} duplicate uids")
+    first_token_index = build_blocking_index(first_token)
+    bucket_index = build_blocking_index(bucket)
+    initials_index = build_blocking_index(initials)
+    timings['blocking'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    screener = SanctionsScreener(
+        index, first_token_index, bucket_index, initials_index,
+        version=version, **screener_options
+    )
+    timings['screener'] = time.perf_counter() - start
+
+    stats = {
+        'rows': len(index),
+        'entities': int(index['ent_num'].nunique()) if 'ent_num' in index else None,
+        'sources': {str(k): int(v) for k, v in index['source'].value_counts().items()}
+            if 'source' in index else {},
+        'empty_names': int((index['name_norm'] == '').sum()),
+        'chunks': len(chunks),
+        'blocking_keys': {
+            'first_token': len(first_token_index),
+            'bucket': len(bucket_index),
+            'initials': len(initials_index),
+            'phonetic': len(screener.snapshot.postings['phonetic'])
+        }
+    }
+    return screener, stats
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file (recorded so an artifact can be traced to its source)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def validate_artifact(path: str, screener: SanctionsScreener, sample_size: int = VALIDATION_SAMPLE) -> None:
+    """
+    Reopen an artifact, verify its checksums and compare it with ``screener``.
+
+    A sample of list names is screened against both; every top match must
+    agree and score as a match.
+
+    Raises:
+        ArtifactError: If the artifact is corrupt or disagrees with ``screener``
+    """
+    reopened = SanctionsScreener.open_artifact(path, verify=True, cache_size=0)
+    if len(reopened.store) != len(screener.store):
+        raise ArtifactError(
+            f"Artifact has {len(reopened.store)} rows, expected {len(screener.store)}"
+        )
+    if reopened.version != screener.version:
+        raise ArtifactError(f"Artifact version {reopened.version!r} != {screener.version!r}")
+
+    names = screener.store.name
+    rows = [
+        row for row in np.linspace(0, len(names) - 1, num=min(sample_size, len(names)), dtype=int)
+        if screener.store.name_norm[row]
+    ]
+    for row in rows:
+        query = SanctionsQuery(name=names[row], top_k=1)
+        expected = screener.screen(query).top_matches
+        actual = reopened.screen(query).top_matches
+        if [(m.uid, m.score) for m in expected] != [(m.uid, m.score) for m in actual]:
+            raise ArtifactError(f"Artifact screens {names[row]!r} differently from the built screener")
+        if not actual or not actual[0].is_match:
+            raise ArtifactError(f"List name {names[row]!r} does not match itself")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m packages.compliance.build_index',
+        description='Build the sanctions screener artifact from the sanctions names parquet.'
+    )
+    parser.add_argument('--input', default=DEFAULT_INPUT, help=f'Sanctions names parquet (default: {DEFAULT_INPUT})')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'Artifact directory (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--version', help='Sanctions list version (default: build timestamp)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Normalization processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per parquet batch')
+    parser.add_argument('--blocking-strategy', choices=BLOCKING_STRATEGIES, default='multi')
+    parser.add_argument('--stage2-strategy', choices=STAGE2_STRATEGIES, default='ann')
+    parser.add_argument('--no-validate', action='store_true', help='Skip reopening and validating the artifact')
+    parser.add_argument('--json', action='store_true', help='Print the build summary as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    version = args.version or datetime.now().isoformat(timespec='seconds')
+    timings: Dict[str, float] = {}
+    total_start = time.perf_counter()
+
+    screener, stats = build_screener(
+        args.input,
+        version=version,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        timings=timings,
+        blocking_strategy=args.blocking_strategy,
+        stage2_strategy=args.stage2_strategy
+    )
+
+    start = time.perf_counter()
+    metadata = {
+        'source': {'path': args.input, 'sha256': file_sha256(args.input)},
+        'build': {**stats, 'workers': args.workers, 'chunk_size': args.chunk_size},
+        'timings_s': {stage: round(seconds, 4) for stage, seconds in timings.items()}
+    }
+    manifest = screener.save_artifact(args.output, metadata=metadata)
+    timings['write'] = time.perf_counter() - start
+
+    if not args.no_validate:
+        start = time.perf_counter()
+        try:
+            validate_artifact(args.output, screener)
+        except ArtifactError as e:
+            print(f"Artifact validation failed: {e}", file=sys.stderr)
+            return 1
+        timings['validate'] = time.perf_counter() - start
+    timings['total'] = time.perf_counter() - total_start
+
+    summary = {
+        'output': args.output,
+        'version': version,
+        'rows': manifest['rows'],
+        'arrays': len(manifest['arrays']),
+        'artifact_bytes': sum(
+            (Path(args.output) / entry['file']).stat().st_size for entry in manifest['arrays'].values()
+        ),
+        **{key: value for key, value in stats.items() if key != 'rows'},
+        'timings_s': {stage: round(seconds, 4) for stage, seconds in timings.items()}
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"Built sanctions screener {version} -> {args.output}")
+    print(f"  Rows: {summary['rows']:,} ({stats['empty_names']:,} with empty normalized names)")
+    print(f"  Sources: {stats['sources']}")
+    print(f"  Blocking keys: {stats['blocking_keys']}")
+    print(f"  Artifact: {summary['arrays']} arrays, {summary['artifact_bytes'] / 1e6:.1f} MB (sha256 in manifest.json)")
+    print("  Timings:")
+    for stage, seconds in timings.items():
+        print(f"    {stage:<10s} {seconds * 1000:>9.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
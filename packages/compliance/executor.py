@@ -0,0 +1,318 @@
+"""
+Process-pool executor for sanctions screening.
+
+Screening is CPU-bound (normalization, blocking and RapidFuzz scoring), so
+screens running in API threads serialize on the GIL. The executor runs them in
+worker processes instead. Workers open the screener artifact (see
+``packages.compliance.artifact``) memory-mapped, so every worker shares the
+same physical pages through the OS page cache rather than unpickling its own
+copy of the index.
+
+At most ``workers + max_queue_depth`` screens are in flight; further
+submissions raise ``ScreeningQueueFullError`` so callers can shed load instead of
+queueing without limit. Queue wait (submission to start in a worker) and
+service time are recorded for monitoring.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from packages.compliance.sanctions_api import SanctionsQuery, SanctionsResponse, SanctionsScreener
+
+# Published artifact generations kept on disk (older ones are deleted)
+KEEP_GENERATIONS = 3
+
+# Artifact currently opened by this worker process: ((path, generation), screener)
+_worker_state: Tuple[Optional[Tuple[str, int]], Optional[SanctionsScreener]] = (None, None)
+
+
+class ScreeningQueueFullError(RuntimeError):
+    """Raised when a submission would exceed the executor's queue depth."""
+
+
+def _screen_in_worker(
+    artifact: Tuple[str, int],
+    options: Dict[str, Any],
+    queries: List[SanctionsQuery],
+    screen_kwargs: Dict[str, Any],
+    submitted_at: float
+) -> Tuple[List[SanctionsResponse], float, float]:
+    """
+    Screen ``queries`` in a worker process.
+
+    The artifact is (re)opened when the executor has published a new one. A
+    ``deadline_ms`` budget runs from submission, so queue wait is deducted
+    from it; batches (``screen_many``) take no budget.
+
+    Returns:
+        (responses, queue wait in seconds, service time in seconds)
+    """
+    global _worker_state
+    started_at = time.time()
+    opened, screener = _worker_state
+    if opened != artifact:
+        screener = SanctionsScreener.open_artifact(artifact[0], **options)
+        _worker_state = (artifact, screener)
+
+    deadline_ms = screen_kwargs.pop('deadline_ms', None)
+    if not queries:
+        responses = []
+    elif len(queries) == 1:
+        if deadline_ms is not None:
+            screen_kwargs['deadline_ms'] = deadline_ms - (started_at - submitted_at) * 1000
+        responses = [screener.screen(queries[0], **screen_kwargs)]
+    else:
+        responses = screener.screen_many(queries, workers=1, **screen_kwargs)
+    return responses, started_at - submitted_at, time.time() - started_at
+
+
+def _percentiles_ms(samples: Sequence[float]) -> Dict[str, float]:
+    """Summarize timings (seconds) as millisecond percentiles."""
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'max': float(values.max())}
+
+
+class ScreeningExecutor:
+    """
+    Bounded process pool that screens names against a screener artifact.
+
+    Workers are started with the 'spawn' method (forking a threaded server is
+    unsafe) and open the artifact lazily on their first task. List updates are
+    rolled out by publishing a new artifact (``publish`` or ``set_artifact``);
+    each task names the artifact generation it must run against, so workers
+    reopen when it changes and no screen mixes two list versions.
+
+    Attributes:
+        workers: Number of worker processes
+        max_queue_depth: Screens allowed to wait for a free worker
+        screener_options: Options passed to ``SanctionsScreener.open_artifact``
+    """
+
+    def __init__(
+        self,
+        artifact_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_queue_depth: int = 64,
+        metrics_window: int = 1024,
+        **screener_options: Any
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            artifact_path: Screener artifact directory (or None to ``publish`` one later)
+            workers: Worker processes (default: number of cores)
+            max_queue_depth: Screens allowed to wait for a free worker
+            metrics_window: Number of recent screens kept for timing percentiles
+            **screener_options: Screener options for the workers (e.g. cache_size).
+                ``scoring_workers`` defaults to 1 since the pool provides the parallelism.
+        """
+        if max_queue_depth < 0:
+            raise ValueError(f"max_queue_depth must be >= 0, got {max_queue_depth}")
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth
+        self.screener_options = {'scoring_workers': 1, **screener_options}
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        self._slots = threading.BoundedSemaphore(self.workers + max_queue_depth)
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._generation = 0
+        self._artifact: Optional[Tuple[str, int]] = None
+        self._publish_root: Optional[str] = None
+        self._published: Deque[str] = deque()
+
+        self._queue_waits: Deque[float] = deque(maxlen=metrics_window)
+        self._service_times: Deque[float] = deque(maxlen=metrics_window)
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+        if artifact_path is not None:
+            self.set_artifact(artifact_path)
+
+    def __enter__(self) -> "ScreeningExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    @property
+    def artifact_path(self) -> Optional[str]:
+        """Artifact new screens run against."""
+        return self._artifact[0] if self._artifact else None
+
+    def set_artifact(self, path: str) -> None:
+        """
+        Route new screens to the artifact at ``path``.
+
+        ``path`` must only change through ``save_artifact`` (or ``build_index``),
+        which swaps a new generation in atomically and leaves the files open
+        workers have mapped in place; never overwrite its arrays by other
+        means. Call this again after such a save to the same path, or with a
+        new path; workers reopen the artifact on their next task.
+        """
+        with self._lock:
+            self._generation += 1
+            self._artifact = (str(path), self._generation)
+
+    def publish(self, screener: SanctionsScreener) -> str:
+        """
+        Export ``screener``'s current list as a new artifact and route new screens to it.
+
+        Used for screeners loaded from a pickle or updated with ``apply_delta``.
+        Artifacts are written to a private temporary directory; only the last
+        few generations are kept.
+
+        Returns:
+            Path of the new artifact
+        """
+        with self._publish_lock:
+            if self._publish_root is None:
+                self._publish_root = tempfile.mkdtemp(prefix='sanctions-screener-')
+            path = str(Path(self._publish_root) / f"generation-{self._generation + 1}")
+            screener.save_artifact(path)
+            self.set_artifact(path)
+
+            self._published.append(path)
+            while len(self._published) > KEEP_GENERATIONS:
+                shutil.rmtree(self._published.popleft(), ignore_errors=True)
+        return path
+
+    def warm_up(self) -> None:
+        """Start every worker and open the artifact before taking traffic."""
+        futures = [self.submit([]) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, queries: Sequence[SanctionsQuery], **screen_kwargs: Any) -> "Future[List[SanctionsResponse]]":
+        """
+        Screen ``queries`` in one worker (``screen_many`` for several queries).
+
+        Args:
+            queries: Queries to screen
+            **screen_kwargs: Options for ``SanctionsScreener.screen``
+
+        Returns:
+            Future resolving to one SanctionsResponse per query
+
+        Raises:
+            ScreeningQueueFullError: If the queue is full
+            RuntimeError: If no artifact has been set or published
+        """
+        artifact = self._artifact
+        if artifact is None:
+            raise RuntimeError("No screener artifact: call set_artifact or publish first")
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ScreeningQueueFullError(
+                f"Screening queue is full ({self.workers} workers, "
+                f"{self.max_queue_depth} queued)"
+            )
+
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+        try:
+            task = self._pool.submit(
+                _screen_in_worker,
+                artifact,
+                self.screener_options,
+                list(queries),
+                screen_kwargs,
+                time.time()
+            )
+        except BaseException:
+            self._finish(failed=True)
+            raise
+
+        result: "Future[List[SanctionsResponse]]" = Future()
+
+        def _resolve(task: Future) -> None:
+            if task.cancelled():
+                self._finish(failed=True)
+                result.cancel()
+                return
+            error = task.exception()
+            if error is not None:
+                self._finish(failed=True)
+                result.set_exception(error)
+                return
+            responses, queue_wait, service_time = task.result()
+            self._finish(queue_wait=queue_wait, service_time=service_time)
+            result.set_result(responses)
+
+        task.add_done_callback(_resolve)
+        return result
+
+    def _finish(
+        self,
+        failed: bool = False,
+        queue_wait: Optional[float] = None,
+        service_time: Optional[float] = None
+    ) -> None:
+        """Release a queue slot and record the outcome."""
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+                self._queue_waits.append(max(queue_wait, 0.0))
+                self._service_times.append(service_time)
+        self._slots.release()
+
+    def screen(self, query: SanctionsQuery, **screen_kwargs: Any) -> SanctionsResponse:
+        """Screen one query and wait for the result."""
+        return self.submit([query], **screen_kwargs).result()[0]
+
+    def screen_many(self, queries: Sequence[SanctionsQuery], **screen_kwargs: Any) -> List[SanctionsResponse]:
+        """Screen many queries in one worker and wait for the results."""
+        return self.submit(queries, **screen_kwargs).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, counters and timing percentiles for monitoring."""
+        with self._lock:
+            queue_waits = list(self._queue_waits)
+            service_times = list(self._service_times)
+            return {
+                'workers': self.workers,
+                'max_queue_depth': self.max_queue_depth,
+                'in_flight': self.in_flight,
+                'queued': max(self.in_flight - self.workers, 0),
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'artifact_generation': self._artifact[1] if self._artifact else None,
+                'queue_wait_ms': _percentiles_ms(queue_waits),
+                'service_ms': _percentiles_ms(service_times)
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers (pending screens are cancelled) and delete published artifacts."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        with self._publish_lock:
+            if self._publish_root is not None:
+                shutil.rmtree(self._publish_root, ignore_errors=True)
+                self._publish_root = None
+                self._published.clear()
@@ -0,0 +1,161 @@
+"""
+Phonetic keys for sanctions name blocking.
+
+A compact Metaphone-style encoder (close to the primary Double Metaphone code
+for Latin-script names). Transliteration variants that sound alike collapse to
+the same key, e.g. "Mohammed", "Muhamad" and "Mohamed" all encode to "MHMT",
+so they can share a blocking posting list even when the spelling of every
+token differs.
+
+Input is expected to be normalized (lowercase ASCII, see ``normalize_text``).
+"""
+
+from functools import lru_cache
+from typing import Iterable, List
+
+VOWELS = frozenset('aeiou')
+FRONT_VOWELS = frozenset('eiy')
+BACK_VOWELS = frozenset('ao')
+
+# Letters that form a digraph with a following 'h'
+H_DIGRAPH_LETTERS = frozenset('cgpst')
+
+# Leading letter pairs whose first letter is silent
+SILENT_INITIAL_PAIRS = ('kn', 'gn', 'pn', 'ae', 'wr')
+
+# Maximum key length (longer keys only add transliteration noise)
+MAX_KEY_LENGTH = 6
+
+
+@lru_cache(maxsize=65536)
+def phonetic_key(token: str) -> str:
+    """
+    Encode a single normalized token as a phonetic key.
+
+    Vowels are dropped except at the start of the token (where they all encode
+    to "A"), doubled letters collapse and common English/transliteration
+    digraphs (PH, SH, TH, CH, GH, ...) are folded.
+
+    Args:
+        token: Normalized token (lowercase)
+
+    Returns:
+        Phonetic key, or '' for tokens without letters
+
+    Examples:
+        >>> phonetic_key("mohammed")
+        'MHMT'
+
+        >>> phonetic_key("muhamad")
+        'MHMT'
+
+        >>> phonetic_key("philip")
+        'FLP'
+    """
+    word = ''.join(ch for ch in token if 'a' <= ch <= 'z')
+    if not word:
+        return ''
+
+    if word[:2] in SILENT_INITIAL_PAIRS:
+        word = word[1:]
+    elif word[0] == 'x':
+        word = 's' + word[1:]
+    elif word.startswith('wh'):
+        word = 'w' + word[2:]
+
+    key: List[str] = []
+    last = ''
+    n = len(word)
+    i = 0
+    while i < n and len(key) < MAX_KEY_LENGTH:
+        ch = word[i]
+        prev = word[i - 1] if i > 0 else ''
+        nxt = word[i + 1] if i + 1 < n else ''
+        after = word[i + 2] if i + 2 < n else ''
+
+        # Doubled letters encode once (except "cc" as in "accio")
+        if ch == prev and ch != 'c':
+            i += 1
+            continue
+
+        code = ''
+        if ch in VOWELS:
+            code = 'A' if i == 0 else ''
+        elif ch == 'b':
+            code = '' if prev == 'm' and i == n - 1 else 'B'
+        elif ch == 'c':
+            if nxt == 'h' or (nxt == 'i' and after == 'a'):
+                code = 'K' if prev == 's' else 'X'
+                i += nxt == 'h'
+            elif nxt in FRONT_VOWELS:
+                code = '' if prev == 's' else 'S'
+            else:
+                code = 'K'
+        elif ch == 'd':
+            code = 'J' if nxt == 'g' and after in FRONT_VOWELS else 'T'
+        elif ch == 'g':
+            if nxt == 'h':
+                # "gh" is silent unless it starts a syllable ("ghani")
+                code = 'K' if i == 0 or after in VOWELS else ''
+                i += 1
+            elif nxt == 'n' and (i + 2 == n or word[i + 2:] == 'ed'):
+                code = ''
+            elif nxt in FRONT_VOWELS and prev != 'g':
+                code = 'J'
+            else:
+                code = 'K'
+        elif ch == 'h':
+            # Sounded only before a vowel and not as part of a digraph
+            code = 'H' if nxt in VOWELS and prev not in H_DIGRAPH_LETTERS else ''
+        elif ch == 'k':
+            code = '' if prev == 'c' else 'K'
+        elif ch == 'p':
+            code = 'F' if nxt == 'h' else 'P'
+            i += nxt == 'h'
+        elif ch == 'q':
+            code = 'K'
+        elif ch == 's':
+            if nxt == 'h' or (nxt == 'i' and after in BACK_VOWELS):
+                code = 'X'
+                i += nxt == 'h'
+            else:
+                code = 'S'
+        elif ch == 't':
+            if nxt == 'i' and after in BACK_VOWELS:
+                code = 'X'
+            elif nxt == 'h':
+                code = '0'
+                i += 1
+            elif nxt == 'c' and after == 'h':
+                code = ''
+            else:
+                code = 'T'
+        elif ch == 'v':
+            code = 'F'
+        elif ch in 'wy':
+            code = ch.upper() if nxt in VOWELS else ''
+        elif ch == 'x':
+            code = 'KS'
+        elif ch == 'z':
+            code = 'S'
+        else:
+            code = ch.upper()
+
+        # Adjacent letters with the same sound encode once ("ck", "dt", "sz")
+        if code and code != last:
+            key.append(code)
+        last = code
+        i += 1
+
+    return ''.join(key)[:MAX_KEY_LENGTH]
+
+
+def phonetic_keys(tokens: Iterable[str]) -> List[str]:
+    """
+    Encode tokens as phonetic keys, dropping tokens without a key.
+
+    Examples:
+        >>> phonetic_keys(["usama", "bin", "ladin"])
+        ['ASM', 'BN', 'LTN']
+    """
+    return [key for key in map(phonetic_key, tokens) if key]
@@ -1,8 +1,13 @@
 
 import unicodedata
 import re
+from functools import lru_cache
+from typing import List, Union
+
+import numpy as np
 import pandas as pd
-from typing import List
+import pyarrow as pa
+import pyarrow.compute as pc
 
 
 # Define stopwords for name tokenization
@@ -41,45 +46,142 @@ def normalize_text(text: str) -> str:
         'jose maria obrien'
         
         >>> normalize_text("AL-QAIDA")
-        'al qaida'
+        'al-qaida'
         
         >>> normalize_text("中国工商银行")
         ''
     """
+    if isinstance(text, str):
+        return _normalize_str(text) if text else ""
     if not text or pd.isna(text):
         return ""
     
     # Convert to string if not already
-    text = str(text)
-    
-    # Unicode normalization (canonical composition)
-    text = unicodedata.normalize("NFKC", text)
+    return _normalize_str(str(text))
+
+
+# Characters that survive normalization; everything else becomes a space
+_KEPT_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789-')
+
+# Quotes are dropped rather than replaced so "O'Brien" stays one word
+_QUOTE_CHARS = frozenset('\'"')
+
+# ASCII fast path: every normalization step maps characters independently, so
+# for ASCII input (where NFKC/NFD are no-ops) they fold into one byte table
+_ASCII_TABLE = bytes(
+    ch + 32 if 65 <= ch <= 90 else ch if chr(ch) in _KEPT_CHARS else 32
+    for ch in range(256)
+)
+_ASCII_DELETE = b'\'"'
+
+# Cache size for hot names (repeat senders, batch duplicates)
+NORMALIZE_CACHE_SIZE = 65536
+
+
+class _CharFolding(dict):
+    """
+    ``str.translate`` table for decomposed non-ASCII text.
     
-    # Lowercase
-    text = text.lower()
+    Maps combining marks and quotes to None, keeps [a-z0-9-] and maps anything
+    else to a space. Entries are computed on first use.
+    """
     
-    # Strip accent marks (diacritics)
-    # Decompose characters, then filter out combining marks
-    text = ''.join(
-        char for char in unicodedata.normalize("NFD", text)
-        if unicodedata.category(char) != 'Mn'
-    )
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        if char in _QUOTE_CHARS or unicodedata.category(char) == 'Mn':
+            folded = None
+        elif char in _KEPT_CHARS:
+            folded = char
+        else:
+            folded = ' '
+        self[codepoint] = folded
+        return folded
+
+
+_CHAR_FOLDING = _CharFolding()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_str(text: str) -> str:
+    """Normalize a non-empty string (see ``normalize_text``)."""
+    if text.isascii():
+        text = text.encode('ascii').translate(_ASCII_TABLE, _ASCII_DELETE).decode('ascii')
+    else:
+        # Unicode normalization, lowercasing and accent stripping
+        text = unicodedata.normalize("NFD", unicodedata.normalize("NFKC", text).lower())
+        text = text.translate(_CHAR_FOLDING)
     
-    # Remove quotes (single and double)
-    text = re.sub(r"['\"]", "", text)
+    # Collapse whitespace and strip
+    return ' '.join(text.split())
+
+
+def _string_array(values) -> pa.Array:
+    """Convert a pandas Series or Arrow column to an Arrow string array."""
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if not isinstance(values, pa.Array):
+        values = pa.array(values, type=pa.string(), from_pandas=True)
+    if not (pa.types.is_string(values.type) or pa.types.is_large_string(values.type)):
+        values = values.cast(pa.string())
+    return values
+
+
+def _non_ascii_rows(array: pa.Array) -> np.ndarray:
+    """Positions of non-null rows that contain non-ASCII characters."""
+    is_ascii = pc.fill_null(pc.string_is_ascii(array), True)
+    return np.flatnonzero(~is_ascii.to_numpy(zero_copy_only=False))
+
+
+def _series_like(values, data: np.ndarray) -> pd.Series:
+    """Wrap results in a Series aligned with the input."""
+    if isinstance(values, pd.Series):
+        return pd.Series(data, index=values.index, name=values.name, dtype=object)
+    return pd.Series(data, dtype=object)
+
+
+def normalize_series(values: Union[pd.Series, pa.Array, pa.ChunkedArray]) -> pd.Series:
+    """
+    Vectorized ``normalize_text`` for a pandas Series or Arrow column.
     
-    # Replace non-alphanumeric (except space and hyphen) with space
-    # Note: This strips non-Latin scripts (Chinese, Arabic, Cyrillic, etc.)
-    # OFAC lists use romanized names, so this is intentional behavior
-    text = re.sub(r"[^a-z0-9\s-]", " ", text)
+    ASCII rows are normalized with Arrow compute kernels; rows with non-ASCII
+    characters go through ``normalize_text``. Missing values become "".
     
-    # Collapse multiple spaces to single space
-    text = re.sub(r"\s+", " ", text)
+    Args:
+        values: Raw names
+        
+    Returns:
+        Series of normalized names (same index as ``values`` for a Series)
+        
+    Examples:
+        >>> normalize_series(pd.Series(["AL-QAIDA", "José María O'Brien", None])).tolist()
+        ['al-qaida', 'jose maria obrien', '']
+    """
+    try:
+        array = _string_array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Mixed or non-string values
+        series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+        return _series_like(values, series.map(normalize_text).to_numpy(dtype=object))
     
-    # Strip leading/trailing whitespace
-    text = text.strip()
+    # Same steps as the ASCII fast path, in Arrow
+    folded = pc.ascii_lower(array)
+    folded = pc.replace_substring_regex(folded, pattern="['\"]", replacement="")
+    folded = pc.replace_substring_regex(folded, pattern="[^a-z0-9-]+", replacement=" ")
+    folded = pc.utf8_trim(folded, characters=" ")
+    result = pc.fill_null(folded, "").to_numpy(zero_copy_only=False)
     
-    return text
+    rows = _non_ascii_rows(array)
+    if len(rows):
+        result[rows] = [normalize_text(text) for text in array.take(rows).to_pylist()]
+    return _series_like(values, result)
+
+
+# Token separators: whitespace and hyphens
+_TOKEN_SEPARATORS = re.compile(r'[\s-]+')
+
+# The same separators for ASCII text in Arrow's regex dialect (RE2's \s is narrower)
+_ASCII_TOKEN_SEPARATORS = r'[\t\n\v\f\r\x1c-\x1f -]+'
+
 
 def tokenize(name: str) -> List[str]:
     """
@@ -108,9 +210,50 @@ def tokenize(name: str) -> List[str]:
         return []
     
     # Split on whitespace and hyphens
-    tokens = [t for t in re.split(r'[\s-]+', name) if t]
+    tokens = [t for t in _TOKEN_SEPARATORS.split(name) if t]
     
     # Filter: length >= 2 and not in stopwords
     filtered = [t for t in tokens if len(t) >= 2 and t not in STOPWORDS]
     
-    return filtered
\ No newline at end of file
+    return filtered
+
+
+def tokenize_series(values: Union[pd.Series, pa.Array, pa.ChunkedArray]) -> pd.Series:
+    """
+    Vectorized ``tokenize`` for a pandas Series or Arrow column.
+    
+    Args:
+        values: Normalized names
+        
+    Returns:
+        Series of token lists (same index as ``values`` for a Series)
+        
+    Examples:
+        >>> tokenize_series(pd.Series(["acme corporation ltd", "al-qaida", None])).tolist()
+        [['acme'], ['al', 'qaida'], []]
+    """
+    try:
+        array = _string_array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+        return _series_like(values, series.map(tokenize).to_numpy(dtype=object))
+    
+    pieces = pc.split_pattern_regex(pc.fill_null(array, ""), pattern=_ASCII_TOKEN_SEPARATORS)
+    flat = pieces.flatten()
+    keep = pc.and_(
+        pc.greater_equal(pc.utf8_length(flat), 2),
+        pc.invert(pc.is_in(flat, value_set=pa.array(sorted(STOPWORDS), type=flat.type)))
+    ).to_numpy(zero_copy_only=False)
+    
+    # Regroup the surviving tokens by row
+    parents = pc.list_parent_indices(pieces).to_numpy()[keep]
+    offsets = np.zeros(len(array) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(parents, minlength=len(array)), out=offsets[1:])
+    tokens = flat.filter(pa.array(keep)).to_pylist()
+    result = np.empty(len(array), dtype=object)
+    result[:] = [tokens[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+    
+    rows = _non_ascii_rows(array)
+    if len(rows):
+        result[rows] = [tokenize(name) for name in array.take(rows).to_pylist()]
+    return _series_like(values, result)
@@ -4,31 +4,98 @@ Production-grade sanctions screening API module.
 This module provides a clean, production-ready interface for screening transaction
 names against OFAC sanctions lists. It encapsulates all screening logic including:
 
-- Multi-strategy blocking for efficient candidate retrieval
-- Two-stage adaptive scoring for optimal latency/recall balance
+- Multi-strategy blocking for efficient candidate retrieval (or an IDF-weighted
+  inverted token index / character n-gram pre-ranker, selectable per screener)
+- Two-stage adaptive scoring for optimal latency/recall balance, with
+  score-bound pruning of candidates that cannot reach the top-k; Stage 2
+  expands to the list-wide nearest names from a hashed n-gram ANN index
+- Alias collapsing: each distinct normalized name is scored once and results
+  list each entity once, with its best-scoring alias
+- Deadline-aware screening: latency budgets sized from the observed scoring
+  cost, with incomplete screens flagged for review
 - Decision logic with configurable thresholds
-- Country and program filtering with audit logging
+- Country and program filtering pushed down into candidate retrieval
+- Bounded LRU/TTL result cache for repeat senders
+- Pickle-free, memory-mapped artifact format (see ``packages.compliance.artifact``)
+- Hot-reloadable list: incremental deltas swapped in as immutable snapshots
+- Vectorized batch screening (``screen_many``) for batch endpoints and bulk jobs
 
 Designed for integration into payment processing systems with sub-50ms p95 latency
 and ≥98% recall on real-world name variations.
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field, replace
+from typing import Optional, List, Dict, Any, Callable, Iterable, Sequence, Union
 from datetime import datetime
+import heapq
+import re
+import threading
 import time
 import numpy as np
 import pandas as pd
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
-from packages.compliance.sanctions import normalize_text, tokenize
+from packages.compliance.sanctions import normalize_text, tokenize, tokenize_series
+from packages.compliance.blocking import (
+    HashedNgramIndex,
+    NgramIndex,
+    PostingLists,
+    TokenIndex,
+    rank_top_k
+)
+from packages.compliance.cache import ScreeningCache
+from packages.compliance.artifact import load_artifact_state, save_artifact
+from packages.compliance.phonetic import phonetic_keys
 
 
 # Decision thresholds
 IS_MATCH_THRESHOLD = 0.90
 REVIEW_THRESHOLD = 0.80
 
+# Candidate retrieval strategies selectable on SanctionsScreener
+# - multi: first token + token-count bucket + initials (legacy blocking maps)
+#          + per-token phonetic keys
+# - idf:   IDF-weighted inverted index over all tokens
+# - ngram: character-trigram TF-IDF pre-ranker (typo/transliteration tolerant)
+BLOCKING_STRATEGIES = ('multi', 'idf', 'ngram')
+
+# Stage 2 expansion strategies selectable on SanctionsScreener
+# - ann:      nearest names by hashed n-gram vectors (HashedNgramIndex), list-wide
+# - priority: the next blocking candidates in priority order
+STAGE2_STRATEGIES = ('ann', 'priority')
+
+# Priority added per query token whose phonetic key a name shares ('multi' strategy)
+PHONETIC_WEIGHT = 2
+
+# Blocking maps: legacy dict-of-list (as pickled) or CSR posting lists
+BlockingIndex = Union[Dict[str, List[int]], PostingLists]
+
+# Similarity metrics in the order returned by compute_similarity_batch
+SIMILARITY_SCORERS = (fuzz.token_set_ratio, fuzz.token_sort_ratio, fuzz.partial_ratio)
+
+# Similarity scores stay float64 (RapidFuzz's native precision), not float32:
+# rounding to float32 would move scores that sit exactly on a score_cutoff or
+# a 0.80/0.90 decision threshold, and make pruned and batched scores differ
+# from exhaustive per-pair scoring
+SCORE_DTYPE = np.float64
+
+# Composite score weights (token_set, token_sort, partial)
+SET_WEIGHT = 0.40
+SORT_WEIGHT = 0.40
+PARTIAL_WEIGHT = 0.20
+
+# Candidates scored between running top-k threshold updates
+PRUNING_CHUNK_SIZE = 128
+
+# Safety margin for floating-point comparisons against the pruning threshold
+_PRUNE_EPS = 1e-9
+
+# Latency budgets: per-name scoring cost (ms) assumed before any screen is
+# observed, and the weight of each new observation in its moving average
+DEFAULT_UNIT_COST_MS = 0.005
+UNIT_COST_SMOOTHING = 0.05
+
 
 @dataclass
 class SanctionsQuery:
@@ -113,6 +180,12 @@ class SanctionsResponse:
         latency_ms: Query latency in milliseconds
         version: API version string
         timestamp: ISO format timestamp of when screening was performed
+        candidate_counts: Candidate-set sizes ('retrieved' by blocking; distinct
+            normalized names scored in 'stage1' and 'stage2')
+        debug: Per-stage timings and counters (``ScreeningTrace.to_dict``), only
+            set when screening with ``debug=True``
+        complete: False when a latency budget cut scoring short, so matches
+            may be missing (route to manual review rather than approving)
     """
     query: str
     top_matches: List[SanctionsMatch]
@@ -120,19 +193,83 @@ class SanctionsResponse:
     latency_ms: float
     version: str
     timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    candidate_counts: Dict[str, int] = field(default_factory=dict)
+    debug: Optional[Dict[str, Any]] = None
+    complete: bool = True
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        return {
+        result = {
             'query': self.query,
             'top_matches': [m.to_dict() for m in self.top_matches],
             'applied_filters': self.applied_filters,
             'latency_ms': self.latency_ms,
             'version': self.version,
-            'timestamp': self.timestamp
+            'timestamp': self.timestamp,
+            'candidate_counts': self.candidate_counts,
+            'complete': self.complete
+        }
+        if self.debug is not None:
+            result['debug'] = self.debug
+        return result
+
+
+@dataclass
+class ScreeningTrace:
+    """
+    Per-stage timings and counters for one ``screen`` call.
+    
+    Only collected when a screen asks for it (``debug=True``) or the screener
+    has a ``metrics_hook``; otherwise the hot path pays a few ``None`` checks.
+    Each ``lap`` charges the time since the previous one to a stage, so the
+    stages add up to the screen's latency.
+    
+    Stages, in order: 'normalize', 'cache', 'filters', 'blocking', 'extract'
+    (candidate rows and names gathered from the store), 'stage1', 'expand'
+    (Stage 2 candidate selection, e.g. the ANN search), 'stage2', 'ranking'
+    (top-k selection and match building). Stages that did not run are absent.
+    
+    Counters: 'cache_hit'; candidates per blocking strategy ('first_token',
+    'bucket', 'initials' and 'phonetic' postings after filters, or 'idf' /
+    'ngram'); 'retrieved', 'stage1', 'stage2' and 'scored' candidates;
+    'collapsed' (candidate rows sharing a name scored for another row);
+    'pruned' (rejected by score bounds before all metrics were computed);
+    'expanded' and 'early_exit' (top Stage 1 score below early_exit_threshold);
+    with a latency budget, 'budget_ms', 'unscored' (distinct names left
+    unscored when the budget ran out) and 'truncated'.
+    
+    Attributes:
+        stages_ms: Milliseconds per stage, in execution order
+        counters: Candidate counts and stage decisions
+    """
+    stages_ms: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, Any] = field(default_factory=dict)
+    _last: float = field(default_factory=time.perf_counter, init=False, repr=False)
+    
+    def lap(self, stage: str) -> None:
+        """Charge the time since the previous lap (or creation) to ``stage``."""
+        now = time.perf_counter()
+        self.stages_ms[stage] = self.stages_ms.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+    
+    @property
+    def total_ms(self) -> float:
+        """Sum of the recorded stages."""
+        return sum(self.stages_ms.values())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'stages_ms': dict(self.stages_ms),
+            'total_ms': self.total_ms,
+            'counters': dict(self.counters)
         }
 
 
+# Called with (query, trace) after every traced screen
+MetricsHook = Callable[[SanctionsQuery, ScreeningTrace], None]
+
+
 def apply_decision_threshold(score: float) -> tuple[bool, str]:
     """
     Apply decision logic based on score thresholds.
@@ -177,11 +314,34 @@ def get_initials_signature(tokens: List[str]) -> str:
     return '-'.join(initials)
 
 
+def parse_programs(program: Optional[str]) -> List[str]:
+    """
+    Split an OFAC program string into individual program codes.
+    
+    Multi-program records are stored as bracket-joined strings, e.g.
+    "IRAN] [SDGT] [IFSR]".
+    
+    Examples:
+        >>> parse_programs("IRAN] [SDGT] [IFSR]")
+        ['IRAN', 'SDGT', 'IFSR']
+        
+        >>> parse_programs("cuba")
+        ['CUBA']
+    """
+    if not program:
+        return []
+    return [p.strip().upper() for p in re.split(r'[\[\]]', str(program)) if p.strip()]
+
+
 def get_candidates(
     query_tokens: List[str],
-    first_token_index: Dict[str, List[int]],
-    bucket_index: Dict[str, List[int]],
-    initials_index: Dict[str, List[int]]
+    first_token_index: BlockingIndex,
+    bucket_index: BlockingIndex,
+    initials_index: BlockingIndex,
+    limit: Optional[int] = None,
+    allowed: Optional[np.ndarray] = None,
+    phonetic_index: Optional[BlockingIndex] = None,
+    stats: Optional[Dict[str, int]] = None
 ) -> tuple[List[int], Dict[int, int]]:
     """
     Retrieve candidate indices using multi-strategy blocking.
@@ -189,78 +349,149 @@ def get_candidates(
     Returns candidates with priority scores based on how many
     blocking strategies they match (higher = more likely to be relevant).
     
+    Priorities are accumulated over the concatenated posting arrays with
+    ``np.bincount`` and the top ``limit`` candidates are selected with
+    ``np.argpartition``, so the cost stays linear in the number of postings
+    even when a token-count bucket holds tens of thousands of names.
+    
     Args:
         query_tokens: Tokenized query name
         first_token_index: Blocking index by first token
         bucket_index: Blocking index by token count bucket
         initials_index: Blocking index by initials signature
+        limit: Maximum number of candidates to return (None = all)
+        allowed: Optional boolean mask over rows; rows outside it are never returned
+        phonetic_index: Optional blocking index by per-token phonetic key; each
+            query key shared with a name adds PHONETIC_WEIGHT to its priority
+        stats: Optional dict that receives the number of postings each strategy
+            contributed after filtering ('first_token', 'bucket', 'initials', 'phonetic')
         
     Returns:
         Tuple of (candidate_indices, priority_scores)
     """
-    candidate_counts: Dict[int, int] = {}
-    
-    # Strategy 1: First token match
-    first_token = get_first_token(query_tokens)
-    if first_token and first_token in first_token_index:
-        for idx in first_token_index[first_token]:
-            candidate_counts[idx] = candidate_counts.get(idx, 0) + 3
-    
-    # Strategy 2: Token count bucket
-    bucket = get_token_count_bucket(query_tokens)
-    if bucket in bucket_index:
-        for idx in bucket_index[bucket]:
-            candidate_counts[idx] = candidate_counts.get(idx, 0) + 1
-    
-    # Strategy 3: Initials signature
-    initials = get_initials_signature(query_tokens)
-    if initials and initials in initials_index:
-        for idx in initials_index[initials]:
-            candidate_counts[idx] = candidate_counts.get(idx, 0) + 2
-    
-    # Sort by priority (candidates appearing in multiple strategies first)
-    candidate_indices = sorted(
-        candidate_counts.keys(),
-        key=lambda x: candidate_counts[x],
-        reverse=True
-    )
+    # (strategy, index, key, weight): first token (3), bucket (1), initials (2)
+    lookups = [
+        ('first_token', first_token_index, get_first_token(query_tokens), 3),
+        ('bucket', bucket_index, get_token_count_bucket(query_tokens), 1),
+        ('initials', initials_index, get_initials_signature(query_tokens), 2)
+    ]
+    if phonetic_index is not None:
+        lookups.extend(
+            ('phonetic', phonetic_index, key, PHONETIC_WEIGHT)
+            for key in dict.fromkeys(phonetic_keys(query_tokens))
+        )
+    
+    postings = []
+    weights = []
+    for strategy, index, key, weight in lookups:
+        if key and key in index:
+            rows = np.asarray(index[key], dtype=np.int64)
+            if allowed is not None:
+                rows = rows[allowed[rows]]
+            postings.append(rows)
+            weights.append(np.full(len(rows), weight, dtype=np.int64))
+            if stats is not None:
+                stats[strategy] = stats.get(strategy, 0) + len(rows)
+    
+    if not postings:
+        return [], {}
     
-    return candidate_indices, candidate_counts
+    # Candidate set and summed priority per candidate
+    candidates, inverse = np.unique(np.concatenate(postings), return_inverse=True)
+    priorities = np.bincount(inverse, weights=np.concatenate(weights)).astype(np.int64)
+    
+    # Bounded top-N selection by priority (candidates in multiple strategies first)
+    top = rank_top_k(priorities, len(candidates) if limit is None else limit)
+    candidate_indices = candidates[top].tolist()
+    
+    return candidate_indices, dict(zip(candidate_indices, priorities[top].tolist()))
+
+
+def _score_metric(
+    query_norm: str,
+    candidate_norms: Sequence[str],
+    scorer: Any,
+    workers: int = 1,
+    score_cutoff: Optional[float] = None
+) -> np.ndarray:
+    """Score one metric with ``process.cdist``, returning scores in [0, 1]."""
+    cutoff = score_cutoff * 100.0 if score_cutoff is not None else None
+    if workers == 1:
+        matrix = process.cdist(
+            [query_norm], candidate_norms,
+            scorer=scorer, score_cutoff=cutoff, dtype=SCORE_DTYPE
+        )[0]
+    else:
+        matrix = process.cdist(
+            candidate_norms, [query_norm],
+            scorer=scorer, score_cutoff=cutoff, dtype=SCORE_DTYPE, workers=workers
+        )[:, 0]
+    return matrix / 100.0
 
 
 def compute_similarity_batch(
     query_norm: str,
-    candidate_norms: List[str]
+    candidate_norms: Sequence[str],
+    workers: int = 1,
+    score_cutoff: Optional[float] = None
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Compute similarity scores for query against multiple candidates using vectorized operations.
     
+    Each metric is computed in a single RapidFuzz ``process.cdist`` call, which runs
+    the comparisons in C++ (releasing the GIL) instead of one Python call per pair.
+    With ``workers != 1`` the candidates are laid out as the rows of the matrix so
+    RapidFuzz can split them across threads; all three scorers are symmetric, so
+    the scores are identical either way.
+    
     Args:
         query_norm: Normalized query string
-        candidate_norms: List of normalized candidate strings
+        candidate_norms: Sequence of normalized candidate strings
+        workers: Number of scoring threads (-1 uses all cores)
+        score_cutoff: Optional per-metric cutoff in [0, 1]; scores below it are reported as 0
         
     Returns:
         Tuple of (set_scores, sort_scores, partial_scores) as numpy arrays
     """
-    if not candidate_norms:
+    if len(candidate_norms) == 0:
         return np.array([]), np.array([]), np.array([])
     
-    # Vectorized batch scoring using RapidFuzz
-    set_scores = np.array([
-        fuzz.token_set_ratio(query_norm, cand) / 100.0
-        for cand in candidate_norms
-    ])
+    set_scores, sort_scores, partial_scores = (
+        _score_metric(query_norm, candidate_norms, scorer, workers, score_cutoff)
+        for scorer in SIMILARITY_SCORERS
+    )
+    return set_scores, sort_scores, partial_scores
+
+
+def compute_similarity_pairs(
+    query_norms: Sequence[str],
+    candidate_norms: Sequence[str],
+    workers: int = 1
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute similarity scores for aligned (query, candidate) pairs.
     
-    sort_scores = np.array([
-        fuzz.token_sort_ratio(query_norm, cand) / 100.0
-        for cand in candidate_norms
-    ])
+    Uses RapidFuzz ``process.cpdist``, which scores element-wise pairs in C++
+    across ``workers`` threads. Lets many queries be scored in one pass
+    without computing the full queries x candidates matrix.
     
-    partial_scores = np.array([
-        fuzz.partial_ratio(query_norm, cand) / 100.0
-        for cand in candidate_norms
-    ])
+    Args:
+        query_norms: Normalized query string per pair
+        candidate_norms: Normalized candidate string per pair
+        workers: Number of scoring threads (-1 uses all cores)
+        
+    Returns:
+        Tuple of (set_scores, sort_scores, partial_scores) as numpy arrays
+    """
+    if len(candidate_norms) == 0:
+        return np.array([]), np.array([]), np.array([])
     
+    set_scores, sort_scores, partial_scores = (
+        process.cpdist(
+            query_norms, candidate_norms, scorer=scorer, dtype=SCORE_DTYPE, workers=workers
+        ) / 100.0
+        for scorer in SIMILARITY_SCORERS
+    )
     return set_scores, sort_scores, partial_scores
 
 
@@ -283,10 +514,526 @@ def composite_score_batch(
         Composite scores as numpy array
     """
     return (
-        0.40 * set_scores +
-        0.40 * sort_scores +
-        0.20 * partial_scores
+        SET_WEIGHT * set_scores +
+        SORT_WEIGHT * sort_scores +
+        PARTIAL_WEIGHT * partial_scores
+    )
+
+
+def kth_best_score(scores: np.ndarray, k: int) -> float:
+    """Return the k-th highest score, or -inf if there are fewer than k scores."""
+    if k <= 0 or len(scores) < k:
+        return -np.inf
+    return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+
+def kth_best_group_score(
+    scores: np.ndarray,
+    groups: Optional[np.ndarray],
+    k: int
+) -> float:
+    """
+    Return the k-th highest per-group best score (-inf if there are fewer than k groups).
+    
+    With ``groups=None`` every score is its own group (same as ``kth_best_score``).
+    """
+    if groups is None:
+        return kth_best_score(scores, k)
+    # Best score per group: sort by group, then score descending
+    order = np.lexsort((-scores, groups))
+    sorted_groups = groups[order]
+    first = np.flatnonzero(np.concatenate([[True], sorted_groups[1:] != sorted_groups[:-1]]))
+    return kth_best_score(scores[order][first], k)
+
+
+def score_candidates_pruned(
+    query_norm: str,
+    candidate_norms: Sequence[str],
+    top_k: int,
+    threshold: float = -np.inf,
+    workers: int = 1,
+    chunk_size: int = PRUNING_CHUNK_SIZE,
+    groups: Optional[np.ndarray] = None,
+    deadline: Optional[float] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score candidates while skipping work that cannot change the top-k.
+    
+    Candidates are scored in chunks (in the given priority order) while tracking
+    the running k-th best composite score. For each chunk, candidates are
+    rejected as soon as an upper bound on their composite score falls below it:
+    
+    1. Length bound: token_sort_ratio is an Indel ratio over strings of the
+       input lengths, so it is at most 2 * min(len) / (len_q + len_c).
+    2. token_sort_ratio, then token_set_ratio, with RapidFuzz ``score_cutoff``
+       set to the minimum value that could still reach the threshold.
+    3. partial_ratio (the most expensive metric) only for the survivors, again
+       with a derived ``score_cutoff``.
+    
+    Scores for any candidate that can enter the top-k are exact, so ranking
+    the returned composite scores gives the same top-k (scores and
+    similarity metrics) as exhaustive scoring.
+    
+    When the caller ranks groups of candidates (entities) rather than single
+    candidates, ``groups`` makes the running threshold the k-th best group
+    score, so candidates are only rejected if their group cannot enter the
+    top-k groups.
+    
+    With a ``deadline``, scoring stops at the first chunk boundary past it
+    (the first chunk is always scored); the remaining candidates are left
+    unscored and ranking only covers the scored prefix.
+    
+    Note:
+        Relies on normalized names having single spaces between tokens (as
+        produced by ``normalize_text``), so sorting tokens keeps the length.
+    
+    Args:
+        query_norm: Normalized query string
+        candidate_norms: Sequence of normalized candidate strings
+        top_k: Number of top results the caller will select
+        threshold: Known k-th best composite score from earlier candidates
+        workers: Number of scoring threads (-1 uses all cores)
+        chunk_size: Candidates scored per threshold update
+        groups: Optional group id per candidate (top-k is over groups)
+        deadline: Optional ``time.perf_counter()`` value to stop scoring at
+        stats: Optional dict that receives 'scored', the number of candidates
+            scored before the deadline (all of them without one)
+        
+    Returns:
+        Tuple of (set_scores, sort_scores, partial_scores, composite_scores).
+        Rejected candidates have a composite score below the final threshold
+        (-inf when rejected before partial_ratio or left unscored).
+    """
+    n = len(candidate_norms)
+    set_scores = np.zeros(n)
+    sort_scores = np.zeros(n)
+    partial_scores = np.zeros(n)
+    composite_scores = np.full(n, -np.inf)
+    if stats is not None:
+        stats['scored'] = n
+    if n == 0:
+        return set_scores, sort_scores, partial_scores, composite_scores
+    
+    norms = np.empty(n, dtype=object)
+    norms[:] = list(candidate_norms)
+    query_len = len(query_norm)
+    lengths = np.fromiter((len(c) for c in norms), dtype=np.float64, count=n)
+    total = np.maximum(lengths + query_len, 1.0)
+    length_bound = (
+        SET_WEIGHT + PARTIAL_WEIGHT +
+        SORT_WEIGHT * (2.0 * np.minimum(lengths, query_len) / total)
     )
+    
+    kth = threshold
+    best = np.empty(0)
+    group_best: Dict[int, float] = {}
+    
+    def admit(positions: Union[slice, np.ndarray], kth: float) -> float:
+        # Track the k best exact scores (or group bests); return the new threshold
+        nonlocal best, group_best
+        if groups is None:
+            best = np.concatenate([best, composite_scores[positions]])
+            if len(best) < top_k:
+                return kth
+            best = np.partition(best, len(best) - top_k)[len(best) - top_k:]
+            return max(kth, float(best.min()))
+        
+        # Scores at or below the threshold cannot lift a group into the top-k
+        scores = composite_scores[positions]
+        above = scores > kth
+        updated = False
+        for group, score in zip(groups[positions][above].tolist(), scores[above].tolist()):
+            if score > group_best.get(group, -np.inf):
+                group_best[group] = score
+                updated = True
+        if updated and len(group_best) >= top_k:
+            kth = max(kth, heapq.nlargest(top_k, group_best.values())[-1])
+            group_best = {group: score for group, score in group_best.items() if score >= kth}
+        return kth
+    
+    def cutoff_for(required: float) -> Optional[float]:
+        # RapidFuzz keeps scores >= cutoff; loosen slightly for float rounding.
+        # Required values above 1 can't be met and are rejected by the bound check.
+        return min(required - _PRUNE_EPS, 1.0) if required > _PRUNE_EPS else None
+    
+    for start in range(0, n, chunk_size):
+        if deadline is not None and start > 0 and time.perf_counter() >= deadline:
+            if stats is not None:
+                stats['scored'] = start
+            break
+        stop = min(start + chunk_size, n)
+        if kth == -np.inf:
+            # No threshold yet (first chunk of Stage 1): nothing can be pruned
+            chunk = slice(start, stop)
+            set_scores[chunk], sort_scores[chunk], partial_scores[chunk] = (
+                compute_similarity_batch(query_norm, norms[chunk].tolist(), workers=workers)
+            )
+            composite_scores[chunk] = composite_score_batch(
+                set_scores[chunk], sort_scores[chunk], partial_scores[chunk]
+            )
+            kth = admit(chunk, kth)
+            continue
+        
+        alive = np.arange(start, stop)
+        alive = alive[length_bound[alive] >= kth - _PRUNE_EPS]
+        
+        # token_sort_ratio: bound = sort + best case for set and partial
+        if len(alive) > 0:
+            required = (kth - SET_WEIGHT - PARTIAL_WEIGHT) / SORT_WEIGHT
+            sort_scores[alive] = _score_metric(
+                query_norm, norms[alive].tolist(), fuzz.token_sort_ratio,
+                workers, cutoff_for(required)
+            )
+            bound = SORT_WEIGHT * sort_scores[alive] + SET_WEIGHT + PARTIAL_WEIGHT
+            alive = alive[bound >= kth - _PRUNE_EPS]
+        
+        # token_set_ratio: bound = set + sort + best case for partial
+        if len(alive) > 0:
+            required = (kth - PARTIAL_WEIGHT - SORT_WEIGHT * sort_scores[alive].max()) / SET_WEIGHT
+            set_scores[alive] = _score_metric(
+                query_norm, norms[alive].tolist(), fuzz.token_set_ratio,
+                workers, cutoff_for(required)
+            )
+            bound = SET_WEIGHT * set_scores[alive] + SORT_WEIGHT * sort_scores[alive] + PARTIAL_WEIGHT
+            alive = alive[bound >= kth - _PRUNE_EPS]
+        
+        # partial_ratio for the survivors, then exact composite scores
+        if len(alive) > 0:
+            partial_base = SET_WEIGHT * set_scores[alive] + SORT_WEIGHT * sort_scores[alive]
+            required = (kth - partial_base.max()) / PARTIAL_WEIGHT
+            partial_scores[alive] = _score_metric(
+                query_norm, norms[alive].tolist(), fuzz.partial_ratio,
+                workers, cutoff_for(required)
+            )
+            composite_scores[alive] = composite_score_batch(
+                set_scores[alive], sort_scores[alive], partial_scores[alive]
+            )
+            
+            # Update the running k-th best composite score
+            kth = admit(alive, kth)
+    
+    return set_scores, sort_scores, partial_scores, composite_scores
+
+
+def _object_column(df: pd.DataFrame, column: str, default: Any = None) -> np.ndarray:
+    """Extract a column as an object array with missing values mapped to ``default``."""
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=object)
+    values = df[column].astype(object)
+    return values.where(values.notna(), default).to_numpy(dtype=object)
+
+
+def _interned_column(df: pd.DataFrame, column: str, default: Any = None) -> np.ndarray:
+    """
+    Extract a low-cardinality column as an object array backed by a string table.
+
+    Values are factorized once so every row references one shared string object
+    per distinct value (countries, programs, sources repeat heavily).
+    """
+    values = _object_column(df, column, default)
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    table = np.empty(len(uniques) + 1, dtype=object)
+    table[:-1] = uniques
+    table[-1] = default
+    return table[codes]
+
+
+@dataclass
+class CandidateStore:
+    """
+    Columnar, pandas-free view of the sanctions index used on the screening hot path.
+    
+    Built once at load so candidates can be gathered with NumPy fancy indexing
+    instead of materializing a pandas row per candidate. When opened from an
+    artifact, the metadata columns are memory-mapped ``StringColumn`` /
+    ``CategoricalColumn`` views decoded per returned match.
+    
+    Attributes:
+        name_norm: Normalized names used for scoring
+        name: Original names from the sanctions list
+        uid: Unique record identifiers
+        country: Country per record (None if unknown)
+        program: Sanctions program string per record (None if unknown)
+        source: Source list per record ('SDN' or 'Consolidated')
+        entity_id: Sanctioned entity id (``ent_num``) per record (None if unknown)
+        name_group: Id of each record's distinct ``name_norm`` (records sharing
+            a normalized name are scored once)
+        entity_group: Id of each record's entity (source + entity_id; records
+            without an entity id are their own entity)
+    """
+    name_norm: np.ndarray
+    name: np.ndarray
+    uid: np.ndarray
+    country: np.ndarray
+    program: np.ndarray
+    source: np.ndarray
+    entity_id: np.ndarray
+    name_group: Optional[np.ndarray] = None
+    entity_group: Optional[np.ndarray] = None
+    
+    def __post_init__(self) -> None:
+        if self.name_group is None or self.entity_group is None:
+            self.name_group, self.entity_group = self._groups()
+    
+    def _groups(self) -> tuple[np.ndarray, np.ndarray]:
+        """Compute the name and entity group ids (see class attributes)."""
+        name_group = pd.factorize(np.asarray(self.name_norm, dtype=object))[0].astype(np.int32)
+        
+        entity = pd.Series(list(self.entity_id), dtype=object)
+        keys = pd.Series(list(self.source), dtype=object).astype(str) + '\x1f' + entity.astype(str)
+        entity_group = pd.factorize(keys)[0].astype(np.int32)
+        missing = entity.isna().to_numpy()
+        if missing.any():
+            start = entity_group.max(initial=-1) + 1
+            entity_group[missing] = np.arange(start, start + missing.sum(), dtype=np.int32)
+        return name_group, entity_group
+    
+    @classmethod
+    def from_frame(cls, sanctions_index: pd.DataFrame) -> "CandidateStore":
+        """Build the store from a sanctions index DataFrame."""
+        return cls(
+            name_norm=_object_column(sanctions_index, 'name_norm', ''),
+            name=_object_column(sanctions_index, 'name'),
+            uid=_object_column(sanctions_index, 'uid'),
+            country=_interned_column(sanctions_index, 'country'),
+            program=_interned_column(sanctions_index, 'program'),
+            source=_interned_column(sanctions_index, 'source', 'SDN'),
+            entity_id=_object_column(sanctions_index, 'ent_num')
+        )
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a pickled store (stores pickled before ``entity_id`` get None)."""
+        self.__dict__.update(state)
+        if 'entity_id' not in state:
+            self.entity_id = np.full(len(self.name_norm), None, dtype=object)
+        if state.get('name_group') is None or state.get('entity_group') is None:
+            self.name_group, self.entity_group = self._groups()
+    
+    def __len__(self) -> int:
+        return len(self.name_norm)
+    
+    def append(self, records: List[Dict[str, Any]]) -> "CandidateStore":
+        """
+        Return a new store with ``records`` appended (``self`` is left unchanged).
+        
+        Memory-mapped artifact columns are decoded into object arrays.
+        """
+        columns = {}
+        for column in ('name_norm', 'name', 'uid', 'country', 'program', 'source', 'entity_id'):
+            existing = getattr(self, column)
+            if not isinstance(existing, np.ndarray):
+                existing = existing.to_array() if hasattr(existing, 'to_array') else np.array(
+                    list(existing), dtype=object
+                )
+            added = np.empty(len(records), dtype=object)
+            added[:] = [record.get(column) for record in records]
+            columns[column] = np.concatenate([existing.astype(object, copy=False), added])
+        return CandidateStore(**columns)
+    
+    def valid_indices(self, indices: List[int]) -> np.ndarray:
+        """Convert candidate indices to an array, dropping out-of-range entries."""
+        idx = np.asarray(indices, dtype=np.intp)
+        return idx[(idx >= 0) & (idx < len(self))]
+    
+    def metadata(self, idx: int) -> Dict[str, Any]:
+        """Build the metadata dict for a single record."""
+        return {
+            'uid': self.uid[idx],
+            'name': self.name[idx],
+            'country': self.country[idx],
+            'program': self.program[idx],
+            'source': self.source[idx]
+        }
+
+
+def _phonetic_postings(names_norm: Iterable[str]) -> PostingLists:
+    """Index rows by the phonetic key of each name token."""
+    return PostingLists.build(phonetic_keys(tokens) for tokens in tokenize_series(names_norm))
+
+
+def _filter_postings(store: CandidateStore) -> Dict[str, PostingLists]:
+    """Index rows by country and by individual program code."""
+    return {
+        'country': PostingLists.build([c] if c else [] for c in store.country),
+        'program': PostingLists.build(parse_programs(p) for p in store.program)
+    }
+
+
+@dataclass
+class ScreenerSnapshot:
+    """
+    One version of the sanctions list with everything ``screen()`` reads.
+    
+    A snapshot is never modified after it is published (lazily built indexes
+    aside): list updates build a new snapshot and swap the screener's
+    reference, so in-flight screens finish on the snapshot they started with.
+    
+    Attributes:
+        version: Sanctions list version (reported as SanctionsResponse.version)
+        store: Columnar candidate store
+        postings: Blocking posting lists ('first_token', 'bucket', 'initials', 'phonetic')
+        filter_postings: Country/program posting lists for filter push-down
+        active: Boolean mask of live rows (None = all live). Rows removed or
+            replaced by a delta stay in the arrays and are masked out.
+        generation: Incremented on every swap (part of the result cache key)
+        token_index: IDF token index ('idf' strategy, built lazily)
+        ngram_index: Character n-gram index ('ngram' strategy, built lazily)
+        ann_index: Hashed n-gram ANN index ('ann' Stage 2 expansion)
+    """
+    version: str
+    store: CandidateStore
+    postings: Dict[str, PostingLists]
+    filter_postings: Dict[str, PostingLists]
+    active: Optional[np.ndarray] = None
+    generation: int = 0
+    token_index: Optional[TokenIndex] = None
+    ngram_index: Optional[NgramIndex] = None
+    ann_index: Optional[HashedNgramIndex] = None
+    
+    @property
+    def active_rows(self) -> int:
+        """Number of live rows."""
+        return len(self.store) if self.active is None else int(self.active.sum())
+
+
+@dataclass
+class SanctionsDelta:
+    """
+    Incremental sanctions list update.
+    
+    Attributes:
+        version: List version after the update (e.g. the OFAC publication date)
+        upserts: Added or changed records. Each needs 'uid' and 'name' and may set
+            'name_norm', 'ent_num', 'country', 'program' and 'source'. A record
+            whose uid is already listed replaces it.
+        removed_uids: uids of records to remove
+        removed_entities: Entity ids (``ent_num``) whose records are all removed
+    """
+    version: str
+    upserts: List[Dict[str, Any]] = field(default_factory=list)
+    removed_uids: List[str] = field(default_factory=list)
+    removed_entities: List[str] = field(default_factory=list)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SanctionsDelta":
+        """Build a delta from a JSON-style dict with the same keys."""
+        return cls(
+            version=str(data['version']),
+            upserts=list(data.get('upserts', [])),
+            removed_uids=[str(uid) for uid in data.get('removed_uids', [])],
+            removed_entities=[str(e) for e in data.get('removed_entities', [])]
+        )
+
+
+def apply_delta(
+    snapshot: ScreenerSnapshot,
+    delta: SanctionsDelta
+) -> tuple[ScreenerSnapshot, Dict[str, int]]:
+    """
+    Build the snapshot that results from applying ``delta`` to ``snapshot``.
+    
+    Removed and replaced rows are masked out via ``active``; new and changed
+    records are appended to the store and their keys merged into the posting
+    lists, so the cost is linear in the list size rather than a full rebuild
+    (no re-normalization or re-tokenization of unchanged names).
+    
+    Args:
+        snapshot: Current snapshot (left unchanged)
+        delta: Update to apply
+        
+    Returns:
+        Tuple of (new snapshot, counts of 'added', 'replaced' and 'removed' records)
+        
+    Raises:
+        ValueError: If an upsert has no uid or name
+    """
+    store = snapshot.store
+    n_rows = len(store)
+    active = np.ones(n_rows, dtype=bool) if snapshot.active is None else snapshot.active.copy()
+    
+    records = []
+    for upsert in delta.upserts:
+        if not upsert.get('uid') or not upsert.get('name'):
+            raise ValueError(f"Delta upserts need a uid and a name, got {upsert!r}")
+        name_norm = upsert.get('name_norm') or normalize_text(upsert['name'])
+        if not name_norm:
+            continue
+        records.append({
+            'name_norm': name_norm,
+            'name': upsert['name'],
+            'uid': str(upsert['uid']),
+            'country': upsert.get('country'),
+            'program': upsert.get('program'),
+            'source': upsert.get('source') or 'SDN',
+            'entity_id': upsert.get('ent_num', upsert.get('entity_id'))
+        })
+    
+    # Retire live rows that are removed or replaced
+    upsert_uids = {record['uid'] for record in records}
+    removed_uids = set(delta.removed_uids) | upsert_uids
+    retire = np.fromiter((uid in removed_uids for uid in store.uid), dtype=bool, count=n_rows)
+    if delta.removed_entities:
+        entities = set(delta.removed_entities)
+        retire |= np.fromiter(
+            (e is not None and str(e) in entities for e in store.entity_id),
+            dtype=bool,
+            count=n_rows
+        )
+    retire &= active
+    replaced = sum(1 for i in np.flatnonzero(retire) if store.uid[i] in upsert_uids)
+    active[retire] = False
+    
+    if records:
+        tokens = [tokenize(record['name_norm']) for record in records]
+        postings = {
+            'first_token': snapshot.postings['first_token'].extend(
+                ([t[0]] if t else [] for t in tokens), n_rows
+            ),
+            'bucket': snapshot.postings['bucket'].extend(
+                ([get_token_count_bucket(t)] for t in tokens), n_rows
+            ),
+            'initials': snapshot.postings['initials'].extend(
+                ([get_initials_signature(t)] if t else [] for t in tokens), n_rows
+            ),
+            'phonetic': snapshot.postings['phonetic'].extend(
+                (phonetic_keys(t) for t in tokens), n_rows
+            )
+        }
+        filter_postings = {
+            'country': snapshot.filter_postings['country'].extend(
+                ([r['country']] if r['country'] else [] for r in records), n_rows
+            ),
+            'program': snapshot.filter_postings['program'].extend(
+                (parse_programs(r['program']) for r in records), n_rows
+            )
+        }
+        store = store.append(records)
+        active = np.concatenate([active, np.ones(len(records), dtype=bool)])
+    else:
+        postings = snapshot.postings
+        filter_postings = snapshot.filter_postings
+    
+    # The ANN index is costly to cluster, so new rows join the existing lists
+    ann_index = snapshot.ann_index
+    if ann_index is not None and records:
+        ann_index = ann_index.extend([record['name_norm'] for record in records])
+    
+    new_snapshot = ScreenerSnapshot(
+        version=delta.version,
+        store=store,
+        postings=postings,
+        filter_postings=filter_postings,
+        active=None if active.all() else active,
+        generation=snapshot.generation + 1,
+        ann_index=ann_index
+    )
+    counts = {
+        'added': len(records) - replaced,
+        'replaced': replaced,
+        'removed': int(retire.sum()) - replaced
+    }
+    return new_snapshot, counts
 
 
 class SanctionsScreener:
@@ -297,6 +1044,10 @@ class SanctionsScreener:
     into payment processing systems. Implements two-stage adaptive scoring
     for optimal latency/recall balance.
     
+    The list itself lives in an immutable ``ScreenerSnapshot``; ``apply_delta``
+    swaps in an updated snapshot atomically while in-flight screens finish on
+    the one they started with.
+    
     Performance targets:
     - Latency: p95 < 50ms
     - Recall: ≥98% on real-world name variations
@@ -309,7 +1060,19 @@ class SanctionsScreener:
         first_token_index: Dict[str, List[int]],
         bucket_index: Dict[str, List[int]],
         initials_index: Dict[str, List[int]],
-        version: str = "1.0.0"
+        version: str = "1.0.0",
+        scoring_workers: int = 1,
+        blocking_strategy: str = 'multi',
+        ngram_candidates: int = 300,
+        cache_size: int = 1000,
+        cache_ttl_seconds: Optional[float] = 300.0,
+        score_pruning: bool = True,
+        phonetic_blocking: bool = True,
+        stage2_strategy: str = 'ann',
+        ann_candidates: int = 300,
+        ann_probes: int = 8,
+        latency_budget_ms: Optional[float] = None,
+        metrics_hook: Optional[MetricsHook] = None
     ):
         """
         Initialize screener with pre-loaded indices.
@@ -319,17 +1082,384 @@ class SanctionsScreener:
             first_token_index: Blocking index by first token
             bucket_index: Blocking index by token count bucket
             initials_index: Blocking index by initials signature
-            version: Version string for tracking
+            version: Sanctions list version (updated by ``apply_delta``)
+            scoring_workers: RapidFuzz threads per screen (-1 uses all cores)
+            blocking_strategy: Candidate retrieval strategy ('multi', 'idf' or 'ngram')
+            ngram_candidates: Number of nearest names the 'ngram' pre-ranker returns
+            cache_size: Maximum number of cached screening results (0 disables the cache)
+            cache_ttl_seconds: Lifetime of cached results in seconds (None = no expiry)
+            score_pruning: Skip candidates that provably cannot reach the top-k
+                (same results as exhaustive scoring; disable to compare)
+            phonetic_blocking: Add per-token phonetic key lookups to the 'multi'
+                strategy (catches spelling variants such as Mohammed/Muhamad)
+            stage2_strategy: How Stage 2 expands when Stage 1 is inconclusive:
+                'ann' scores the nearest names list-wide by hashed n-gram
+                similarity, 'priority' the next blocking candidates
+            ann_candidates: Names the 'ann' expansion scores (bounds Stage 2 cost)
+            ann_probes: Inverted lists the ANN search scans
+            latency_budget_ms: Default latency budget for ``screen`` (None = no
+                budget); see its ``deadline_ms``
+            metrics_hook: Optional callable receiving (query, ScreeningTrace) after
+                every ``screen``; it runs inline, so it should only record
         """
+        if blocking_strategy not in BLOCKING_STRATEGIES:
+            raise ValueError(
+                f"blocking_strategy must be one of {BLOCKING_STRATEGIES}, got '{blocking_strategy}'"
+            )
+        if stage2_strategy not in STAGE2_STRATEGIES:
+            raise ValueError(
+                f"stage2_strategy must be one of {STAGE2_STRATEGIES}, got '{stage2_strategy}'"
+            )
+        if latency_budget_ms is not None and latency_budget_ms <= 0:
+            raise ValueError(f"latency_budget_ms must be > 0, got {latency_budget_ms}")
+        
+        # Source data as built (list updates only change the snapshot)
         self.sanctions_index = sanctions_index
         self.first_token_index = first_token_index
         self.bucket_index = bucket_index
         self.initials_index = initials_index
-        self.version = version
+        self.scoring_workers = scoring_workers
+        self.blocking_strategy = blocking_strategy
+        self.ngram_candidates = ngram_candidates
+        self.score_pruning = score_pruning
+        self.phonetic_blocking = phonetic_blocking
+        self.stage2_strategy = stage2_strategy
+        self.ann_candidates = ann_candidates
+        self.ann_probes = ann_probes
+        self.latency_budget_ms = latency_budget_ms
+        self.metrics_hook = metrics_hook
+        
+        # Moving average of the scoring cost per distinct name (sizes budgets)
+        self._unit_cost_ms = DEFAULT_UNIT_COST_MS
+        
+        # Columnar candidate store and CSR posting lists for the hot path
+        store = CandidateStore.from_frame(sanctions_index)
+        self._snapshot = ScreenerSnapshot(
+            version=version,
+            store=store,
+            postings={
+                'first_token': PostingLists.from_dict(first_token_index),
+                'bucket': PostingLists.from_dict(bucket_index),
+                'initials': PostingLists.from_dict(initials_index),
+                'phonetic': _phonetic_postings(store.name_norm)
+            },
+            filter_postings=_filter_postings(store)
+        )
+        self._build_strategy_index(self._snapshot)
+        self._update_lock = threading.Lock()
+        
+        # Bounded LRU/TTL cache for repeated queries (repeat senders)
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._cache = ScreeningCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the result cache, update lock, metrics hook and cost estimate (per-process state)."""
+        state = self.__dict__.copy()
+        state.pop('_cache', None)
+        state.pop('_update_lock', None)
+        state.pop('metrics_hook', None)
+        state.pop('_unit_cost_ms', None)
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a pickled screener, rebuilding the store for older artifacts."""
+        self.__dict__.update(state)
+        self.__dict__.setdefault('cache_size', state.get('_cache_max_size', 1000))
+        self.__dict__.setdefault('cache_ttl_seconds', 300.0)
+        self.__dict__.pop('_cache_max_size', None)
+        self._cache = ScreeningCache(max_size=self.cache_size, ttl_seconds=self.cache_ttl_seconds)
+        self.__dict__.setdefault('scoring_workers', 1)
+        self.__dict__.setdefault('blocking_strategy', 'multi')
+        self.__dict__.setdefault('ngram_candidates', 300)
+        self.__dict__.setdefault('score_pruning', True)
+        self.__dict__.setdefault('phonetic_blocking', True)
+        self.__dict__.setdefault('stage2_strategy', 'ann')
+        self.__dict__.setdefault('ann_candidates', 300)
+        self.__dict__.setdefault('ann_probes', 8)
+        self.__dict__.setdefault('latency_budget_ms', None)
+        self.__dict__.setdefault('metrics_hook', None)
+        self.__dict__.setdefault('_unit_cost_ms', DEFAULT_UNIT_COST_MS)
+        self._update_lock = threading.Lock()
+        if '_snapshot' not in state:
+            self._snapshot = self._snapshot_from_legacy_state(state)
+    
+    def _snapshot_from_legacy_state(self, state: Dict[str, Any]) -> ScreenerSnapshot:
+        """Build a snapshot from a screener pickled before snapshots existed."""
+        for key in ('version', 'store', '_postings', '_filter_postings',
+                    '_token_index', '_ngram_index', '_list_generation'):
+            self.__dict__.pop(key, None)
+        
+        store = state['store'] if 'store' in state else CandidateStore.from_frame(self.sanctions_index)
+        postings = dict(state['_postings']) if '_postings' in state else {
+            'first_token': PostingLists.from_dict(self.first_token_index),
+            'bucket': PostingLists.from_dict(self.bucket_index),
+            'initials': PostingLists.from_dict(self.initials_index)
+        }
+        if 'phonetic' not in postings:
+            postings['phonetic'] = _phonetic_postings(store.name_norm)
+        filter_postings = (
+            state['_filter_postings'] if '_filter_postings' in state else _filter_postings(store)
+        )
+        return ScreenerSnapshot(
+            version=state.get('version', '1.0.0'),
+            store=store,
+            postings=postings,
+            filter_postings=filter_postings,
+            generation=state.get('_list_generation', 0),
+            token_index=state.get('_token_index'),
+            ngram_index=state.get('_ngram_index')
+        )
+    
+    def save_artifact(self, path: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Write the screener to a pickle-free, memory-mappable artifact directory.
+        
+        Args:
+            path: Output directory
+            metadata: Optional build information stored in the manifest
+            
+        Returns:
+            The artifact manifest
+        """
+        return save_artifact(self, path, metadata=metadata)
+    
+    @classmethod
+    def open_artifact(
+        cls,
+        path: str,
+        mmap: bool = True,
+        verify: bool = False,
+        **options: Any
+    ) -> "SanctionsScreener":
+        """
+        Open a screener from an artifact written by ``save_artifact``.
+        
+        Arrays are memory-mapped, so opening is near-instant and worker
+        processes share physical pages. Screeners opened this way have no
+        ``sanctions_index`` DataFrame or dict-of-list blocking maps; screening
+        only uses the columnar store and posting lists.
+        
+        Args:
+            path: Artifact directory
+            mmap: Memory-map arrays (False reads them into private memory)
+            verify: Verify array checksums against the manifest (reads every page)
+            **options: Screener options overriding those stored in the manifest
+                (e.g. blocking_strategy, cache_size)
+            
+        Returns:
+            SanctionsScreener ready to screen
+        """
+        artifact = load_artifact_state(path, mmap=mmap, verify=verify)
+        manifest = artifact['manifest']
+        state = {**manifest['screener'], **options}
+        if state.get('blocking_strategy', 'multi') not in BLOCKING_STRATEGIES:
+            raise ValueError(
+                f"blocking_strategy must be one of {BLOCKING_STRATEGIES}, "
+                f"got '{state['blocking_strategy']}'"
+            )
+        if state.get('stage2_strategy', 'ann') not in STAGE2_STRATEGIES:
+            raise ValueError(
+                f"stage2_strategy must be one of {STAGE2_STRATEGIES}, "
+                f"got '{state['stage2_strategy']}'"
+            )
+        state.update({
+            'sanctions_index': None,
+            'first_token_index': None,
+            'bucket_index': None,
+            'initials_index': None,
+            '_snapshot': ScreenerSnapshot(
+                version=manifest['version'],
+                store=CandidateStore(**artifact['columns']),
+                postings=artifact['postings'],
+                filter_postings=artifact['filter_postings'],
+                active=artifact['active'],
+                ann_index=artifact['ann_index']
+            )
+        })
+        
+        screener = cls.__new__(cls)
+        screener.__setstate__(state)
+        
+        # Build the strategy's index up front, as __init__ does
+        screener._build_strategy_index(screener._snapshot)
+        return screener
+    
+    @property
+    def snapshot(self) -> ScreenerSnapshot:
+        """The current list snapshot (read once per screen)."""
+        return self._snapshot
+    
+    @property
+    def version(self) -> str:
+        """Version of the current sanctions list."""
+        return self._snapshot.version
+    
+    @property
+    def store(self) -> CandidateStore:
+        """Columnar candidate store of the current snapshot."""
+        return self._snapshot.store
+    
+    def apply_delta(self, delta: SanctionsDelta) -> Dict[str, Any]:
+        """
+        Apply an incremental list update and swap in the new snapshot.
+        
+        The new snapshot (including the strategy's index) is fully built
+        before the swap, which is a single reference assignment: screens that
+        already started keep using the previous snapshot, new screens see the
+        update. Concurrent updates are serialized.
+        
+        Args:
+            delta: Added, changed and removed records plus the new list version
+            
+        Returns:
+            Dict with the new 'version', the 'added', 'replaced' and 'removed'
+            record counts and the number of 'active_rows'
+        """
+        with self._update_lock:
+            snapshot, counts = apply_delta(self._snapshot, delta)
+            self._build_strategy_index(snapshot)
+            self._snapshot = snapshot
         
-        # Cache for repeated queries (optional optimization)
-        self._cache: Dict[str, List[Dict[str, Any]]] = {}
-        self._cache_max_size = 1000
+        # Entries for the old list can no longer be hit (the key holds the
+        # version and generation); drop them to free the slots
+        self._cache.clear()
+        return {'version': snapshot.version, **counts, 'active_rows': snapshot.active_rows}
+    
+    def _build_strategy_index(self, snapshot: ScreenerSnapshot) -> None:
+        """Build the indexes the configured strategies need, if missing."""
+        if self.blocking_strategy == 'idf':
+            self._token_index_for(snapshot)
+        elif self.blocking_strategy == 'ngram':
+            self._ngram_index_for(snapshot)
+        if self.stage2_strategy == 'ann':
+            self._ann_index_for(snapshot)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return result cache counters (size, hits, misses, evictions, expirations)."""
+        return self._cache.stats()
+    
+    @property
+    def unit_cost_ms(self) -> float:
+        """Observed scoring cost per distinct name (moving average, ms)."""
+        return self._unit_cost_ms
+    
+    def invalidate_cache(self) -> None:
+        """Drop all cached results (e.g. after changing the list in place)."""
+        with self._update_lock:
+            self._snapshot = replace(self._snapshot, generation=self._snapshot.generation + 1)
+        self._cache.clear()
+    
+    @staticmethod
+    def _token_index_for(snapshot: ScreenerSnapshot) -> TokenIndex:
+        if snapshot.token_index is None:
+            snapshot.token_index = TokenIndex.build(snapshot.store.name_norm, active=snapshot.active)
+        return snapshot.token_index
+    
+    @staticmethod
+    def _ngram_index_for(snapshot: ScreenerSnapshot) -> NgramIndex:
+        if snapshot.ngram_index is None:
+            snapshot.ngram_index = NgramIndex.build(snapshot.store.name_norm, active=snapshot.active)
+        return snapshot.ngram_index
+    
+    @staticmethod
+    def _ann_index_for(snapshot: ScreenerSnapshot) -> HashedNgramIndex:
+        if snapshot.ann_index is None:
+            snapshot.ann_index = HashedNgramIndex.build(snapshot.store.name_norm)
+        return snapshot.ann_index
+    
+    @property
+    def token_index(self) -> TokenIndex:
+        """IDF-weighted token index over the sanctions list (built lazily)."""
+        return self._token_index_for(self._snapshot)
+    
+    @property
+    def ngram_index(self) -> NgramIndex:
+        """Character n-gram TF-IDF index over the sanctions list (built lazily)."""
+        return self._ngram_index_for(self._snapshot)
+    
+    @property
+    def ann_index(self) -> HashedNgramIndex:
+        """Hashed n-gram ANN index used for Stage 2 expansion (built lazily)."""
+        return self._ann_index_for(self._snapshot)
+    
+    def get_candidates(
+        self,
+        query_norm: str,
+        query_tokens: List[str],
+        limit: Optional[int] = None,
+        allowed: Optional[np.ndarray] = None,
+        snapshot: Optional[ScreenerSnapshot] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> tuple[List[int], Dict[int, float]]:
+        """
+        Retrieve prioritized candidates using the configured blocking strategy.
+        
+        Args:
+            query_norm: Normalized query string
+            query_tokens: Tokenized query name
+            limit: Maximum number of candidates needed by the caller
+            allowed: Optional boolean row mask (filter push-down); rows outside
+                it never take a slot in the candidate budget
+            snapshot: List snapshot to search (default: current)
+            stats: Optional dict that receives candidates per blocking strategy
+            
+        Returns:
+            Tuple of (candidate_indices, priority_scores), highest priority first
+        """
+        snapshot = snapshot or self._snapshot
+        if self.blocking_strategy in ('idf', 'ngram'):
+            if self.blocking_strategy == 'idf':
+                candidates = self._token_index_for(snapshot).get_candidates(
+                    query_tokens, limit=limit, allowed=allowed
+                )
+            else:
+                candidates = self._ngram_index_for(snapshot).get_candidates(
+                    query_norm, limit=self.ngram_candidates, allowed=allowed
+                )
+            if stats is not None:
+                stats[self.blocking_strategy] = len(candidates[0])
+            return candidates
+        postings = snapshot.postings
+        return get_candidates(
+            query_tokens,
+            postings['first_token'],
+            postings['bucket'],
+            postings['initials'],
+            limit=limit,
+            allowed=allowed,
+            phonetic_index=postings['phonetic'] if self.phonetic_blocking else None,
+            stats=stats
+        )
+    
+    def _allowed_rows(
+        self,
+        query: SanctionsQuery,
+        snapshot: ScreenerSnapshot
+    ) -> Optional[np.ndarray]:
+        """
+        Resolve country/program filters and removed rows to a boolean row mask.
+        
+        Country must match exactly; the program filter matches any record whose
+        program set contains it (case-insensitive).
+        
+        Returns:
+            Boolean row mask, or None if no filters are set and all rows are live
+        """
+        if not query.country and not query.program:
+            return snapshot.active
+        
+        n_rows = len(snapshot.store)
+        allowed = np.ones(n_rows, dtype=bool) if snapshot.active is None else snapshot.active.copy()
+        for column, key in (('country', query.country), ('program', query.program)):
+            if not key:
+                continue
+            if column == 'program':
+                key = key.strip().upper()
+            mask = np.zeros(n_rows, dtype=bool)
+            mask[snapshot.filter_postings[column].get(key)] = True
+            allowed &= mask
+        return allowed
     
     def screen(
         self,
@@ -337,7 +1467,9 @@ class SanctionsScreener:
         initial_candidates: int = 2000,
         expand_threshold: float = 0.85,
         max_candidates: int = 3000,
-        early_exit_threshold: float = 0.60
+        early_exit_threshold: float = 0.60,
+        debug: bool = False,
+        deadline_ms: Optional[float] = None
     ) -> SanctionsResponse:
         """
         Screen a name against sanctions lists.
@@ -347,183 +1479,713 @@ class SanctionsScreener:
         2. If top score < expand_threshold, expand to max_candidates
         3. Early exit if top score < early_exit_threshold (clear non-match)
         
+        With a latency budget (``deadline_ms``, or the screener's
+        ``latency_budget_ms``), each stage's candidate count is capped to what
+        the remaining budget affords at the observed per-name scoring cost,
+        and candidates are scored in priority order in chunks until the
+        deadline passes. Screens cut short return the best matches found so
+        far with ``complete=False``.
+        
+        Results are cached per normalized name, filters, top_k and scoring
+        parameters; see ``cache_stats()``. Incomplete results are not cached.
+        
         Args:
             query: SanctionsQuery with name and optional filters
             initial_candidates: Number of candidates to score in Stage 1
             expand_threshold: Score threshold for triggering Stage 2 expansion
             max_candidates: Maximum candidates to score if expanding
             early_exit_threshold: Score threshold for early exit (clear non-match)
+            debug: Attach per-stage timings and counters (``ScreeningTrace``)
+                to the response's ``debug`` field
+            deadline_ms: Latency budget in milliseconds from the start of the
+                call (default: the screener's ``latency_budget_ms``)
             
         Returns:
             SanctionsResponse with top matches and metadata
         """
         start_time = time.time()
+        budget_ms = deadline_ms if deadline_ms is not None else self.latency_budget_ms
+        deadline = time.perf_counter() + budget_ms / 1000 if budget_ms is not None else None
+        metrics_hook = self.metrics_hook
+        trace = ScreeningTrace() if debug or metrics_hook is not None else None
+        if trace is not None and budget_ms is not None:
+            trace.counters['budget_ms'] = budget_ms
         
         # Normalize and tokenize query
         query_norm = normalize_text(query.name)
         query_tokens = tokenize(query_norm)
         
-        if not query_tokens:
-            return SanctionsResponse(
-                query=query.name,
-                top_matches=[],
-                applied_filters={'country': query.country, 'program': query.program},
-                latency_ms=(time.time() - start_time) * 1000,
-                version=self.version
+        # Read the snapshot once; a concurrent list update swaps in a new one
+        snapshot = self._snapshot
+        if trace is not None:
+            trace.lap('normalize')
+        
+        cache_key = self._cache_key(
+            snapshot, query, query_norm,
+            (initial_candidates, expand_threshold, max_candidates, early_exit_threshold)
+        )
+        cached = self._cache.get(cache_key)
+        if trace is not None:
+            trace.counters['cache_hit'] = cached is not None
+            trace.lap('cache')
+        
+        complete = True
+        if cached is None:
+            matches, candidate_counts, complete = self._match(
+                snapshot,
+                query,
+                query_norm,
+                query_tokens,
+                initial_candidates=initial_candidates,
+                expand_threshold=expand_threshold,
+                max_candidates=max_candidates,
+                early_exit_threshold=early_exit_threshold,
+                trace=trace,
+                deadline=deadline
+            ) if query_tokens else ([], {}, True)
+            cached = (tuple(matches), candidate_counts)
+            if complete:
+                self._cache.put(cache_key, cached)
+            if trace is not None:
+                trace.lap('cache')
+        matches, candidate_counts = cached
+        
+        latency_ms = (time.time() - start_time) * 1000
+        if metrics_hook is not None:
+            metrics_hook(query, trace)
+        
+        return SanctionsResponse(
+            query=query.name,
+            top_matches=list(matches),
+            applied_filters={'country': query.country, 'program': query.program},
+            latency_ms=latency_ms,
+            version=snapshot.version,
+            candidate_counts=dict(candidate_counts),
+            debug=trace.to_dict() if debug else None,
+            complete=complete
+        )
+    
+    def screen_many(
+        self,
+        queries: Sequence[SanctionsQuery],
+        initial_candidates: int = 2000,
+        expand_threshold: float = 0.85,
+        max_candidates: int = 3000,
+        early_exit_threshold: float = 0.60,
+        workers: int = -1
+    ) -> List[SanctionsResponse]:
+        """
+        Screen many names in one call (batch endpoints, bulk jobs).
+        
+        Queries that normalize to the same name (with the same filters and
+        top_k) are screened once, cached results are reused, and the
+        query x candidate pairs of all remaining queries are scored together
+        in one multi-threaded RapidFuzz pass per stage. Results are the same
+        as calling ``screen`` per query (see ``screen`` for the parameters).
+        Batches are throughput-bound, so latency budgets do not apply: every
+        result is complete.
+        
+        Args:
+            queries: Queries to screen
+            initial_candidates: Number of candidates to score in Stage 1
+            expand_threshold: Score threshold for triggering Stage 2 expansion
+            max_candidates: Maximum candidates to score if expanding
+            early_exit_threshold: Score threshold for early exit (clear non-match)
+            workers: Scoring threads for the batch pass (-1 uses all cores)
+            
+        Returns:
+            One SanctionsResponse per query, in order. ``latency_ms`` is the
+            latency of the whole batch.
+        """
+        start_time = time.time()
+        snapshot = self._snapshot
+        store = snapshot.store
+        params = (initial_candidates, expand_threshold, max_candidates, early_exit_threshold)
+        
+        # Dedupe by cache key and serve cached results
+        keys = []
+        results: Dict[tuple, tuple] = {}
+        pending: Dict[tuple, tuple] = {}
+        for query in queries:
+            query_norm = normalize_text(query.name)
+            key = self._cache_key(snapshot, query, query_norm, params)
+            keys.append(key)
+            if key in results or key in pending:
+                continue
+            query_tokens = tokenize(query_norm)
+            cached = self._cache.get(key) if query_tokens else ((), {})
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = (query, query_norm, query_tokens)
+        
+        # Blocking per unique query
+        work = []
+        for key, (query, query_norm, query_tokens) in pending.items():
+            candidate_indices, counts, allowed = self._retrieve(
+                snapshot, query, query_norm, query_tokens, max(initial_candidates, max_candidates)
             )
+            candidate_idx_map = store.valid_indices(candidate_indices[:initial_candidates])
+            work.append((key, query, query_norm, candidate_indices, counts, candidate_idx_map, allowed))
         
-        # Get candidates with prioritization
-        candidate_indices, priority_scores = get_candidates(
-            query_tokens,
-            self.first_token_index,
-            self.bucket_index,
-            self.initials_index
+        # Stage 1: all pairs in one pass
+        scores = []
+        for (_, _, _, _, counts, _, _), (item_scores, scored) in zip(work, self._score_row_pairs(
+            store,
+            [(query_norm, idx_map, query.top_k, -np.inf)
+             for _, query, query_norm, _, _, idx_map, _ in work],
+            workers
+        )):
+            scores.append(item_scores)
+            counts['stage1'] = scored
+        
+        # Stage 2: one more pass for the queries that need expanding
+        expand = []
+        for position, (_, query, query_norm, candidate_indices, counts, idx_map, allowed) in enumerate(work):
+            if self._needs_expansion(
+                scores[position][3], candidate_indices, initial_candidates,
+                expand_threshold, early_exit_threshold
+            ):
+                additional_idx_map, _ = self._expansion_rows(
+                    snapshot, query_norm, candidate_indices, idx_map,
+                    initial_candidates, max_candidates, allowed
+                )
+                expand.append((position, query_norm, additional_idx_map, query.top_k))
+        # Stage 1's k-th best entity score seeds each query's pruning threshold
+        stage2 = self._score_row_pairs(
+            store,
+            [(query_norm, idx_map, top_k, kth_best_group_score(
+                scores[position][3], store.entity_group[work[position][5]], top_k
+            )) for position, query_norm, idx_map, top_k in expand],
+            workers
         )
+        for (position, _, additional_idx_map, _), (add_scores, scored) in zip(expand, stage2):
+            work[position][4]['stage2'] = scored
+            scores[position] = tuple(
+                np.concatenate([stage1, added]) for stage1, added in zip(scores[position], add_scores)
+            )
+            item = work[position]
+            work[position] = item[:5] + (np.concatenate([item[5], additional_idx_map]), item[6])
         
-        if not candidate_indices:
-            return SanctionsResponse(
+        for (key, query, _, _, counts, idx_map, _), item_scores in zip(work, scores):
+            matches = self._build_matches(store, idx_map, *item_scores, top_k=query.top_k)
+            results[key] = (tuple(matches), counts)
+            self._cache.put(key, results[key])
+        
+        latency_ms = (time.time() - start_time) * 1000
+        responses = []
+        for query, key in zip(queries, keys):
+            matches, candidate_counts = results[key]
+            responses.append(SanctionsResponse(
                 query=query.name,
-                top_matches=[],
+                top_matches=list(matches),
                 applied_filters={'country': query.country, 'program': query.program},
-                latency_ms=(time.time() - start_time) * 1000,
-                version=self.version
-            )
+                latency_ms=latency_ms,
+                version=snapshot.version,
+                candidate_counts=dict(candidate_counts)
+            ))
+        return responses
+    
+    @staticmethod
+    def _cache_key(
+        snapshot: ScreenerSnapshot,
+        query: SanctionsQuery,
+        query_norm: str,
+        params: tuple
+    ) -> tuple:
+        # Version and list generation are part of the key, so entries from a
+        # previous list can never be served after it changes
+        return (
+            snapshot.version, snapshot.generation,
+            query_norm, query.country, query.program, query.top_k,
+            *params
+        )
+    
+    def _score_row_pairs(
+        self,
+        store: CandidateStore,
+        items: List[tuple[str, np.ndarray, int, float]],
+        workers: int
+    ) -> List[tuple[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], int]]:
+        """
+        ``_score_pairs`` over scoring units: each distinct normalized name in an
+        item is scored once and its scores fan out to all of its rows.
         
-        # Stage 1: Score top priority candidates
-        high_priority_candidates = [
-            idx for idx in candidate_indices
-            if priority_scores.get(idx, 0) >= 3
+        Returns:
+            ((set, sort, partial, composite) per row, distinct names scored) per item
+        """
+        units = [self._scoring_units(store, rows) for _, rows, _, _ in items]
+        scores = self._score_pairs(
+            store,
+            [(query_norm, unit_rows, top_k, threshold)
+             for (query_norm, _, top_k, threshold), (unit_rows, _) in zip(items, units)],
+            workers
+        )
+        return [
+            (tuple(score[unit_of_row] for score in item_scores), len(unit_rows))
+            for item_scores, (unit_rows, unit_of_row) in zip(scores, units)
         ]
+    
+    def _score_pairs(
+        self,
+        store: CandidateStore,
+        items: List[tuple[str, np.ndarray, int, float]],
+        workers: int
+    ) -> List[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Score several queries' candidates in one pairwise pass.
         
-        if len(high_priority_candidates) > 0:
-            remaining_slots = initial_candidates - len(high_priority_candidates)
-            if remaining_slots > 0:
-                other_candidates = [
-                    idx for idx in candidate_indices
-                    if idx not in high_priority_candidates
-                ][:remaining_slots]
-                candidates_to_score = high_priority_candidates + other_candidates
-            else:
-                candidates_to_score = high_priority_candidates[:initial_candidates]
+        With score pruning enabled, token_set and token_sort are computed for
+        every pair first; partial_ratio (the most expensive metric, weighted
+        at most PARTIAL_WEIGHT) is then skipped for pairs whose upper bound is
+        below the k-th best entity lower bound of their query. As in
+        ``score_candidates_pruned``, the top-k is unchanged.
+        
+        Args:
+            store: Candidate store of the snapshot being screened
+            items: (query_norm, candidate rows, top_k, threshold) per query
+            workers: Scoring threads (-1 uses all cores)
+            
+        Returns:
+            (set, sort, partial, composite) score arrays per item
+        """
+        if not items:
+            return []
+        lengths = [len(item[1]) for item in items]
+        bounds = np.cumsum(lengths)[:-1]
+        pair_queries = [item[0] for item in items for _ in range(len(item[1]))]
+        pair_candidates = store.name_norm[np.concatenate([item[1] for item in items])].tolist()
+        
+        if not self.score_pruning:
+            set_scores, sort_scores, partial_scores = compute_similarity_pairs(
+                pair_queries, pair_candidates, workers=workers
+            )
+            composite_scores = composite_score_batch(set_scores, sort_scores, partial_scores)
         else:
-            candidates_to_score = candidate_indices[:initial_candidates]
-        
-        # Pre-extract candidate data
-        candidate_norm_list = []
-        candidate_metadata = []
-        candidate_idx_map = []
-        
-        for idx in candidates_to_score:
-            try:
-                candidate = self.sanctions_index.iloc[idx]
-                candidate_norm_list.append(candidate['name_norm'])
-                candidate_metadata.append({
-                    'uid': candidate['uid'],
-                    'name': candidate['name'],
-                    'country': candidate.get('country'),
-                    'program': candidate.get('program'),
-                    'source': candidate.get('source', 'SDN')
-                })
-                candidate_idx_map.append(idx)
-            except (IndexError, KeyError):
-                continue
+            set_scores, sort_scores = (
+                process.cpdist(
+                    pair_queries, pair_candidates, scorer=scorer, dtype=SCORE_DTYPE, workers=workers
+                ) / 100.0
+                for scorer in (fuzz.token_set_ratio, fuzz.token_sort_ratio)
+            )
+            lower = SET_WEIGHT * set_scores + SORT_WEIGHT * sort_scores
+            keep = np.zeros(len(lower), dtype=bool)
+            for (_, rows, top_k, threshold), start, item_lower in zip(
+                items, np.concatenate([[0], bounds]), np.split(lower, bounds)
+            ):
+                kth = max(threshold, kth_best_group_score(item_lower, store.entity_group[rows], top_k))
+                keep[start:start + len(item_lower)] = item_lower + PARTIAL_WEIGHT >= kth - _PRUNE_EPS
+            
+            partial_scores = np.zeros(len(lower))
+            kept = np.flatnonzero(keep)
+            if len(kept) > 0:
+                partial_scores[kept] = process.cpdist(
+                    [pair_queries[i] for i in kept], [pair_candidates[i] for i in kept],
+                    scorer=fuzz.partial_ratio, dtype=SCORE_DTYPE, workers=workers
+                ) / 100.0
+            composite_scores = np.full(len(lower), -np.inf)
+            composite_scores[kept] = composite_score_batch(
+                set_scores[kept], sort_scores[kept], partial_scores[kept]
+            )
         
-        if not candidate_norm_list:
-            return SanctionsResponse(
-                query=query.name,
-                top_matches=[],
-                applied_filters={'country': query.country, 'program': query.program},
-                latency_ms=(time.time() - start_time) * 1000,
-                version=self.version
+        return list(zip(*(
+            np.split(scores, bounds)
+            for scores in (set_scores, sort_scores, partial_scores, composite_scores)
+        )))
+    
+    def _score(
+        self,
+        query_norm: str,
+        candidate_norms: List[str],
+        top_k: int,
+        threshold: float = -np.inf,
+        groups: Optional[np.ndarray] = None,
+        deadline: Optional[float] = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score candidates, with score-bound pruning (top-k over ``groups``) unless disabled.
+        
+        With a ``deadline``, candidates are scored in chunks until it passes
+        (see ``score_candidates_pruned`` for ``deadline`` and ``stats``).
+        """
+        if self.score_pruning:
+            return score_candidates_pruned(
+                query_norm, candidate_norms, top_k,
+                threshold=threshold, workers=self.scoring_workers, groups=groups,
+                deadline=deadline, stats=stats
             )
         
-        # Stage 1: Batch score initial candidates
-        set_scores, sort_scores, partial_scores = compute_similarity_batch(
-            query_norm,
-            candidate_norm_list
+        n = len(candidate_norms)
+        set_scores, sort_scores, partial_scores = np.zeros(n), np.zeros(n), np.zeros(n)
+        composite_scores = np.full(n, -np.inf)
+        step = n if deadline is None else PRUNING_CHUNK_SIZE
+        scored = n
+        for start in range(0, n, max(step, 1)):
+            if deadline is not None and start > 0 and time.perf_counter() >= deadline:
+                scored = start
+                break
+            chunk = slice(start, start + step)
+            set_scores[chunk], sort_scores[chunk], partial_scores[chunk] = compute_similarity_batch(
+                query_norm, candidate_norms[chunk], workers=self.scoring_workers
+            )
+            composite_scores[chunk] = composite_score_batch(
+                set_scores[chunk], sort_scores[chunk], partial_scores[chunk]
+            )
+        if stats is not None:
+            stats['scored'] = scored
+        return set_scores, sort_scores, partial_scores, composite_scores
+    
+    @staticmethod
+    def _scoring_units(store: CandidateStore, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Collapse candidate rows that share a normalized name into scoring units.
+        
+        Returns:
+            Tuple of (first row of each unit, in candidate order; unit position of each row)
+        """
+        _, first, inverse = np.unique(store.name_group[rows], return_index=True, return_inverse=True)
+        order = np.argsort(first, kind='stable')
+        position = np.empty(len(order), dtype=np.intp)
+        position[order] = np.arange(len(order))
+        return rows[first[order]], position[inverse.ravel()]
+    
+    def _score_rows(
+        self,
+        store: CandidateStore,
+        query_norm: str,
+        rows: np.ndarray,
+        top_k: int,
+        threshold: float = -np.inf,
+        trace: Optional[ScreeningTrace] = None,
+        stage: str = 'stage1',
+        deadline: Optional[float] = None
+    ) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], int, int]:
+        """
+        Score candidate rows, scoring each distinct normalized name once.
+        
+        Unit scores fan out to every row of the unit. Pruning ranks entities,
+        so the top-k entities come out exact (see ``_build_matches``). The
+        scoring time feeds the per-name cost estimate behind latency budgets.
+        
+        Returns:
+            Tuple of ((set, sort, partial, composite) per row, distinct names
+            scored, distinct names left unscored at the deadline)
+        """
+        unit_rows, unit_of_row = self._scoring_units(store, rows)
+        candidate_norms = store.name_norm[unit_rows].tolist()
+        if trace is not None:
+            trace.lap('extract')
+        stats: Dict[str, Any] = {}
+        started = time.perf_counter()
+        scores = self._score(
+            query_norm, candidate_norms, top_k,
+            threshold=threshold, groups=store.entity_group[unit_rows],
+            deadline=deadline, stats=stats
         )
+        if stats['scored'] == len(unit_rows):
+            self._observe_unit_cost((time.perf_counter() - started) * 1000, len(unit_rows))
+        if trace is not None:
+            trace.lap(stage)
+        return (
+            tuple(score[unit_of_row] for score in scores),
+            stats['scored'],
+            len(unit_rows) - stats['scored']
+        )
+    
+    def _observe_unit_cost(self, elapsed_ms: float, units: int) -> None:
+        """Fold a completed scoring pass into the per-name cost moving average."""
+        # Short passes are dominated by the unpruned first chunk and fixed
+        # overhead, and would overstate the cost
+        if units >= 4 * PRUNING_CHUNK_SIZE:
+            self._unit_cost_ms += UNIT_COST_SMOOTHING * (elapsed_ms / units - self._unit_cost_ms)
+    
+    def _candidate_budget(self, deadline: float, wanted: int, minimum: int = 0) -> int:
+        """
+        Number of candidates (at most ``wanted``) the time left before
+        ``deadline`` affords at the observed per-name scoring cost.
+        """
+        remaining_ms = (deadline - time.perf_counter()) * 1000
+        affordable = int(max(remaining_ms, 0.0) / self._unit_cost_ms)
+        return min(wanted, max(affordable, minimum))
+    
+    def _match(
+        self,
+        snapshot: ScreenerSnapshot,
+        query: SanctionsQuery,
+        query_norm: str,
+        query_tokens: List[str],
+        initial_candidates: int,
+        expand_threshold: float,
+        max_candidates: int,
+        early_exit_threshold: float,
+        trace: Optional[ScreeningTrace] = None,
+        deadline: Optional[float] = None
+    ) -> tuple[List[SanctionsMatch], Dict[str, int], bool]:
+        """
+        Run blocking and two-stage scoring for a normalized query (see ``screen``).
         
-        composite_scores = composite_score_batch(set_scores, sort_scores, partial_scores)
+        Stage timings and counters are recorded on ``trace`` if given. With a
+        ``deadline`` (``time.perf_counter()`` value), candidate budgets are
+        sized to the time left and scoring stops when it passes.
         
-        # Check if we need to expand (two-stage approach)
-        top_score = float(np.max(composite_scores)) if len(composite_scores) > 0 else 0.0
+        Returns:
+            Tuple of (matches, candidate_counts, complete)
+        """
+        candidate_indices, counts, allowed = self._retrieve(
+            snapshot, query, query_norm, query_tokens, max(initial_candidates, max_candidates),
+            trace=trace
+        )
+        if not candidate_indices:
+            return [], counts, True
+        
+        # Latency budget: Stage 1 takes what the time left affords (always
+        # at least one chunk, so every screen returns its best candidates)
+        complete = True
+        unscored = 0
+        if deadline is not None:
+            budget = self._candidate_budget(deadline, initial_candidates, minimum=PRUNING_CHUNK_SIZE)
+            complete = budget >= min(initial_candidates, len(candidate_indices))
+            initial_candidates = budget
+        
+        # Stage 1: Score top priority candidates
+        # candidate_indices is sorted by priority, so the high-priority candidates
+        # (multiple strategy hits) always form its prefix
+        candidates_to_score = candidate_indices[:initial_candidates]
+        
+        # Gather candidate data from the columnar store
+        store = snapshot.store
+        candidate_idx_map = store.valid_indices(candidates_to_score)
+        
+        if len(candidate_idx_map) == 0:
+            return [], counts, complete
+        
+        # Stage 1: Batch score initial candidates (each distinct name once)
+        (set_scores, sort_scores, partial_scores, composite_scores), counts['stage1'], unscored = (
+            self._score_rows(
+                store, query_norm, candidate_idx_map, query.top_k, trace=trace, deadline=deadline
+            )
+        )
         
-        # Early exit: If top score is very low, it's clearly a non-match
-        if top_score < early_exit_threshold:
-            # Use Stage 1 results as-is
-            pass
         # Stage 2: If top score is low but not too low, expand candidate set
-        elif top_score < expand_threshold and len(candidate_indices) > initial_candidates:
-            # Expand to max_candidates
-            additional_candidates = [
-                idx for idx in candidate_indices
-                if idx not in candidate_idx_map
-            ][:(max_candidates - len(candidate_idx_map))]
-            
-            # Score additional candidates
-            additional_norms = []
-            additional_metadata = []
-            additional_idx_map = []
-            
-            for idx in additional_candidates:
-                try:
-                    candidate = self.sanctions_index.iloc[idx]
-                    additional_norms.append(candidate['name_norm'])
-                    additional_metadata.append({
-                        'uid': candidate['uid'],
-                        'name': candidate['name'],
-                        'country': candidate.get('country'),
-                        'program': candidate.get('program'),
-                        'source': candidate.get('source', 'SDN')
-                    })
-                    additional_idx_map.append(idx)
-                except (IndexError, KeyError):
-                    continue
+        expanded = self._needs_expansion(
+            composite_scores, candidate_indices, initial_candidates,
+            expand_threshold, early_exit_threshold
+        )
+        if expanded:
+            # Expand with the nearest names list-wide (or next by priority)
+            additional_idx_map, expansion_complete = self._expansion_rows(
+                snapshot, query_norm, candidate_indices, candidate_idx_map,
+                initial_candidates, max_candidates, allowed, deadline=deadline
+            )
+            complete = complete and expansion_complete
+            if trace is not None:
+                trace.lap('expand')
             
-            if additional_norms:
-                add_set_scores, add_sort_scores, add_partial_scores = compute_similarity_batch(
+            if len(additional_idx_map) > 0:
+                # Stage 1's k-th best entity score seeds the pruning threshold
+                (add_set_scores, add_sort_scores, add_partial_scores,
+                 add_composite_scores), counts['stage2'], stage2_unscored = self._score_rows(
+                    store,
                     query_norm,
-                    additional_norms
-                )
-                add_composite_scores = composite_score_batch(
-                    add_set_scores, add_sort_scores, add_partial_scores
+                    additional_idx_map,
+                    query.top_k,
+                    threshold=kth_best_group_score(
+                        composite_scores, store.entity_group[candidate_idx_map], query.top_k
+                    ),
+                    trace=trace,
+                    stage='stage2',
+                    deadline=deadline
                 )
+                unscored += stage2_unscored
                 
                 # Combine results
-                candidate_norm_list.extend(additional_norms)
-                candidate_metadata.extend(additional_metadata)
-                candidate_idx_map.extend(additional_idx_map)
+                candidate_idx_map = np.concatenate([candidate_idx_map, additional_idx_map])
                 composite_scores = np.concatenate([composite_scores, add_composite_scores])
                 set_scores = np.concatenate([set_scores, add_set_scores])
                 sort_scores = np.concatenate([sort_scores, add_sort_scores])
                 partial_scores = np.concatenate([partial_scores, add_partial_scores])
         
-        # Sort by composite score (descending)
-        sorted_indices = np.argsort(composite_scores)[::-1]
+        if trace is not None:
+            trace.counters.update({
+                'retrieved': counts['retrieved'],
+                'stage1': counts['stage1'],
+                'stage2': counts['stage2'],
+                'scored': counts['stage1'] + counts['stage2'],
+                'collapsed': len(candidate_idx_map) - counts['stage1'] - counts['stage2'] - unscored,
+                'pruned': int(np.isneginf(composite_scores).sum()),
+                'expanded': expanded,
+                'early_exit': bool(composite_scores.max() < early_exit_threshold)
+            })
+            if deadline is not None:
+                trace.counters['unscored'] = unscored
+                trace.counters['truncated'] = not (complete and unscored == 0)
         
-        # Build match results
-        matches = []
-        for i in sorted_indices:
-            if len(matches) >= query.top_k:
+        matches = self._build_matches(
+            store, candidate_idx_map, set_scores, sort_scores, partial_scores,
+            composite_scores, top_k=query.top_k
+        )
+        if trace is not None:
+            trace.lap('ranking')
+        return matches, counts, complete and unscored == 0
+    
+    def _retrieve(
+        self,
+        snapshot: ScreenerSnapshot,
+        query: SanctionsQuery,
+        query_norm: str,
+        query_tokens: List[str],
+        limit: int,
+        trace: Optional[ScreeningTrace] = None
+    ) -> tuple[List[int], Dict[str, int], Optional[np.ndarray]]:
+        """
+        Run blocking for a query.
+        
+        Returns:
+            Tuple of (candidate_indices, candidate_counts, allowed row mask or None)
+        """
+        # Filter push-down: restrict blocking to live rows passing country/program filters
+        allowed = self._allowed_rows(query, snapshot)
+        if trace is not None:
+            trace.lap('filters')
+        
+        # Get candidates with prioritization
+        candidate_indices, _ = self.get_candidates(
+            query_norm,
+            query_tokens,
+            limit=limit,
+            allowed=allowed,
+            snapshot=snapshot,
+            stats=trace.counters if trace is not None else None
+        )
+        if trace is not None:
+            trace.counters['retrieved'] = len(candidate_indices)
+            trace.lap('blocking')
+        counts = {'retrieved': len(candidate_indices), 'stage1': 0, 'stage2': 0}
+        return candidate_indices, counts, allowed
+    
+    def _needs_expansion(
+        self,
+        composite_scores: np.ndarray,
+        candidate_indices: List[int],
+        initial_candidates: int,
+        expand_threshold: float,
+        early_exit_threshold: float
+    ) -> bool:
+        """
+        Decide whether Stage 1 results warrant a Stage 2 expansion.
+        
+        Clear non-matches (top score below early_exit_threshold) exit early;
+        scores between the two thresholds expand. 'priority' expansion needs
+        blocking candidates beyond Stage 1; 'ann' searches the whole list.
+        """
+        top_score = float(np.max(composite_scores)) if len(composite_scores) > 0 else 0.0
+        return (
+            early_exit_threshold <= top_score < expand_threshold
+            and (self.stage2_strategy == 'ann' or len(candidate_indices) > initial_candidates)
+        )
+    
+    def _expansion_rows(
+        self,
+        snapshot: ScreenerSnapshot,
+        query_norm: str,
+        candidate_indices: List[int],
+        scored: np.ndarray,
+        initial_candidates: int,
+        max_candidates: int,
+        allowed: Optional[np.ndarray],
+        deadline: Optional[float] = None
+    ) -> tuple[np.ndarray, bool]:
+        """
+        Select the Stage 2 candidates for a query.
+        
+        'ann' takes the nearest names by hashed n-gram similarity over the
+        whole list (within the filters, excluding rows Stage 1 scored), at
+        most ``ann_candidates`` and no more than ``max_candidates`` allows in
+        total. 'priority' takes the next blocking candidates up to
+        ``max_candidates``. With a ``deadline``, either is capped to what the
+        time left affords.
+        
+        Args:
+            snapshot: Snapshot being screened
+            query_norm: Normalized query string
+            candidate_indices: Blocking candidates in priority order
+            scored: Rows scored in Stage 1
+            initial_candidates: Number of candidates Stage 1 took
+            max_candidates: Maximum candidates to score in both stages
+            allowed: Row mask from filter push-down (None = all rows)
+            deadline: Optional ``time.perf_counter()`` value bounding Stage 2
+            
+        Returns:
+            Tuple of (row ids to score in Stage 2, False if the budget cut them short)
+        """
+        store = snapshot.store
+        if self.stage2_strategy != 'ann':
+            additional = candidate_indices[initial_candidates:max_candidates]
+            limit = len(additional)
+        else:
+            limit = max(min(self.ann_candidates, max_candidates - len(scored)), 0)
+        wanted = limit
+        if deadline is not None:
+            limit = self._candidate_budget(deadline, limit)
+        complete = limit == wanted
+        
+        if self.stage2_strategy != 'ann':
+            return store.valid_indices(additional[:limit]), complete
+        if limit <= 0:
+            return store.valid_indices([]), complete
+        unscored = np.ones(len(store), dtype=bool) if allowed is None else allowed.copy()
+        unscored[scored] = False
+        rows, _ = self._ann_index_for(snapshot).search(
+            query_norm, limit, allowed=unscored, probes=self.ann_probes
+        )
+        return rows.astype(np.intp), complete
+    
+    @staticmethod
+    def _build_matches(
+        store: CandidateStore,
+        candidate_idx_map: np.ndarray,
+        set_scores: np.ndarray,
+        sort_scores: np.ndarray,
+        partial_scores: np.ndarray,
+        composite_scores: np.ndarray,
+        top_k: int
+    ) -> List[SanctionsMatch]:
+        """
+        Select the top-k entities and build match results.
+        
+        Aliases are collapsed: each entity is represented by its best-scoring
+        record (the earliest candidate on ties), so every returned match is a
+        different entity. Candidates without a score (-inf: pruned, or left
+        unscored when a deadline cut scoring short) are never returned, so a
+        truncated screen yields fewer matches rather than placeholder ones.
+        """
+        unscored = np.isneginf(composite_scores)
+        if unscored.any():
+            keep = ~unscored
+            candidate_idx_map, set_scores, sort_scores, partial_scores, composite_scores = (
+                scores[keep] for scores in
+                (candidate_idx_map, set_scores, sort_scores, partial_scores, composite_scores)
+            )
+
+        # Rank a few times top_k records (score desc, then position); an
+        # entity's first record in that order is its best one. Widen the
+        # window until it holds top_k entities or every record.
+        window = top_k
+        while True:
+            window = min(window * 4, len(composite_scores))
+            ranked = rank_top_k(composite_scores, window)
+            _, first = np.unique(store.entity_group[candidate_idx_map[ranked]], return_index=True)
+            if len(first) >= top_k or window == len(composite_scores):
+                ranked = ranked[np.sort(first)[:top_k]]
                 break
-                
+        
+        # Build match results (metadata is only materialized for returned matches)
+        matches = []
+        for i in ranked:
             score = float(composite_scores[i])
-            metadata = candidate_metadata[i]
-            
-            # Apply filters if specified
-            if query.country and metadata['country'] != query.country:
-                continue
-            
-            # Program filter: Check if program string contains the filter value
-            # (programs can be multi-program strings like "IRAN] [SDGT] [IFSR]")
-            if query.program:
-                program_str = str(metadata['program']) if metadata['program'] else ''
-                # Check if filter program appears in the program string
-                # Handle both exact match and substring match (for multi-program strings)
-                if query.program.upper() not in program_str.upper():
-                    continue
-            
             is_match, decision = apply_decision_threshold(score)
+            metadata = store.metadata(candidate_idx_map[i])
             
             matches.append(SanctionsMatch(
                 match_name=metadata['name'],
@@ -539,12 +2201,4 @@ class SanctionsScreener:
                 sim_partial=float(partial_scores[i])
             ))
         
-        latency_ms = (time.time() - start_time) * 1000
-        
-        return SanctionsResponse(
-            query=query.name,
-            top_matches=matches,
-            applied_filters={'country': query.country, 'program': query.program},
-            latency_ms=latency_ms,
-            version=self.version
-        )
\ No newline at end of file
+        return matches
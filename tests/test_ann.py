@@ -0,0 +1,118 @@
+"""
+Tests for the hashed n-gram ANN index used for Stage 2 expansion.
+
+Recall is measured against a full scan (every inverted list probed), which
+scores the query against every row exactly.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from packages.compliance.benchmark import entity_key, load_eval_queries
+from packages.compliance.blocking import HashedNgramIndex, rank_top_k
+from packages.compliance.build_index import build_screener
+from packages.compliance.sanctions import normalize_text
+
+DATA_DIR = Path(__file__).resolve().parents[1] / 'data_catalog' / 'processed'
+NAMES_PATH = DATA_DIR / 'sanctions_names.parquet'
+LABELS_PATH = DATA_DIR / 'sanctions_eval_labels.csv'
+
+
+@pytest.fixture(scope='module')
+def screener():
+    if not (NAMES_PATH.exists() and LABELS_PATH.exists()):
+        pytest.skip("sanctions list or eval labels not available")
+    screener, _ = build_screener(str(NAMES_PATH), version='test', stage2_strategy='ann', cache_size=0)
+    return screener
+
+
+@pytest.fixture(scope='module')
+def eval_queries():
+    return [
+        (normalize_text(query.query), query.entity)
+        for query in load_eval_queries(str(LABELS_PATH))
+        if query.entity is not None
+    ]
+
+
+def full_scan(index):
+    return len(index.centroids)
+
+
+def test_default_probes_recall_labelled_entities_like_a_full_scan(screener, eval_queries):
+    index = screener.ann_index
+    entities = np.array([entity_key(uid) for uid in screener.store.uid])
+
+    def recall(probes, k=10):
+        found = [
+            entity in set(entities[index.search(query_norm, k, probes=probes)[0]])
+            for query_norm, entity in eval_queries
+        ]
+        return np.mean(found)
+
+    exhaustive = recall(full_scan(index))
+    assert exhaustive >= 0.95
+    assert recall(index.probes) >= exhaustive - 0.01
+
+
+def test_full_scan_matches_brute_force(screener, eval_queries):
+    index = screener.ann_index
+    for query_norm, _ in eval_queries[::10]:
+        rows, scores = index.search(query_norm, 20, probes=full_scan(index))
+        similarity = index.vectors @ index.embed(query_norm)
+        expected = rank_top_k(similarity, 20)
+
+        assert rows.tolist() == expected.tolist(), query_norm
+        np.testing.assert_allclose(scores, similarity[expected], rtol=1e-6)
+
+
+def test_more_probes_never_lose_neighbours(screener, eval_queries):
+    index = screener.ann_index
+    k = 50
+    overlaps = []
+    for probes in (1, 2, index.probes, full_scan(index)):
+        overlap = []
+        for query_norm, _ in eval_queries[::5]:
+            exact = set(index.search(query_norm, k, probes=full_scan(index))[0].tolist())
+            approx = set(index.search(query_norm, k, probes=probes)[0].tolist())
+            overlap.append(len(exact & approx) / len(exact))
+        overlaps.append(np.mean(overlap))
+
+    assert overlaps == sorted(overlaps)
+    assert overlaps[-1] == 1.0
+    assert overlaps[0] < overlaps[-1]
+
+
+@pytest.fixture(scope='module')
+def small_index():
+    names = ["usama bin ladin", "banco nacional de cuba", "al qaida", "rosneft oil company",
+             "kim jong un", "hassan trading company"]
+    return HashedNgramIndex.build(names, n_lists=2, probes=1)
+
+
+@pytest.mark.parametrize('query_norm', ['', '   '])
+def test_empty_query_returns_nothing(small_index, query_norm):
+    rows, scores = small_index.search(query_norm, 5)
+    assert len(rows) == len(scores) == 0
+    assert small_index.get_candidates(query_norm, 5) == ([], {})
+
+
+@pytest.mark.parametrize('query_norm', ['a', 'al', 'un'])
+def test_short_queries_return_ranked_candidates(small_index, query_norm):
+    rows, scores = small_index.search(query_norm, 3)
+
+    assert 0 < len(rows) <= 3
+    assert np.isfinite(scores).all()
+    assert scores.tolist() == sorted(scores.tolist(), reverse=True)
+
+
+def test_limit_and_allowed_mask(small_index):
+    assert len(small_index.search("al qaida", 0)[0]) == 0
+
+    allowed = np.ones(len(small_index), dtype=bool)
+    allowed[2] = False
+    rows, _ = small_index.search("al qaida", 6, allowed=allowed, probes=2)
+    assert 2 not in rows.tolist()
+    assert len(small_index.search("al qaida", 6, allowed=np.zeros(len(small_index), dtype=bool))[0]) == 0
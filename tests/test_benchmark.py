@@ -0,0 +1,94 @@
+"""
+Tests for the sanctions screening benchmark.
+"""
+
+import random
+
+import pandas as pd
+
+from packages.compliance.benchmark import (
+    GATES,
+    BenchmarkQuery,
+    check_regressions,
+    drop_middle_name,
+    entity_key,
+    reorder_tokens,
+    run_benchmark,
+    synthetic_queries,
+    typo,
+)
+from packages.compliance.build_index import build_screener
+
+BASELINE = {
+    'recall_at_k': 0.99,
+    'precision_at_1': 0.97,
+    'fpr_at_threshold_90': 0.0,
+    'candidates_scored_mean': 1000.0,
+    'stage2_rate': 0.02,
+    'latency_p50_ms': 5.0,
+    'latency_p95_ms': 10.0,
+    'latency_p99_ms': 15.0,
+}
+
+
+def test_entity_key_groups_aliases():
+    assert entity_key('SDN_306_alt_3') == entity_key('SDN_306') == 'SDN_306'
+    assert entity_key('Consolidated_9669') == 'Consolidated_9669'
+
+
+def test_perturbations():
+    rng = random.Random(0)
+    assert reorder_tokens("SALHAB, Azzam", rng) == "Azzam SALHAB"
+    assert reorder_tokens("PRINTPRODAKT", rng) is None
+    assert drop_middle_name("Ahmad Oumar Imhamad", rng) == "Ahmad Imhamad"
+    assert drop_middle_name("Kim Jong", rng) is None
+
+    misspelled = typo("Aerocaribbean Airlines", rng)
+    assert misspelled != "Aerocaribbean Airlines"
+    assert misspelled.split()[0][0] == 'A' and len(misspelled.split()) == 2
+    assert typo("BNC", rng) is None
+
+
+def test_check_regressions_passes_within_tolerance():
+    metrics = dict(BASELINE, recall_at_k=0.987, latency_p95_ms=12.0, candidates_scored_mean=1080.0)
+    assert check_regressions(metrics, BASELINE) == []
+
+
+def test_check_regressions_flags_each_gate():
+    for metric, (direction, kind, tolerance) in GATES.items():
+        slack = tolerance * BASELINE[metric] if kind == 'rel' else tolerance
+        worse = BASELINE[metric] - slack - 0.01 if direction == 'min' else BASELINE[metric] + slack + 0.01
+        failures = check_regressions(dict(BASELINE, **{metric: worse}), BASELINE)
+        assert any(f.startswith(metric) for f in failures), metric
+
+
+def test_check_regressions_targets_and_latency_opt_out():
+    slow = dict(BASELINE, latency_p95_ms=80.0)
+    assert any('target' in f for f in check_regressions(slow, None))
+    assert check_regressions(slow, BASELINE, latency_gates=False) == []
+    assert any('recall_at_k' in f for f in check_regressions(dict(BASELINE, recall_at_k=0.9), None))
+
+
+def test_run_benchmark_reports_metrics(tmp_path):
+    path = tmp_path / 'names.parquet'
+    pd.DataFrame({
+        'name': ["BANCO NACIONAL DE CUBA", "BNC", "AEROCARIBBEAN AIRLINES", "SALHAB, Azzam Mahmoud"],
+        'source': ['SDN', 'SDN_ALT', 'SDN', 'CONS'],
+        'entity_id': ['306', '306', '36', '9669'],
+    }).to_parquet(path, index=False)
+    screener, _ = build_screener(str(path), version='v1')
+
+    queries = [
+        BenchmarkQuery("Banco Nacional Cuba", 'SDN_306', 'typo'),
+        BenchmarkQuery("Sarah Smith", None, 'non_match'),
+    ] + synthetic_queries(screener, n_names=3, seed=1)
+    metrics = run_benchmark(screener, queries, k=3, warmup=1, repeat=2)
+
+    assert metrics['num_queries'] == len(queries)
+    assert metrics['num_non_matches'] == 1
+    assert metrics['recall_at_k'] == 1.0
+    assert metrics['fpr_at_threshold_90'] == 0.0
+    assert metrics['candidates_scored_mean'] > 0
+    assert 0.0 <= metrics['stage2_rate'] <= 1.0
+    assert metrics['latency_p50_ms'] <= metrics['latency_p95_ms'] <= metrics['latency_p99_ms']
+    assert set(metrics['recall_by_variation']) >= {'typo', 'synthetic_reorder'}
@@ -0,0 +1,103 @@
+"""
+Tests for the sanctions index builder CLI.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from packages.compliance.artifact import read_manifest
+from packages.compliance.build_index import build_screener, main
+from packages.compliance.sanctions_api import SanctionsQuery, SanctionsScreener
+
+NAMES = pd.DataFrame({
+    'name': [
+        "BANCO NACIONAL DE CUBA", "BNC", "AEROCARIBBEAN AIRLINES", "AERO-CARIBBEAN",
+        "SALHAB, Azzam", "José María O'Brien", "中国工商银行", "KIM, Jong Un",
+    ],
+    'source': ['SDN', 'SDN_ALT', 'SDN', 'SDN_ALT', 'CONS', 'SDN', 'SDN', 'SDN'],
+    'entity_id': ['306', '306', '36', '36', '9669', '501', '502', '503'],
+    'entity_type': None,
+    'country': ['Cuba', 'Cuba', 'Cuba', 'Cuba', None, 'Spain', 'China', None],
+})
+
+
+@pytest.fixture
+def names_path(tmp_path):
+    path = tmp_path / 'sanctions_names.parquet'
+    NAMES.to_parquet(path, index=False)
+    return str(path)
+
+
+def test_build_screener_maps_names_export(names_path):
+    screener, stats = build_screener(names_path, version='v1', chunk_size=3)
+
+    assert stats['rows'] == len(NAMES)
+    assert stats['chunks'] == 3
+    assert stats['empty_names'] == 1
+    assert stats['sources'] == {'SDN': 7, 'Consolidated': 1}
+    assert list(screener.store.uid) == [
+        'SDN_306', 'SDN_306_alt_1', 'SDN_36', 'SDN_36_alt_1',
+        'Consolidated_9669', 'SDN_501', 'SDN_502', 'SDN_503',
+    ]
+    match = screener.screen(SanctionsQuery(name="Banco Nacional de Cuba", top_k=1)).top_matches[0]
+    assert match.uid == 'SDN_306'
+    assert match.is_match
+
+
+def test_parallel_build_matches_serial(names_path):
+    serial, _ = build_screener(names_path, version='v1', workers=1, chunk_size=3)
+    parallel, _ = build_screener(names_path, version='v1', workers=2, chunk_size=3)
+
+    assert list(parallel.store.name_norm) == list(serial.store.name_norm)
+    for name in ('first_token', 'bucket', 'initials', 'phonetic'):
+        assert parallel.snapshot.postings[name].keys == serial.snapshot.postings[name].keys
+
+
+def test_cli_writes_validated_artifact(names_path, tmp_path, capsys):
+    output = tmp_path / 'screener'
+
+    assert main(['--input', names_path, '--output', str(output), '--version', 'v7',
+                 '--workers', '1', '--json']) == 0
+
+    summary = json.loads(capsys.readouterr().out)
+    manifest = read_manifest(output)
+    assert summary['rows'] == manifest['rows'] == len(NAMES)
+    assert manifest['version'] == 'v7'
+    assert manifest['metadata']['build']['rows'] == len(NAMES)
+    assert len(manifest['metadata']['source']['sha256']) == 64
+    assert set(summary['timings_s']) >= {'read', 'normalize', 'blocking', 'screener', 'write', 'validate'}
+
+    screener = SanctionsScreener.open_artifact(str(output), verify=True)
+    assert screener.version == 'v7'
+    assert screener.screen(SanctionsQuery(name="Azzam Salhab", top_k=1)).top_matches[0].uid == 'Consolidated_9669'
+
+
+def test_rewriting_artifact_keeps_open_screeners_valid(names_path, tmp_path):
+    output = tmp_path / 'screener'
+    first, _ = build_screener(names_path, version='v1', chunk_size=3)
+    first.save_artifact(str(output))
+    opened = SanctionsScreener.open_artifact(str(output))
+    names = list(opened.store.name_norm)
+
+    smaller = NAMES[NAMES['entity_id'] != '306'].reset_index(drop=True)
+    smaller_path = tmp_path / 'smaller.parquet'
+    smaller.to_parquet(smaller_path, index=False)
+    for version in ('v2', 'v3'):
+        rebuilt, _ = build_screener(str(smaller_path), version=version, chunk_size=3)
+        rebuilt.save_artifact(str(output))
+
+    # The open screener still reads its own (now unlinked) generation
+    assert list(opened.store.name_norm) == names
+    assert opened.screen(SanctionsQuery(name="Banco Nacional de Cuba", top_k=1)).top_matches[0].uid == 'SDN_306'
+
+    reopened = SanctionsScreener.open_artifact(str(output), verify=True)
+    assert reopened.version == 'v3'
+    assert len(reopened.store) == len(smaller)
+    manifest = read_manifest(output)
+    current = {entry['file'] for entry in manifest['arrays'].values()}
+    on_disk = {p.name for p in output.glob('*.npy')}
+    # Current generation plus the one before it; the first is cleaned up
+    assert current < on_disk
+    assert len(on_disk) == 2 * len(current)
@@ -0,0 +1,121 @@
+"""
+Tests for the screening result cache.
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from packages.compliance import cache as cache_module
+from packages.compliance.cache import ScreeningCache
+from packages.compliance.sanctions import normalize_text
+from packages.compliance.sanctions_api import SanctionsDelta, SanctionsQuery, SanctionsScreener
+
+NAMES = ["Banco Nacional de Cuba", "Banco Nacional de Venezuela", "Banco Central de Cuba",
+         "Usama bin Ladin", "Rosneft Oil Company"]
+COUNTRIES = ["Cuba", "Venezuela", "Cuba", None, "Russia"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def screener():
+    frame = pd.DataFrame({
+        'uid': [f"SDN_{i}" for i in range(len(NAMES))],
+        'ent_num': [str(i) for i in range(len(NAMES))],
+        'name': NAMES,
+        'name_norm': [normalize_text(name) for name in NAMES],
+        'country': COUNTRIES,
+        'program': 'SDGT',
+        'source': 'SDN',
+    })
+    return SanctionsScreener(frame, {}, {}, {}, blocking_strategy='idf', cache_size=100)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ScreeningCache(max_size=2, ttl_seconds=None)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ScreeningCache(max_size=10, ttl_seconds=5.0)
+    cache.put('a', 1)
+    clock[0] += 4.9
+    assert cache.get('a') == 1
+
+    clock[0] += 0.2
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['expirations'], stats['hits'], stats['misses'], stats['size']) == (1, 1, 1, 0)
+
+
+def test_zero_size_disables_cache():
+    cache = ScreeningCache(max_size=0)
+    cache.put('a', 1)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_screen_reuses_cached_result(screener):
+    query = SanctionsQuery(name="Banco Nacional de Cuba", top_k=2)
+    first = screener.screen(query, debug=True)
+    # Same normalized name, written differently
+    second = screener.screen(SanctionsQuery(name="BANCO NACIONAL DE CUBA", top_k=2), debug=True)
+
+    assert first.debug['counters']['cache_hit'] is False
+    assert second.debug['counters']['cache_hit'] is True
+    assert second.top_matches == first.top_matches
+    assert screener.cache_stats()['hits'] == 1
+
+
+def test_cache_key_covers_top_k_and_filters(screener):
+    screener.screen(SanctionsQuery(name="Banco Nacional de Cuba", top_k=1))
+
+    wider = screener.screen(SanctionsQuery(name="Banco Nacional de Cuba", top_k=3), debug=True)
+    filtered = screener.screen(
+        SanctionsQuery(name="Banco Nacional de Cuba", country="Venezuela", top_k=3), debug=True
+    )
+    by_program = screener.screen(
+        SanctionsQuery(name="Banco Nacional de Cuba", program="CUBA", top_k=3), debug=True
+    )
+
+    assert not wider.debug['counters']['cache_hit']
+    assert len(wider.top_matches) == 3
+    assert not filtered.debug['counters']['cache_hit']
+    assert [m.uid for m in filtered.top_matches] == ['SDN_1']
+    assert not by_program.debug['counters']['cache_hit']
+    assert by_program.top_matches == []
+
+
+def test_invalidate_cache_forces_rescreen(screener):
+    query = SanctionsQuery(name="Rosneft Oil Company")
+    screener.screen(query)
+    screener.invalidate_cache()
+
+    assert not screener.screen(query, debug=True).debug['counters']['cache_hit']
+    assert screener.cache_stats()['size'] == 1
+
+
+def test_apply_delta_never_serves_stale_results(screener):
+    query = SanctionsQuery(name="Zorro Testperson")
+    assert 'SDN_99' not in [m.uid for m in screener.screen(query).top_matches]
+
+    screener.apply_delta(SanctionsDelta(version='2', upserts=[{'uid': 'SDN_99', 'name': 'Zorro Testperson'}]))
+    response = screener.screen(query, debug=True)
+
+    assert not response.debug['counters']['cache_hit']
+    assert response.top_matches[0].uid == 'SDN_99'
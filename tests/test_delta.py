@@ -0,0 +1,151 @@
+"""
+Tests for incremental sanctions list updates (SanctionsDelta).
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from packages.compliance.blocking import NgramIndex, TokenIndex
+from packages.compliance.sanctions import normalize_text, tokenize
+from packages.compliance.sanctions_api import (
+    BLOCKING_STRATEGIES,
+    SanctionsDelta,
+    SanctionsQuery,
+    SanctionsScreener,
+    get_first_token,
+    get_initials_signature,
+    get_token_count_bucket,
+)
+
+RECORDS = [
+    # uid, ent_num, name
+    ("SDN_0", "100", "Banco Nacional de Cuba"),
+    ("SDN_1", "100", "National Bank of Cuba"),
+    ("SDN_2", "200", "Rosneft Oil Company"),
+    ("SDN_3", "300", "Usama bin Ladin"),
+    ("SDN_4", "400", "Hassan Trading Company"),
+]
+
+
+@pytest.fixture(params=BLOCKING_STRATEGIES)
+def screener(request):
+    names = [name for _, _, name in RECORDS]
+    frame = pd.DataFrame({
+        'uid': [uid for uid, _, _ in RECORDS],
+        'ent_num': [ent_num for _, ent_num, _ in RECORDS],
+        'name': names,
+        'name_norm': [normalize_text(name) for name in names],
+        'country': None,
+        'program': 'SDGT',
+        'source': 'SDN',
+    })
+    first_token, bucket, initials = defaultdict(list), defaultdict(list), defaultdict(list)
+    for row, name_norm in enumerate(frame['name_norm']):
+        tokens = tokenize(name_norm)
+        first_token[get_first_token(tokens)].append(row)
+        bucket[get_token_count_bucket(tokens)].append(row)
+        initials[get_initials_signature(tokens)].append(row)
+    return SanctionsScreener(
+        frame, dict(first_token), dict(bucket), dict(initials),
+        blocking_strategy=request.param, cache_size=0
+    )
+
+
+def top_uids(screener, name):
+    return [m.uid for m in screener.screen(SanctionsQuery(name=name, top_k=5)).top_matches]
+
+
+def test_upsert_of_listed_uid_replaces_it(screener):
+    summary = screener.apply_delta(SanctionsDelta(
+        version='2', upserts=[{'uid': 'SDN_2', 'name': 'Rosneft Trading Limited'}]
+    ))
+
+    assert summary == {'version': '2', 'added': 0, 'replaced': 1, 'removed': 0, 'active_rows': 5}
+    assert screener.version == '2'
+    matches = screener.screen(SanctionsQuery(name="Rosneft Trading Limited", top_k=5)).top_matches
+    assert matches[0].uid == 'SDN_2'
+    assert matches[0].match_name == 'Rosneft Trading Limited'
+    # The old name is gone, not listed twice under the same uid
+    assert [m.uid for m in matches].count('SDN_2') == 1
+    old_name = screener.screen(SanctionsQuery(name="Rosneft Oil Company", top_k=5)).top_matches
+    assert 'Rosneft Oil Company' not in [m.match_name for m in old_name]
+
+
+def test_upsert_of_new_uid_is_added(screener):
+    summary = screener.apply_delta(SanctionsDelta(
+        version='2', upserts=[{'uid': 'SDN_9', 'ent_num': '900', 'name': 'Zorro Testperson'}]
+    ))
+
+    assert (summary['added'], summary['replaced'], summary['active_rows']) == (1, 0, 6)
+    assert top_uids(screener, "Zorro Testperson")[0] == 'SDN_9'
+    assert top_uids(screener, "Rosneft Oil Company")[0] == 'SDN_2'
+
+
+def test_removal_by_uid(screener):
+    summary = screener.apply_delta(SanctionsDelta(version='2', removed_uids=['SDN_3', 'SDN_404']))
+
+    assert (summary['removed'], summary['active_rows']) == (1, 4)
+    assert 'SDN_3' not in top_uids(screener, "Usama bin Ladin")
+
+
+def test_removal_by_entity_drops_all_its_aliases(screener):
+    summary = screener.apply_delta(SanctionsDelta(version='2', removed_entities=['100']))
+
+    assert (summary['removed'], summary['active_rows']) == (2, 3)
+    for name in ("Banco Nacional de Cuba", "National Bank of Cuba"):
+        assert not {'SDN_0', 'SDN_1'} & set(top_uids(screener, name))
+
+
+def test_delta_needs_uid_and_name(screener):
+    with pytest.raises(ValueError):
+        screener.apply_delta(SanctionsDelta(version='2', upserts=[{'uid': 'SDN_9'}]))
+    assert screener.version != '2'
+
+
+def test_reader_of_old_snapshot_still_sees_old_list(screener):
+    old = screener.snapshot
+    query_norm = normalize_text("Usama bin Ladin")
+
+    screener.apply_delta(SanctionsDelta(
+        version='2',
+        upserts=[{'uid': 'SDN_9', 'name': 'Zorro Testperson'}],
+        removed_uids=['SDN_3']
+    ))
+
+    assert screener.snapshot is not old
+    assert (old.version, len(old.store), old.active_rows) == ('1.0.0', 5, 5)
+    assert old.active is None
+    assert 'SDN_9' not in list(old.store.uid)
+    # The removed record is still a candidate when screening against the old snapshot
+    old_rows, _ = screener.get_candidates(query_norm, tokenize(query_norm), snapshot=old)
+    assert 3 in old_rows
+    assert not screener.snapshot.active[3]
+    assert 'SDN_3' not in top_uids(screener, "Usama bin Ladin")
+
+
+def dense_scores(index, query_norm):
+    if isinstance(index, TokenIndex):
+        rows, scores = index.score(tokenize(query_norm))
+        dense = np.zeros(len(index))
+        dense[rows] = scores
+        return dense
+    return np.asarray(index.score(query_norm))
+
+
+@pytest.mark.parametrize('index_type', [TokenIndex, NgramIndex])
+def test_text_indexes_cover_live_rows_only(index_type):
+    names = np.array([normalize_text(name) for _, _, name in RECORDS], dtype=object)
+    active = np.array([True, True, True, True, False])
+    # Shares "company" with the masked row
+    query_norm = normalize_text("Rosneft Oil Company")
+
+    masked = dense_scores(index_type.build(names, active=active), query_norm)
+    live_only = dense_scores(index_type.build(names[active]), query_norm)
+
+    assert len(masked) == len(names)
+    assert not masked[~active].any()
+    # Same scores (IDF over live rows) as an index built from the live names alone
+    np.testing.assert_allclose(masked[active], live_only)
@@ -0,0 +1,167 @@
+"""
+Tests for the process-pool screening executor.
+"""
+
+import os
+import time
+from collections import defaultdict
+
+import pandas as pd
+import pytest
+
+from packages.compliance import executor as executor_module
+from packages.compliance.executor import (
+    KEEP_GENERATIONS,
+    ScreeningExecutor,
+    ScreeningQueueFullError,
+)
+from packages.compliance.sanctions import normalize_text, tokenize
+from packages.compliance.sanctions_api import (
+    SanctionsDelta,
+    SanctionsQuery,
+    SanctionsScreener,
+    get_first_token,
+    get_initials_signature,
+    get_token_count_bucket,
+)
+
+NAMES = [
+    "Banco Nacional de Cuba",
+    "Usama bin Ladin",
+    "Mohammed Al Qaeda",
+    "Aerocaribbean Airlines",
+    "Jhon Paul Castro Paez",
+    "Islamic Revolutionary Guard Corps",
+    "Rosneft Oil Company",
+    "Kim Jong Un",
+]
+
+
+def build_screener():
+    frame = pd.DataFrame({
+        'uid': [f"SDN_{i}" for i in range(len(NAMES))],
+        'ent_num': [str(i) for i in range(len(NAMES))],
+        'name': NAMES,
+        'name_norm': [normalize_text(name) for name in NAMES],
+        'country': None,
+        'program': 'SDGT',
+        'source': 'SDN',
+    })
+    first_token, bucket, initials = defaultdict(list), defaultdict(list), defaultdict(list)
+    for row, name_norm in enumerate(frame['name_norm']):
+        tokens = tokenize(name_norm)
+        first_token[get_first_token(tokens)].append(row)
+        bucket[get_token_count_bucket(tokens)].append(row)
+        initials[get_initials_signature(tokens)].append(row)
+    return SanctionsScreener(frame, dict(first_token), dict(bucket), dict(initials))
+
+
+@pytest.fixture(scope="module")
+def screener():
+    return build_screener()
+
+
+def matches(responses):
+    return [[(m.uid, m.score) for m in r.top_matches] for r in responses]
+
+
+def test_executor_matches_in_process_screening(screener):
+    queries = [SanctionsQuery(name=name, top_k=3) for name in ["Usama Bin Laden", "Banco Nacional Cuba", "Sarah Smith"]]
+    expected = matches(screener.screen(q) for q in queries)
+
+    with ScreeningExecutor(workers=1, max_queue_depth=2) as executor:
+        executor.publish(screener)
+
+        assert matches([executor.screen(q) for q in queries]) == expected
+        assert matches(executor.screen_many(queries)) == expected
+
+        stats = executor.stats()
+        assert stats['completed'] == len(queries) + 1
+        assert stats['in_flight'] == 0
+        assert stats['queue_wait_ms']['max'] >= 0
+
+
+def test_executor_sees_published_deltas(screener):
+    updated = build_screener()
+    updated.apply_delta(SanctionsDelta(version='2', upserts=[{'uid': 'SDN_99', 'name': 'Zorro Testperson'}]))
+
+    with ScreeningExecutor(workers=1) as executor:
+        executor.publish(screener)
+        response = executor.screen(SanctionsQuery(name='Zorro Testperson'))
+        assert 'SDN_99' not in [m.uid for m in response.top_matches]
+
+        executor.publish(updated)
+        response = executor.screen(SanctionsQuery(name='Zorro Testperson'))
+        assert response.top_matches[0].uid == 'SDN_99'
+
+
+def test_executor_rejects_when_queue_is_full(screener):
+    with ScreeningExecutor(workers=1, max_queue_depth=0) as executor:
+        executor.publish(screener)
+        first = executor.submit([SanctionsQuery(name=NAMES[0])])
+        with pytest.raises(ScreeningQueueFullError):
+            executor.submit([SanctionsQuery(name=NAMES[1])])
+        first.result()
+
+        assert executor.stats()['rejected'] == 1
+        assert executor.submit([SanctionsQuery(name=NAMES[1])]).result()
+
+
+def test_executor_requires_an_artifact():
+    with ScreeningExecutor(workers=1) as executor:
+        with pytest.raises(RuntimeError):
+            executor.submit([SanctionsQuery(name=NAMES[0])])
+
+
+def test_publish_rolls_generations_and_prunes_old_artifacts(screener):
+    with ScreeningExecutor(workers=1) as executor:
+        paths = []
+        for generation in range(1, KEEP_GENERATIONS + 3):
+            paths.append(executor.publish(screener))
+            assert executor.artifact_path == paths[-1]
+            assert executor.stats()['artifact_generation'] == generation
+
+        assert len(set(paths)) == len(paths)
+        assert [os.path.exists(path) for path in paths] == (
+            [False] * (len(paths) - KEEP_GENERATIONS) + [True] * KEEP_GENERATIONS
+        )
+        assert executor.screen(SanctionsQuery(name=NAMES[1])).top_matches[0].uid == 'SDN_1'
+    # Shutdown removes the published artifacts
+    assert not any(os.path.exists(path) for path in paths)
+
+
+class RecordingScreener:
+    def __init__(self):
+        self.calls = []
+
+    def screen(self, query, **kwargs):
+        self.calls.append(('screen', kwargs))
+        return query.name
+
+    def screen_many(self, queries, **kwargs):
+        self.calls.append(('screen_many', kwargs))
+        return [query.name for query in queries]
+
+
+def test_worker_deducts_queue_wait_from_deadline(monkeypatch):
+    fake = RecordingScreener()
+    artifact = ('artifact', 1)
+    monkeypatch.setattr(executor_module, '_worker_state', (artifact, fake))
+    submitted_at = time.time() - 0.050
+
+    responses, queue_wait, _ = executor_module._screen_in_worker(
+        artifact, {}, [SanctionsQuery(name=NAMES[0])], {'deadline_ms': 100.0}, submitted_at
+    )
+
+    assert responses == [NAMES[0]]
+    assert queue_wait >= 0.050
+    (kind, kwargs), = fake.calls
+    assert kind == 'screen'
+    assert kwargs['deadline_ms'] == pytest.approx(100.0 - queue_wait * 1000)
+    assert kwargs['deadline_ms'] <= 50.0
+
+    # Batches run without a budget
+    executor_module._screen_in_worker(
+        artifact, {}, [SanctionsQuery(name=n) for n in NAMES[:2]], {'deadline_ms': 100.0}, submitted_at
+    )
+    assert fake.calls[-1] == ('screen_many', {'workers': 1})
@@ -0,0 +1,97 @@
+"""
+Tests for country/program filter push-down into candidate retrieval.
+"""
+
+from collections import defaultdict
+
+import pandas as pd
+import pytest
+
+from packages.compliance.sanctions import normalize_text, tokenize
+from packages.compliance.sanctions_api import (
+    BLOCKING_STRATEGIES,
+    SanctionsQuery,
+    SanctionsScreener,
+    get_first_token,
+    get_initials_signature,
+    get_token_count_bucket,
+    parse_programs,
+)
+
+RECORDS = [
+    ("Banco Nacional de Cuba", "Cuba", "CUBA"),
+    ("Banco Central de Cuba", "Cuba", "CUBA] [SDGT"),
+    ("Banco Nacional de Venezuela", "Venezuela", "VENEZUELA"),
+    ("Banco Sepah", "Iran", "IRAN] [SDGT] [IFSR"),
+    ("Banco Melli", "Iran", "IRAN"),
+    ("Banco Internacional", None, None),
+]
+
+
+@pytest.fixture(scope='module', params=BLOCKING_STRATEGIES)
+def screener(request):
+    names = [name for name, _, _ in RECORDS]
+    frame = pd.DataFrame({
+        'uid': [f"SDN_{i}" for i in range(len(RECORDS))],
+        'ent_num': [str(i) for i in range(len(RECORDS))],
+        'name': names,
+        'name_norm': [normalize_text(name) for name in names],
+        'country': [country for _, country, _ in RECORDS],
+        'program': [program for _, _, program in RECORDS],
+        'source': 'SDN',
+    })
+    first_token, bucket, initials = defaultdict(list), defaultdict(list), defaultdict(list)
+    for row, name_norm in enumerate(frame['name_norm']):
+        tokens = tokenize(name_norm)
+        first_token[get_first_token(tokens)].append(row)
+        bucket[get_token_count_bucket(tokens)].append(row)
+        initials[get_initials_signature(tokens)].append(row)
+    return SanctionsScreener(
+        frame, dict(first_token), dict(bucket), dict(initials),
+        blocking_strategy=request.param, cache_size=0
+    )
+
+
+@pytest.mark.parametrize('program, expected', [
+    ("IRAN] [SDGT] [IFSR", ['IRAN', 'SDGT', 'IFSR']),
+    ("[SDGT]", ['SDGT']),
+    ("cuba", ['CUBA']),
+    (" sdgt ] [ iran ", ['SDGT', 'IRAN']),
+    ("", []),
+    (None, []),
+])
+def test_parse_programs(program, expected):
+    assert parse_programs(program) == expected
+
+
+def screen(screener, **filters):
+    response = screener.screen(SanctionsQuery(name="Banco Nacional", top_k=10, **filters), debug=True)
+    return [m.uid for m in response.top_matches], response.debug['counters']
+
+
+def test_country_filter_limits_scored_candidates(screener):
+    everything, unfiltered = screen(screener)
+    uids, counters = screen(screener, country="Cuba")
+
+    assert sorted(uids) == ['SDN_0', 'SDN_1']
+    assert counters['retrieved'] <= 2 < unfiltered['retrieved']
+    assert counters['scored'] <= 2 < unfiltered['scored']
+    assert len(everything) == len(RECORDS)
+
+
+def test_program_filter_matches_any_program_of_a_record(screener):
+    uids, counters = screen(screener, program="sdgt")
+
+    assert sorted(uids) == ['SDN_1', 'SDN_3']
+    assert counters['retrieved'] <= 2
+
+
+def test_filters_combine(screener):
+    assert screen(screener, country="Iran", program="SDGT")[0] == ['SDN_3']
+
+
+def test_filter_without_rows_scores_nothing(screener):
+    uids, counters = screen(screener, country="Atlantis")
+
+    assert uids == []
+    assert counters.get('scored', 0) == 0
@@ -0,0 +1,235 @@
+"""
+Tests for fraud model inference scheduling (micro-batching and the bounded executor).
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from apps.api.src.services.inference import (
+    InferenceBatcher,
+    InferenceExecutor,
+    InferenceQueueFullError,
+)
+
+
+class Encoder:
+    """One feature per row; rows with 'bad' fail to encode."""
+    num_features = 1
+
+    def encode_into(self, features, row):
+        if 'bad' in features:
+            raise ValueError("cannot encode")
+        row[0] = features['x']
+
+
+class Model:
+    """Doubles its input; ``hold`` keeps predict running until released."""
+
+    def __init__(self, hold=False, error=None):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = error
+        if not hold:
+            self.release.set()
+
+    def __call__(self, matrix):
+        self.batches.append(len(matrix))
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return matrix[:, 0] * 2
+
+
+@pytest.fixture
+def make_batcher():
+    batchers = []
+
+    def make(model, **kwargs):
+        batcher = InferenceBatcher(Encoder(), model, **kwargs)
+        batchers.append(batcher)
+        return batcher
+    yield make
+    for batcher in batchers:
+        batcher.shutdown()
+
+
+def test_rows_waiting_behind_a_batch_are_coalesced(make_batcher):
+    model = Model(hold=True)
+    batcher = make_batcher(model, max_batch_size=4, max_wait_ms=0)
+
+    first = batcher.submit({'x': 1.0})
+    assert model.started.wait(5)
+    # Queued while the first batch runs: taken at once, up to max_batch_size per batch
+    futures = [batcher.submit({'x': float(i)}) for i in range(10)]
+    model.release.set()
+
+    assert first.result(5) == 2.0
+    assert [f.result(5) for f in futures] == [2.0 * i for i in range(10)]
+    assert model.batches == [1, 4, 4, 2]
+    stats = batcher.stats()
+    assert (stats['batches'], stats['rows'], stats['queued']) == (4, 11, 0)
+    assert stats['batch_size_histogram'] == {1: 1, 2: 1, 4: 2}
+
+
+def test_lone_row_is_flushed_after_max_wait(make_batcher):
+    model = Model()
+    batcher = make_batcher(model, max_batch_size=32, max_wait_ms=50)
+
+    started = time.perf_counter()
+    assert batcher.submit({'x': 3.0}).result(5) == 6.0
+    assert time.perf_counter() - started >= 0.045
+    assert model.batches == [1]
+
+    # Rows submitted inside the window join the same batch
+    futures = [batcher.submit({'x': 1.0}) for _ in range(5)]
+    assert [f.result(5) for f in futures] == [2.0] * 5
+    assert model.batches == [1, 5]
+
+
+def test_predict_error_fails_its_batch_only(make_batcher):
+    model = Model(error=RuntimeError("model down"))
+    batcher = make_batcher(model, max_batch_size=8, max_wait_ms=0)
+
+    with pytest.raises(RuntimeError, match="model down"):
+        batcher.submit({'x': 1.0}).result(5)
+    assert batcher.stats()['failed'] == 1
+
+    model.error = None
+    assert batcher.submit({'x': 2.0}).result(5) == 4.0
+
+
+def test_encode_error_fails_its_row_only(make_batcher):
+    model = Model(hold=True)
+    batcher = make_batcher(model, max_batch_size=8, max_wait_ms=0)
+    batcher.submit({'x': 0.0})
+    assert model.started.wait(5)
+    good, bad, other = (batcher.submit(f) for f in ({'x': 1.0}, {'bad': True}, {'x': 2.0}))
+    model.release.set()
+
+    assert (good.result(5), other.result(5)) == (2.0, 4.0)
+    with pytest.raises(ValueError):
+        bad.result(5)
+    assert model.batches == [1, 2]
+
+
+def test_shutdown_scores_queued_rows_then_rejects(make_batcher):
+    model = Model(hold=True)
+    batcher = make_batcher(model, max_batch_size=8, max_wait_ms=0)
+    batcher.submit({'x': 0.0})
+    assert model.started.wait(5)
+    queued = [batcher.submit({'x': float(i)}) for i in range(3)]
+
+    batcher.shutdown(wait=False)
+    with pytest.raises(RuntimeError):
+        batcher.submit({'x': 1.0})
+    model.release.set()
+    batcher.shutdown()
+
+    assert [f.result(5) for f in queued] == [0.0, 2.0, 4.0]
+    assert not batcher._thread.is_alive()
+
+
+def test_batcher_rejects_rows_past_queue_depth(make_batcher):
+    model = Model(hold=True)
+    batcher = make_batcher(model, max_batch_size=8, max_wait_ms=0, max_queue_depth=3)
+    running = batcher.submit({'x': 0.0})
+    assert model.started.wait(5)
+
+    waiting = [batcher.submit({'x': 1.0}) for _ in range(3)]
+    with pytest.raises(InferenceQueueFullError):
+        batcher.submit({'x': 1.0})
+    stats = batcher.stats()
+    assert (stats['queued'], stats['rejected']) == (3, 1)
+
+    model.release.set()
+    assert running.result(5) == 0.0
+    assert [f.result(5) for f in waiting] == [2.0] * 3
+    assert batcher.submit({'x': 2.0}).result(5) == 4.0
+
+
+def test_batcher_validates_settings():
+    for kwargs in ({'max_batch_size': 0}, {'max_wait_ms': -1}, {'max_queue_depth': 0}):
+        with pytest.raises(ValueError):
+            InferenceBatcher(Encoder(), Model(), **kwargs)
+
+
+def test_scores_come_from_the_reused_buffer_per_batch(make_batcher):
+    # A batch smaller than max_batch_size only scores its own rows
+    seen = []
+
+    def predict(matrix):
+        seen.append(matrix.copy())
+        return matrix[:, 0]
+
+    batcher = make_batcher(predict, max_batch_size=4, max_wait_ms=0)
+    assert batcher.submit({'x': 5.0}).result(5) == 5.0
+    assert batcher.submit({'x': 7.0}).result(5) == 7.0
+    assert [m.shape for m in seen] == [(1, 1), (1, 1)]
+    np.testing.assert_array_equal(seen[1], [[7.0]])
+
+
+def wait_until(predicate, timeout=5):
+    """Done callbacks may run just after a future's result is available."""
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        assert time.perf_counter() < deadline
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def make_executor():
+    executors = []
+
+    def make(**kwargs):
+        executor = InferenceExecutor(**kwargs)
+        executors.append(executor)
+        return executor
+    yield make
+    for executor in executors:
+        executor.shutdown()
+
+
+def test_executor_rejects_work_past_workers_plus_queue_depth(make_executor):
+    executor = make_executor(workers=2, max_queue_depth=1)
+    release = threading.Event()
+
+    # Two running, one waiting for a thread
+    futures = [executor.submit(release.wait, 5) for _ in range(3)]
+    with pytest.raises(InferenceQueueFullError):
+        executor.submit(release.wait, 5)
+    stats = executor.stats()
+    assert (stats['in_flight'], stats['queued'], stats['rejected']) == (3, 1, 1)
+
+    release.set()
+    assert [f.result(5) for f in futures] == [True] * 3
+    wait_until(lambda: executor.stats()['in_flight'] == 0)
+    assert executor.submit(lambda: 'ok').result(5) == 'ok'
+    wait_until(lambda: executor.stats()['completed'] == 4)
+
+
+def test_executor_releases_slots_of_failed_tasks(make_executor):
+    executor = make_executor(workers=1, max_queue_depth=0)
+
+    def fail():
+        raise RuntimeError("model down")
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match="model down"):
+            executor.submit(fail).result(5)
+        wait_until(lambda: executor.stats()['in_flight'] == 0)
+
+    assert executor.submit(lambda: 2).result(5) == 2
+    wait_until(lambda: executor.stats()['completed'] == 1)
+    stats = executor.stats()
+    assert (stats['failed'], stats['rejected'], stats['submitted']) == (3, 0, 4)
+
+
+def test_executor_validates_settings():
+    for kwargs in ({'workers': 0}, {'max_queue_depth': -1}):
+        with pytest.raises(ValueError):
+            InferenceExecutor(**kwargs)
@@ -0,0 +1,142 @@
+"""
+Golden-output tests for name normalization.
+
+The fast paths in ``packages.compliance.sanctions`` (translation tables, the
+ASCII path, memoization and the Arrow-backed Series variants) must produce
+exactly what the original regex pipeline produced, since every index and
+artifact is built from these strings.
+"""
+
+import random
+import re
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from packages.compliance.sanctions import (
+    STOPWORDS,
+    normalize_series,
+    normalize_text,
+    tokenize,
+    tokenize_series,
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / 'data_catalog' / 'processed'
+
+
+def reference_normalize_text(text):
+    """The original (regex) normalization pipeline."""
+    if not text or pd.isna(text):
+        return ""
+    text = str(text)
+    text = unicodedata.normalize("NFKC", text)
+    text = text.lower()
+    text = ''.join(
+        char for char in unicodedata.normalize("NFD", text)
+        if unicodedata.category(char) != 'Mn'
+    )
+    text = re.sub(r"['\"]", "", text)
+    text = re.sub(r"[^a-z0-9\s-]", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def reference_tokenize(name):
+    """The original tokenizer."""
+    if not name:
+        return []
+    tokens = [t for t in re.split(r'[\s-]+', name) if t]
+    return [t for t in tokens if len(t) >= 2 and t not in STOPWORDS]
+
+
+GOLDEN = [
+    ("José María O'Brien", 'jose maria obrien'),
+    ("AL-QAIDA", 'al-qaida'),
+    ("中国工商银行", ''),
+    ("INDUSTRIAL AND COMMERCIAL BANK OF CHINA", 'industrial and commercial bank of china'),
+    ("SALHAB, Azzam", 'salhab azzam'),
+    ('  "Banco"  Nacional\tde\nCuba ', 'banco nacional de cuba'),
+    ("Müller & Söhne GmbH", 'muller sohne gmbh'),
+    ("Ǆoković", 'dzokovic'),
+    ("ﬁnance Ⅻ ²", 'finance xii 2'),
+    ("ＡＢＣ　Ｃｏｒｐ", 'abc corp'),
+    ("Иван Петров", ''),
+    ("محمد Mohammed", 'mohammed'),
+    ("a b c d\x1ce\x85f", 'a b c d e f'),
+    ("--x--", '--x--'),
+    ("", ''),
+    (None, ''),
+    (float('nan'), ''),
+    (0, ''),
+    (42, '42'),
+]
+
+
+def corpus():
+    """List names, eval queries and random Unicode strings."""
+    texts = [text for text, _ in GOLDEN]
+    names_path = DATA_DIR / 'sanctions_names.parquet'
+    if names_path.exists():
+        texts += pd.read_parquet(names_path, columns=['name'])['name'].tolist()
+    labels_path = DATA_DIR / 'sanctions_eval_labels.csv'
+    if labels_path.exists():
+        texts += pd.read_csv(labels_path)['query'].tolist()
+    rng = random.Random(13)
+    alphabet = [chr(c) for c in range(0x3000)] + list("ﬁ²Ⅻ①ＡＢｃ​  İẞǅ")
+    texts += [
+        ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 24)))
+        for _ in range(5000)
+    ]
+    return texts
+
+
+@pytest.mark.parametrize("text, expected", GOLDEN)
+def test_normalize_text_golden(text, expected):
+    assert normalize_text(text) == expected
+    assert reference_normalize_text(text) == expected
+
+
+def test_normalize_text_matches_reference():
+    texts = corpus()
+    mismatches = [t for t in texts if normalize_text(t) != reference_normalize_text(t)]
+    assert mismatches == []
+    # Second pass is served from the cache
+    mismatches = [t for t in texts if normalize_text(t) != reference_normalize_text(t)]
+    assert mismatches == []
+
+
+def test_normalize_series_matches_reference():
+    texts = [t for t in corpus() if t is None or isinstance(t, str)] + [np.nan]
+    series = pd.Series(texts, index=np.arange(len(texts)) * 2, name='name', dtype=object)
+
+    result = normalize_series(series)
+
+    assert result.index.equals(series.index)
+    assert result.name == 'name'
+    assert result.tolist() == [reference_normalize_text(t) for t in texts]
+
+
+def test_normalize_series_accepts_arrow_and_mixed_values():
+    chunked = pa.chunked_array([["José", None], ["AL-QAIDA"]])
+    assert normalize_series(chunked).tolist() == ['jose', '', 'al-qaida']
+
+    mixed = pd.Series([42, "A b", None, 0], dtype=object)
+    assert normalize_series(mixed).tolist() == [reference_normalize_text(v) for v in mixed]
+
+
+def test_tokenize_matches_reference():
+    names = [reference_normalize_text(t) for t in corpus()]
+    assert [tokenize(n) for n in names] == [reference_tokenize(n) for n in names]
+
+
+def test_tokenize_series_matches_reference():
+    raw = [t for t in corpus() if isinstance(t, str)] + ["a\x1cbb\vcc", None]
+    names = raw + [reference_normalize_text(t) for t in raw if t]
+
+    result = tokenize_series(pd.Series(names, dtype=object))
+
+    assert result.tolist() == [reference_tokenize(n) for n in names]
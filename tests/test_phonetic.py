@@ -0,0 +1,91 @@
+"""
+Tests for phonetic keys and phonetic blocking.
+"""
+
+from collections import defaultdict
+
+import pandas as pd
+import pytest
+
+from packages.compliance.phonetic import MAX_KEY_LENGTH, phonetic_key, phonetic_keys
+from packages.compliance.sanctions import normalize_text, tokenize
+from packages.compliance.sanctions_api import (
+    SanctionsQuery,
+    SanctionsScreener,
+    get_first_token,
+    get_initials_signature,
+    get_token_count_bucket,
+)
+
+
+@pytest.mark.parametrize('variants', [
+    ("mohammed", "muhammad", "mohamed", "muhamad"),
+    ("yusuf", "youssef", "yousef"),
+    ("usama", "osama"),
+    ("hussein", "husain"),
+    ("qaddafi", "gaddafi"),
+    ("philip", "filip"),
+    ("knight", "night"),
+    ("catherine", "kathryn"),
+    ("abdullah", "abdalla"),
+])
+def test_spelling_variants_share_a_key(variants):
+    assert len({phonetic_key(token) for token in variants}) == 1
+
+
+@pytest.mark.parametrize('first, second', [
+    ("mohammed", "mahmoud"),
+    ("yusuf", "hassan"),
+    ("smith", "schmidt"),
+])
+def test_different_names_get_different_keys(first, second):
+    assert phonetic_key(first) != phonetic_key(second)
+
+
+def test_keys_are_capped_and_tokens_without_letters_dropped():
+    assert len(phonetic_key("abdulrahmanovich")) <= MAX_KEY_LENGTH
+    assert phonetic_key("123") == ''
+    assert phonetic_key("") == ''
+    assert phonetic_keys(["usama", "123", "bin", "ladin"]) == ['ASM', 'BN', 'LTN']
+
+
+NAMES = [
+    "Mohammed Yusuf Al Rashid",
+    "Maria Lopez",
+    "Ivan Petrov",
+    "Hassan Trading Company",
+]
+
+
+def build_screener(phonetic_blocking):
+    frame = pd.DataFrame({
+        'uid': [f"SDN_{i}" for i in range(len(NAMES))],
+        'ent_num': [str(i) for i in range(len(NAMES))],
+        'name': NAMES,
+        'name_norm': [normalize_text(name) for name in NAMES],
+        'country': None,
+        'program': 'SDGT',
+        'source': 'SDN',
+    })
+    first_token, bucket, initials = defaultdict(list), defaultdict(list), defaultdict(list)
+    for row, name_norm in enumerate(frame['name_norm']):
+        tokens = tokenize(name_norm)
+        first_token[get_first_token(tokens)].append(row)
+        bucket[get_token_count_bucket(tokens)].append(row)
+        initials[get_initials_signature(tokens)].append(row)
+    return SanctionsScreener(
+        frame, dict(first_token), dict(bucket), dict(initials),
+        blocking_strategy='multi', phonetic_blocking=phonetic_blocking, cache_size=0
+    )
+
+
+def test_phonetic_postings_recall_spelling_variants():
+    # First token, initials and token-count bucket all differ from the listed name
+    query = SanctionsQuery(name="Muhamad Yousef", top_k=3)
+
+    without = build_screener(phonetic_blocking=False).screen(query, debug=True)
+    with_phonetic = build_screener(phonetic_blocking=True).screen(query, debug=True)
+
+    assert 'SDN_0' not in [m.uid for m in without.top_matches]
+    assert with_phonetic.top_matches[0].uid == 'SDN_0'
+    assert with_phonetic.debug['counters']['phonetic'] >= 1